@@ -0,0 +1,258 @@
+#! /usr/bin/env python3
+"""
+Run summoner reports for many players in one process.
+
+Static data, the match caches and summoner lookups are shared by every
+player. Reports are written as JSON Lines as they finish.
+
+Names may carry a platform prefix, as in "euw1/Name". Each platform is
+worked on by its own pool with its own client and rate limiter, so a
+platform that is out of budget does not hold back the others.
+
+Usage:
+    python batch.py [names_file] [-o out.jsonl] [--workers N]
+                    [--failures failures.jsonl] [--matches N|all]
+                    [--region PLATFORM]
+"""
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import json
+import sys
+import time
+from regions import PLATFORMS, RegionCaches, check_platform, split_name
+from summoner_container import Summoner
+
+
+def read_names(lines):
+    """
+    Read summoner names, one per line.
+
+    Blank lines and lines starting with '#' are skipped, as are repeats.
+
+    Parameters:
+        lines : iterable
+
+    Returns : generator
+        Yields str.
+
+    """
+    seen = set()
+    for line in lines:
+        name = line.strip()
+        if name and not name.startswith("#") and name not in seen:
+            seen.add(name)
+            yield name
+
+
+class BatchRunner:  # pylint: disable=R0902,R0913,R0917
+    """Runs Summoner reports on per-region worker pools."""
+
+    # Names read ahead of the ones being worked on, across all regions.
+    READ_AHEAD = 10000
+
+    def __init__(self, workers=4, static_data=None, match_cache=None,
+                 match_limit=None, region=None):
+        """
+        Initialize BatchRunner object.
+
+        Parameters:
+            workers : int
+                Players processed at once in each region.
+            static_data : tuple
+                Output of Summoner.get_static_data(). Downloaded on the
+                first run if None.
+            match_cache : MatchCache
+                Cache for the default region. Regions without one open
+                Summoner.match_cache_path(region).
+            match_limit : int
+                Most games counted per player. None counts every game.
+            region : str
+                Platform of names without a prefix. Defaults to
+                Summoner.region.
+
+        """
+        self.workers = workers
+        self.static_data = static_data
+        self.match_limit = match_limit
+        self.region = check_platform(region or Summoner.region)
+        self.match_caches = RegionCaches(
+            Summoner.open_match_cache,
+            None if match_cache is None else {self.region: match_cache})
+
+    def match_cache(self, region):
+        """
+        Get the match cache shared by a region's players.
+
+        Parameters:
+            region : str
+
+        Returns : MatchCache
+            None if Summoner.MATCH_CACHE_PATH is None.
+
+        """
+        return self.match_caches.get(region)
+
+    def report(self, entry):
+        """
+        Build the report for one player.
+
+        Parameters:
+            entry : str
+                "Name" or "platform/Name".
+
+        Returns : dict
+
+        """
+        region, name = split_name(entry, self.region)
+        if not Summoner.valid_name(name):
+            raise ValueError(f"invalid summoner name {name!r}")
+        summ = Summoner(name, self.static_data, self.match_cache(region),
+                        verbose=False, match_limit=self.match_limit,
+                        region=region)
+        return {"summoner": name, "region": region,
+                "results": summ.summarize_results(summ.compute_results())}
+
+    def run(self, names, out):  # pylint: disable=R0912,R0914
+        """
+        Report on every name, writing one JSON line per success.
+
+        A failing player is recorded and the batch carries on.
+
+        Parameters:
+            names : iterable
+            out : file
+
+        Returns : dict
+            Keys : players, succeeded, failures, seconds,
+            players_per_second
+
+        """
+        if self.static_data is None:
+            self.static_data = Summoner.get_static_data(self.region)
+        start = time.perf_counter()
+        players = 0
+        failures = list()
+        names = iter(names)
+        backlog = collections.defaultdict(collections.deque)
+        running = collections.Counter()
+        buffered = 0
+        pending = dict()
+        with contextlib.ExitStack() as stack:
+            pools = dict()
+            while True:
+                while buffered < self.READ_AHEAD:
+                    entry = next(names, None)
+                    if entry is None:
+                        break
+                    try:
+                        region = split_name(entry, self.region)[0]
+                    except ValueError as error:
+                        players += 1
+                        failures.append({"summoner": entry,
+                                         "error": repr(error)})
+                        continue
+                    backlog[region].append(entry)
+                    buffered += 1
+                for region, queue in backlog.items():
+                    if queue and region not in pools:
+                        pools[region] = stack.enter_context(
+                            concurrent.futures.ThreadPoolExecutor(
+                                self.workers))
+                    while queue and running[region] < 2 * self.workers:
+                        entry = queue.popleft()
+                        future = pools[region].submit(self.report, entry)
+                        pending[future] = (region, entry)
+                        running[region] += 1
+                        buffered -= 1
+                if not pending:
+                    break
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    region, entry = pending.pop(future)
+                    running[region] -= 1
+                    players += 1
+                    try:
+                        out.write(json.dumps(future.result()) + "\n")
+                    except Exception as error:  # pylint: disable=W0703
+                        failures.append({"summoner": entry,
+                                         "error": repr(error)})
+                out.flush()
+        seconds = time.perf_counter() - start
+        return {"players": players,
+                "succeeded": players - len(failures),
+                "failures": failures,
+                "seconds": seconds,
+                "players_per_second": players / seconds if seconds else 0.0}
+
+
+def main(argv=None):
+    """Run a batch from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("names", nargs="?", default="-",
+                        help="File of summoner names, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-",
+                        help="JSON Lines output file, '-' for stdout")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--failures", help="Write failures to this file")
+    parser.add_argument("--matches", type=parse_limit, default=None,
+                        help="Games counted per player, or 'all'")
+    parser.add_argument("--region", default=Summoner.region,
+                        choices=sorted(PLATFORMS),
+                        help="Platform of names without a prefix")
+    args = parser.parse_args(argv)
+    with open_arg(args.names, "r") as names, \
+            open_arg(args.output, "w") as out:
+        runner = BatchRunner(args.workers, match_limit=args.matches,
+                             region=args.region)
+        summary = runner.run(read_names(names), out)
+    if args.failures is not None:
+        with open(args.failures, "w", encoding="utf-8") as fail_file:
+            for failure in summary["failures"]:
+                fail_file.write(json.dumps(failure) + "\n")
+    print(f"{summary['succeeded']}/{summary['players']} players in "
+          f"{summary['seconds']:.1f}s "
+          f"({summary['players_per_second']:.2f} players/sec), "
+          f"{len(summary['failures'])} failed", file=sys.stderr)
+    return 1 if summary["failures"] else 0
+
+
+def parse_limit(text):
+    """
+    Parse a game limit, where 'all' means no limit.
+
+    Parameters:
+        text : str
+
+    Returns : int
+
+    """
+    if text.lower() == "all":
+        return None
+    limit = int(text)
+    if limit < 1:
+        raise argparse.ArgumentTypeError("limit must be positive")
+    return limit
+
+
+def open_arg(path, mode):
+    """
+    Open a command line file argument, where '-' means stdin/stdout.
+
+    Parameters:
+        path : str
+        mode : str
+
+    Returns : file
+
+    """
+    if path == "-":
+        stream = sys.stdin if mode == "r" else sys.stdout
+        return open(stream.fileno(), mode, encoding="utf-8", closefd=False)
+    return open(path, mode, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
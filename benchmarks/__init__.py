@@ -0,0 +1 @@
+"""Benchmarks run against the local Riot API stand-in."""
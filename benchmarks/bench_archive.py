@@ -0,0 +1,107 @@
+#! /usr/bin/env python3
+"""
+Time building, compacting and aggregating a large MatchArchive.
+
+Games are generated straight into columns, so the run measures the
+archive rather than JSON decoding. Memory peaks are traced Python and
+numpy allocations; pages of the mapped columns are not counted.
+
+Run from the repository root:
+    python -m benchmarks.bench_archive [--games N] [--players N]
+                                       [--dir DIR]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from match_archive import SEATS, MatchArchive
+
+
+def random_columns(archive, count, players, rand, start_id):
+    """
+    Generate 'count' games of random players and champions.
+
+    Returns : dict
+        Columns for MatchArchive.append_columns().
+
+    """
+    champions = np.argsort(rand.random((count, 160)), axis=1)[:, :SEATS] + 1
+    blue_win = rand.random(count) < 0.5
+    return {"game_id": np.arange(start_id, start_id + count),
+            "timestamp": 1578000000000 + rand.integers(0, 10 ** 10, count),
+            "queue": np.full(count, 400),
+            "champion": champions,
+            "team": np.repeat([[1] * 5 + [2] * 5], count, axis=0),
+            "win": np.concatenate([np.repeat(blue_win[:, None], 5, axis=1),
+                                   np.repeat(~blue_win[:, None], 5, axis=1)],
+                                  axis=1),
+            "player": archive.player_ids(
+                f"Player {num}" for num in
+                rand.integers(0, players, count * SEATS)).reshape(-1, SEATS)}
+
+
+def traced(call):
+    """
+    Run call() under tracemalloc.
+
+    Returns : tuple
+        Format : (result, seconds : float, peak_bytes : int)
+
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = call()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--players", type=int, default=100000)
+    parser.add_argument("--chunk", type=int, default=100000)
+    parser.add_argument("--dir")
+    args = parser.parse_args()
+    rand = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        archive = MatchArchive(directory)
+        start = time.perf_counter()
+        for first in range(0, args.games, args.chunk):
+            count = min(args.chunk, args.games - first)
+            archive.append_columns(random_columns(archive, count,
+                                                  args.players, rand, first))
+        append = time.perf_counter() - start
+        names = [f"Player {num}" for num in range(20)]
+        _, scan, _ = traced(lambda: [archive.entries(name)
+                                     for name in names])
+        _, compact, compact_peak = traced(archive.compact)
+        _, lookup, _ = traced(lambda: [archive.entries(name)
+                                       for name in names])
+        _, player, _ = traced(lambda: [archive.champion_stats(name)
+                                       for name in names])
+        _, whole, whole_peak = traced(archive.champion_stats)
+        size = sum(os.path.getsize(os.path.join(directory, name))
+                   for name in os.listdir(directory))
+    print(json.dumps({
+        "games": args.games,
+        "records": args.games * SEATS,
+        "archive_bytes": size,
+        "append_seconds": append,
+        "compact_seconds": compact,
+        "compact_peak_bytes": compact_peak,
+        "player_entries_scan_seconds": scan / len(names),
+        "player_entries_index_seconds": lookup / len(names),
+        "player_stats_seconds": player / len(names),
+        "all_seats_stats_seconds": whole,
+        "all_seats_stats_peak_bytes": whole_peak,
+        "packed_records_bytes": args.games * SEATS * 21}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#! /usr/bin/env python3
+"""
+Compare bare requests.get with the pooled RiotClient.
+
+Run from the repository root:
+    python -m benchmarks.bench_client [--requests N] [--latency S]
+"""
+import argparse
+import json
+import time
+import requests
+from riot_client import RiotClient
+from riot_stub import FakeRiotData, RiotStub
+
+
+def time_calls(get, url, count):
+    """
+    Time a number of sequential GET requests.
+
+    Parameters:
+        get : callable
+        url : str
+        count : int
+
+    Returns : float
+        Seconds taken.
+
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        get(url).json()
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    data = FakeRiotData()
+    game_id = data.add_match(["Bork"])
+    with RiotStub(data, latency=args.latency) as stub:
+        url = f"{stub.api_base}match/v4/matches/{game_id}"
+        client = RiotClient()
+        bare = time_calls(lambda u: requests.get(u, timeout=10), url,
+                          args.requests)
+        pooled = time_calls(client.get, url, args.requests)
+    report = {"requests": args.requests,
+              "latency": args.latency,
+              "bare_seconds": bare,
+              "pooled_seconds": pooled,
+              "speedup": bare / pooled,
+              "client_metrics": client.metrics.snapshot()}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
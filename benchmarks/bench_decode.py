@@ -0,0 +1,127 @@
+#! /usr/bin/env python3
+"""
+Compare the match payload decoding backends.
+
+Uses the matches of a fixture directory recorded with
+"python riot_stub.py record" when --fixtures is given. Otherwise stub
+matches are padded out with match-v4 sized stats, timelines and team
+data, so payloads are about as large as real ones.
+
+Run from the repository root:
+    python -m benchmarks.bench_decode [--matches N] [--fixtures DIR]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import time
+import tracemalloc
+import match_decode
+from riot_stub import FakeRiotData
+from summoner_container import Summoner
+
+
+def padded_match(match, rand):
+    """
+    Add the fields a real match-v4 payload carries.
+
+    Parameters:
+        match : dict
+        rand : random.Random
+
+    Returns : dict
+
+    """
+    for part in match["participants"]:
+        part["stats"].update({f"stat{num}": rand.randrange(100000)
+                              for num in range(110)})
+        part["timeline"] = {
+            delta: {"0-10": rand.random(), "10-20": rand.random(),
+                    "20-30": rand.random()}
+            for delta in ("creepsPerMinDeltas", "xpPerMinDeltas",
+                          "goldPerMinDeltas", "csDiffPerMinDeltas",
+                          "xpDiffPerMinDeltas", "damageTakenPerMinDeltas")}
+        part.update(spell1Id=4, spell2Id=14, highestAchievedSeasonTier="")
+    for ident in match["participantIdentities"]:
+        ident["player"].update(platformId="NA1", currentPlatformId="NA1",
+                               summonerId="x" * 47, currentAccountId="x" * 56,
+                               matchHistoryUri="/v1/stats/player_history/"
+                               "NA1/" + "1" * 10, profileIcon=4000)
+    match["teams"] = [{"teamId": team, "win": "Win", "bans": [
+        {"championId": rand.randrange(1, 160), "pickTurn": turn}
+        for turn in range(5)], "towerKills": 5, "dragonKills": 2}
+        for team in (100, 200)]
+    match.update(platformId="NA1", gameDuration=1800, mapId=11,
+                 gameVersion="10.1.1", gameMode="CLASSIC",
+                 gameType="MATCHED_GAME")
+    return match
+
+
+def load_payloads(count, fixtures=None):
+    """
+    Get match payloads and a summoner in each.
+
+    Returns : list
+        Format : [(payload : bytes, summoner : str)]
+
+    """
+    rand = random.Random(7)
+    if fixtures is not None:
+        with open(os.path.join(fixtures, "matches.ndjson"), 'rb') as lines:
+            matches = [json.loads(line) for line in lines][:count]
+    else:
+        data = FakeRiotData(n_champions=150, seed=7)
+        data.add_summoner("Bench", count)
+        matches = [padded_match(match, rand)
+                   for match in data.matches.values()]
+    return [(json.dumps(match).encode("utf-8"),
+             match["participantIdentities"][0]["player"]["summonerName"])
+            for match in matches]
+
+
+def measure(decode, payloads):
+    """
+    Time decode over every payload and trace its memory on one.
+
+    Parameters:
+        decode : callable
+            decode(payload, summoner) returns a MatchRecord.
+        payloads : list
+
+    Returns : dict
+
+    """
+    start = time.perf_counter()
+    for payload, summoner in payloads:
+        decode(payload, summoner)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    decode(*payloads[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"microseconds_per_match": 1e6 * seconds / len(payloads),
+            "peak_bytes_per_match": peak}
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--fixtures")
+    args = parser.parse_args()
+    payloads = load_payloads(args.matches, args.fixtures)
+    get_data = Summoner.get_match_data
+    decoders = {backend: lambda p, s, b=backend: get_data(
+        match_decode.project(p, b), s) for backend in match_decode.backends()}
+    report = {"matches": len(payloads),
+              "mean_payload_bytes": sum(len(p) for p, _ in payloads) /
+              len(payloads)}
+    for name, decode in decoders.items():
+        report[name] = measure(decode, payloads)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#! /usr/bin/env python3
+"""
+Count match requests and decodes for a roster with shared games.
+
+Matches are padded to match-v4 size as in bench_decode. Every player of
+the roster is reported on once, in three setups:
+    isolated        : a match cache per player, as separate runs had.
+    shared_payloads : one match cache, payloads only.
+    shared_index    : one match cache, every participant indexed.
+
+Run from the repository root:
+    python -m benchmarks.bench_dedup [--players N] [--games N]
+                                     [--per-game N]
+"""
+import argparse
+import json
+import random
+import time
+from benchmarks.bench_decode import padded_match
+from identities import IdentityResolver
+from match_cache import MatchCache
+from rate_limiter import RateLimiter
+from regions import RegionClients
+from report_profiler import Profiler
+from riot_client import RiotClient
+from riot_stub import FakeRiotData, RiotStub
+from summoner_container import Summoner
+
+
+def roster_data(players, games, per_game, seed=7):
+    """
+    Generate games each holding per_game roster players.
+
+    Returns : tuple
+        Format : (data : FakeRiotData, names : list)
+
+    """
+    rand = random.Random(seed)
+    data = FakeRiotData(seed=seed)
+    names = [f"Player {num}" for num in range(players)]
+    for name in names:
+        data.add_summoner(name)
+    for _ in range(games):
+        data.add_match(rand.sample(names, per_game))
+    for match in data.matches.values():
+        padded_match(match, rand)
+    return data, names
+
+
+def run(stub, names, setup):
+    """
+    Report on every name, counting match requests and decodes.
+
+    Returns : dict
+
+    """
+    shared = MatchCache(":memory:")
+    profiler = Profiler()
+    before = sum(count for path, count in stub.hits.items()
+                 if "/matches/" in path)
+    start = time.perf_counter()
+    for name in names:
+        cache = MatchCache(":memory:") if setup == "isolated" else shared
+        Summoner(name, match_cache=cache, verbose=False, incremental=False,
+                 index_participants=setup == "shared_index",
+                 profiler=profiler).compute_results()
+    seconds = time.perf_counter() - start
+    requests = sum(count for path, count in stub.hits.items()
+                   if "/matches/" in path) - before
+    return {"match_requests": requests,
+            "decodes": profiler.report()["stages"]["match_parse"]["calls"],
+            "seconds": seconds}
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--games", type=int, default=400)
+    parser.add_argument("--per-game", type=int, default=3)
+    args = parser.parse_args()
+    data, names = roster_data(args.players, args.games, args.per_game)
+    with RiotStub(data) as stub:
+        Summoner.API_BASE = stub.api_base
+        Summoner.DDRAGON_BASE = stub.ddragon_base
+        Summoner.MATCH_CACHE_PATH = None
+        Summoner.clients = RegionClients(lambda _: RiotClient(
+            RateLimiter(((100000, 1),))))
+        report = {"players": args.players, "games": args.games,
+                  "roster_players_per_game": args.per_game}
+        for setup in ("isolated", "shared_payloads", "shared_index"):
+            Summoner.identities = IdentityResolver()
+            report[setup] = run(stub, names, setup)
+    isolated = report["isolated"]["match_requests"]
+    report["requests_saved"] = 1 - report["shared_index"][
+        "match_requests"] / isolated
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
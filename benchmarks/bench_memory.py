@@ -0,0 +1,58 @@
+#! /usr/bin/env python3
+"""
+Measure memory per match of the match representations.
+
+Compares the (win, champion, allies, enemies) tuples get_match_data()
+used to return with MatchRecord objects and packed MatchRecords.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory [--matches N]
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from match_record import MatchRecord, MatchRecords
+from riot_stub import random_matches
+
+
+def traced_bytes(build):
+    """
+    Get the memory held by what build() returns.
+
+    Parameters:
+        build : callable
+
+    Returns : int
+
+    """
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=100000)
+    args = parser.parse_args()
+    source = random_matches(args.matches)
+    builds = {
+        "tuples": lambda: [(win, own, list(team), list(enemy))
+                           for win, own, team, enemy in source],
+        "match_records": lambda: [MatchRecord(*match) for match in source],
+        "packed": lambda: MatchRecords.from_iterable(
+            MatchRecord(*match) for match in source)}
+    report = {"matches": args.matches}
+    for name, build in builds.items():
+        report[f"{name}_bytes_per_match"] = \
+            traced_bytes(build) / args.matches
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#! /usr/bin/env python3
+"""
+Time building and querying PairStats.
+
+Run from the repository root:
+    python -m benchmarks.bench_pairs [--sizes 1000 10000 100000]
+"""
+import argparse
+import json
+import time
+from match_record import MatchRecords
+from pair_stats import PairStats
+from riot_stub import random_matches
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--champions", type=int, default=170)
+    args = parser.parse_args()
+    report = list()
+    for size in args.sizes:
+        records = MatchRecords.from_iterable(
+            random_matches(size, n_champions=args.champions))
+        start = time.perf_counter()
+        pairs = PairStats.from_matches(records)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        for champion in pairs.ids.tolist():
+            pairs.best_allies(champion)
+            pairs.worst_matchups(champion)
+        per_champion = (time.perf_counter() - start) / len(pairs.ids)
+        start = time.perf_counter()
+        pairs.worst_matchups(k=10, min_games=5)
+        overall = time.perf_counter() - start
+        report.append({"matches": size,
+                       "build_seconds": build,
+                       "champion_query_seconds": per_champion,
+                       "overall_query_seconds": overall})
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#! /usr/bin/env python3
+"""
+Time parallel champion counting from one worker process to many.
+
+Each run reuses a started pool, so the times are of counting and
+shipping work, not of starting processes. Records are mapped by the
+workers from one file in /dev/shm, and for comparison sent to them as
+pickled slices; the archive is mapped by each worker. Speedups are
+against counting in this process.
+
+Run from the repository root:
+    python -m benchmarks.bench_parallel [--records N] [--games N]
+                                        [--max-workers N]
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import parallel_stats
+from benchmarks.bench_archive import random_columns
+from champ_stats import ChampionStats
+from match_archive import MatchArchive
+from match_record import ALLIES, MATCH_DTYPE
+
+
+def random_records(count, rand):
+    """
+    Generate 'count' MATCH_DTYPE records of distinct random champions.
+
+    Returns : numpy.ndarray
+
+    """
+    records = np.zeros(count, dtype=MATCH_DTYPE)
+    for start in range(0, count, 1000000):
+        stop = min(count, start + 1000000)
+        champions = np.argsort(rand.random((stop - start, 160)),
+                               axis=1)[:, :10] + 1
+        records["win"][start:stop] = rand.random(stop - start) < 0.5
+        records["champion"][start:stop] = champions[:, 0]
+        records["allies"][start:stop] = champions[:, 1:1 + ALLIES]
+        records["enemies"][start:stop] = champions[:, 1 + ALLIES:]
+    return records
+
+
+def best_of(call, repeat=3):
+    """
+    Call a function 'repeat' times.
+
+    Returns : tuple
+        Format : (fastest seconds : float, result : object)
+
+    """
+    times = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def count_records(records):
+    """Count a MATCH_DTYPE array in a worker."""
+    return ChampionStats.from_records(records).table
+
+
+def pickled(records, pool, workers):
+    """Count with each range pickled to its worker, for comparison."""
+    return parallel_stats.merge(pool.map(
+        count_records, [records[start:stop] for start, stop
+                        in parallel_stats.ranges(len(records), workers)]))
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10000000)
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--max-workers", type=int,
+                        default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    rand = np.random.default_rng(0)
+    records = random_records(args.records, rand)
+    serial, expected = best_of(lambda: ChampionStats.from_records(records))
+    with tempfile.TemporaryDirectory() as directory:
+        archive = MatchArchive(directory)
+        for start in range(0, args.games, 100000):
+            archive.append_columns(random_columns(
+                archive, min(100000, args.games - start), 100000, rand,
+                start))
+        archive_serial, archive_expected = best_of(archive.champion_stats)
+        report = {"records": args.records, "games": args.games,
+                  "cpus": os.cpu_count(), "serial_seconds": serial,
+                  "archive_serial_seconds": archive_serial, "workers": []}
+        for workers in range(1, args.max_workers + 1):
+            with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+                list(pool.map(abs, range(workers)))
+                shared, stats = best_of(lambda: parallel_stats.champion_stats(
+                    records, workers, executor=pool))
+                assert stats == expected
+                sliced, stats = best_of(lambda: pickled(records, pool,
+                                                        workers))
+                assert stats == expected
+            whole, stats = best_of(lambda: parallel_stats.archive_stats(
+                directory, workers))
+            assert stats == archive_expected
+            report["workers"].append({
+                "workers": workers,
+                "shared_seconds": shared,
+                "shared_speedup": serial / shared,
+                "pickled_seconds": sliced,
+                "pickled_speedup": serial / sliced,
+                "archive_seconds": whole,
+                "archive_speedup": archive_serial / whole})
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
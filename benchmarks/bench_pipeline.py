@@ -0,0 +1,112 @@
+#! /usr/bin/env python3
+"""
+pytest-benchmark suite for the report pipeline, run against RiotStub.
+
+Data is generated from fixed seeds, or loaded from a fixture directory
+recorded with "python riot_stub.py record" when RIOT_FIXTURES is set,
+so numbers from different commits can be compared:
+    python -m pytest benchmarks/bench_pipeline.py --benchmark-autosave
+    python -m pytest benchmarks/bench_pipeline.py --benchmark-compare
+"""
+import contextlib
+import io
+import os
+import pytest
+from identities import IdentityResolver
+from rate_limiter import RateLimiter
+from regions import RegionClients
+from riot_client import RiotClient
+from riot_stub import FakeRiotData, RiotStub
+from summoner_container import Summoner
+
+
+MATCH_COUNTS = (10, 100, 500)
+
+
+def bench_data():
+    """
+    Get the data to serve and the summoner to report on.
+
+    Returns : tuple
+        Format : (data : FakeRiotData, name : str)
+
+    """
+    directory = os.environ.get("RIOT_FIXTURES")
+    if directory:
+        data = FakeRiotData.load(directory)
+        accounts = {summ["accountId"]: name
+                    for name, summ in data.summoners.items()}
+        account = max(accounts, key=lambda a: len(data.matchlists[a]))
+        return data, accounts[account]
+    data = FakeRiotData(n_champions=150, seed=12)
+    data.add_summoner("Bench", max(MATCH_COUNTS))
+    return data, "Bench"
+
+
+@pytest.fixture(scope="module")
+def stub():
+    """Serve the benchmark data and point Summoner at it."""
+    data, name = bench_data()
+    with RiotStub(data) as server, pytest.MonkeyPatch.context() as patch:
+        patch.setattr(Summoner, 'API_BASE', server.api_base)
+        patch.setattr(Summoner, 'DDRAGON_BASE', server.ddragon_base)
+        patch.setattr(Summoner, 'identities', IdentityResolver())
+        patch.setattr(Summoner, 'clients', RegionClients(
+            lambda _: RiotClient(RateLimiter(((10 ** 6, 1),)))))
+        server.name = name
+        yield server
+
+
+@pytest.fixture(params=MATCH_COUNTS)
+def summ(request, stub, tmp_path, monkeypatch):
+    """Summoner reporting on the newest 'param' games, uncached."""
+    monkeypatch.chdir(tmp_path)
+    return Summoner(stub.name, verbose=False, match_limit=request.param,
+                    incremental=False, MATCH_CACHE_PATH=None)
+
+
+def matchlist(summ):
+    """Get the games a benchmark Summoner reports on."""
+    account = summ.get_summoner_by_name(summ.summoner_in,
+                                        summ.API_TEST_KEY)[2]
+    return {"matches": list(summ.iter_matchlist(
+        account, summ.API_TEST_KEY, summ.match_limit))}
+
+
+def test_compile_match_list(benchmark, summ):
+    """Download matches to NDJSON."""
+    games = matchlist(summ)
+    benchmark(lambda: os.remove(summ.compile_match_list(
+        games, summ.API_TEST_KEY)))
+
+
+def test_get_match_list_data(benchmark, summ):
+    """Parse an NDJSON match file."""
+    file_name = summ.compile_match_list(matchlist(summ), summ.API_TEST_KEY)
+    result = benchmark(summ.get_match_list_data, summ.summoner_in, file_name)
+    assert len(result) == summ.match_limit
+
+
+def test_create_stat_dict_2(benchmark, summ):
+    """Count champions over parsed matches."""
+    file_name = summ.compile_match_list(matchlist(summ), summ.API_TEST_KEY)
+    tuples = summ.get_match_list_data(summ.summoner_in, file_name)
+    benchmark(summ.create_stat_dict_2, tuples)
+
+
+def test_comp_champ_stats(benchmark, summ):
+    """Rank champions for every comparison."""
+    file_name = summ.compile_match_list(matchlist(summ), summ.API_TEST_KEY)
+    stats = summ.create_stat_dict_2(
+        summ.get_match_list_data(summ.summoner_in, file_name))
+    benchmark(lambda: [summ.comp_champ_stats(stats, sort_by)
+                       for sort_by in summ.comp_list])
+
+
+def test_process(benchmark, summ):
+    """Run a whole report."""
+    def process():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return summ.process()
+
+    assert benchmark(process) == "all clear"
@@ -0,0 +1,48 @@
+#! /usr/bin/env python3
+"""
+Time RollingStats updates and queries against recounting the window.
+
+Run from the repository root:
+    python -m benchmarks.bench_rolling [--windows 20 1000 100000]
+"""
+import argparse
+import json
+import time
+from champ_stats import ChampionStats
+from riot_stub import random_matches
+from rolling_stats import RollingStats
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--windows", type=int, nargs="+",
+                        default=[20, 1000, 100000])
+    parser.add_argument("--games", type=int, default=20000)
+    args = parser.parse_args()
+    report = list()
+    for size in args.windows:
+        matches = random_matches(size + args.games, seed=size)
+        window = RollingStats(max_games=size)
+        for match in matches[:size]:
+            window.add(match)
+        start = time.perf_counter()
+        for match in matches[size:]:
+            window.add(match)
+        update = (time.perf_counter() - start) / args.games
+        start = time.perf_counter()
+        for _ in range(100):
+            window.top("wins-as")
+        query = (time.perf_counter() - start) / 100
+        start = time.perf_counter()
+        ChampionStats.from_matches(matches[-size:]).top_k(0)
+        recount = time.perf_counter() - start
+        report.append({"window": size,
+                       "update_seconds": update,
+                       "query_seconds": query,
+                       "recount_seconds": recount})
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#! /usr/bin/env python3
+"""
+Time loading Data Dragon static data cold, warm and revalidated.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup [--latency S] [--champions N]
+"""
+import argparse
+import json
+import tempfile
+import time
+from riot_client import RiotClient
+from riot_stub import FakeRiotData, RiotStub
+from static_data import StaticDataCache
+
+
+def timed_load(directory, stub, ttl):
+    """
+    Time one load() through a fresh cache, as a new process would.
+
+    Parameters:
+        directory : str
+        stub : RiotStub
+        ttl : float
+
+    Returns : float
+
+    """
+    cache = StaticDataCache(directory, RiotClient(), stub.ddragon_base, ttl)
+    start = time.perf_counter()
+    cache.load()
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Simulated network latency per request")
+    parser.add_argument("--champions", type=int, default=160)
+    args = parser.parse_args()
+    data = FakeRiotData(n_champions=args.champions)
+    with RiotStub(data, latency=args.latency) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        client = RiotClient()
+        start = time.perf_counter()
+        version = client.get_json(f"{stub.ddragon_base}/realms/na.json")["v"]
+        client.get_json(f"{stub.ddragon_base}/cdn/{version}/data/en_US/"
+                        f"champion.json")
+        uncached = time.perf_counter() - start
+        cold = timed_load(directory, stub, 3600)
+        warm = timed_load(directory, stub, 3600)
+        revalidated = timed_load(directory, stub, 0)
+    print(json.dumps({"latency": args.latency,
+                      "uncached_seconds": uncached,
+                      "cold_seconds": cold,
+                      "warm_seconds": warm,
+                      "revalidated_seconds": revalidated}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
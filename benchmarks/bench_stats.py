@@ -0,0 +1,99 @@
+#! /usr/bin/env python3
+"""
+Compare the old dict-per-champion counting with ChampionStats.
+
+Run from the repository root:
+    python -m benchmarks.bench_stats [--sizes 100 10000 1000000]
+"""
+import argparse
+import json
+import time
+from champ_stats import COMPARISONS, ChampionStats
+from riot_stub import random_matches
+from summoner_container import Summoner
+
+
+def legacy_stats(matches):
+    """
+    Count champions with one dict per champion, as before ChampionStats.
+
+    Parameters:
+        matches : list
+
+    Returns : list
+        Rows in comp_champ_stats() format.
+
+    """
+    stat_dict = dict()
+    for win, own, team, enemy in matches:
+        for ids, delta in (([own], (1, 0, 0, 1, 0, 0)),
+                           (team, (0, 1, 0, 0, 1, 0)),
+                           (enemy, (0, 0, 1, 0, 0, 1))):
+            for champ in ids:
+                if not win:
+                    delta = delta[:3] + (0, 0, 0)
+                entry = stat_dict.setdefault(
+                    champ, {"id": champ, "played_as": 0, "same_team": 0,
+                            "other_team": 0, "wins_as": 0, "wins_with": 0,
+                            "wins_against": 0})
+                for num, key in enumerate(list(entry)[1:]):
+                    entry[key] += delta[num]
+    return [list(entry.values()) for entry in stat_dict.values()]
+
+
+def legacy_top(rows, sort_by):
+    """
+    Rank rows with a full sort, as before ChampionStats.
+
+    Parameters:
+        rows : list
+        sort_by : str
+
+    Returns : list
+
+    """
+    column, descending, count = COMPARISONS[sort_by]
+    kept = [x for x in rows if x[column + 1] >= count]
+    return sorted(kept, key=lambda x: x[column + 1], reverse=descending)[0:5]
+
+
+def timed(func, *args):
+    """
+    Call a function once and time it.
+
+    Returns : tuple
+        Format : (seconds : float, result : object)
+
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[100, 10000, 1000000])
+    args = parser.parse_args()
+    report = list()
+    for size in args.sizes:
+        matches = random_matches(size)
+        old_build, rows = timed(legacy_stats, matches)
+        old_query, _ = timed(lambda: [legacy_top(rows, key)
+                                      for key in COMPARISONS])
+        new_build, stats = timed(ChampionStats.from_matches, matches)
+        new_query, _ = timed(lambda: [Summoner.comp_champ_stats(stats, key)
+                                      for key in COMPARISONS])
+        assert sorted(rows) == stats.rows()
+        report.append({"matches": size,
+                       "legacy_build_seconds": old_build,
+                       "legacy_query_seconds": old_query,
+                       "array_build_seconds": new_build,
+                       "array_query_seconds": new_query,
+                       "build_speedup": old_build / new_build})
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#! /usr/bin/env python3
+"""
+Array-backed champion statistics.
+
+Counters for every champion live in one integer matrix indexed by
+champion id, filled from whole batches of packed matches at once.
+"""
+import numpy as np
+from match_record import fold
+
+
+COLUMNS = ("played_as", "same_team", "other_team",
+           "wins_as", "wins_with", "wins_against")
+
+# sort_by : (column, descending, minimum count), as used by
+# Summoner.comp_champ_stats.
+COMPARISONS = {"wins-as": (0, True, 1),
+               "wins-with": (1, True, 5),
+               "wins-against": (2, True, 5),
+               "losses-as": (0, False, 5),
+               "losses-with": (1, False, 5),
+               "losses-against": (2, False, 5)}
+
+
+class ChampionStats:
+    """Champion counters in an (n_champions, 6) matrix of COLUMNS."""
+
+    def __init__(self, table=None):
+        """
+        Initialize ChampionStats object.
+
+        Parameters:
+            table : numpy.ndarray
+                Counters indexed by champion id. Empty if None.
+
+        """
+        if table is None:
+            table = np.zeros((0, len(COLUMNS)), dtype=np.int64)
+        self.table = table
+
+    @classmethod
+    def from_matches(cls, matches, chunk=65536):
+        """
+        Count champions over matches.
+
+        The input is consumed in chunks, so a stream of matches is never
+        held in memory at once.
+
+        Parameters:
+            matches : iterable
+                MatchRecords, or MatchRecord objects or (win, champion,
+                team, enemy) tuples as returned by
+                Summoner.get_match_data().
+            chunk : int
+                Matches packed at a time.
+
+        Returns : ChampionStats
+
+        """
+        return fold(matches, cls.from_records, cls(), chunk)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Count champions over a MATCH_DTYPE array.
+
+        Parameters:
+            records : numpy.ndarray
+
+        Returns : ChampionStats
+
+        """
+        wins = records["win"]
+        allies = records["allies"]
+        enemies = records["enemies"]
+        ally_wins = np.broadcast_to(wins[:, None], allies.shape)
+        enemy_wins = np.broadcast_to(wins[:, None], enemies.shape)
+        return cls.from_arrays(wins, records["champion"],
+                               allies[allies != 0], ally_wins[allies != 0],
+                               enemies[enemies != 0],
+                               enemy_wins[enemies != 0])
+
+    @classmethod
+    def from_arrays(cls, wins, own,  # pylint: disable=R0913,R0917
+                    allies, ally_wins, enemies, enemy_wins):
+        """
+        Count champions over flat arrays.
+
+        Parameters:
+            wins : numpy.ndarray
+                Win flag of each match.
+            own : numpy.ndarray
+                Champion played in each match.
+            allies : numpy.ndarray
+                Every teammate's champion.
+            ally_wins : numpy.ndarray
+                Win flag of the match each entry of 'allies' came from.
+            enemies : numpy.ndarray
+                Every opponent's champion.
+            enemy_wins : numpy.ndarray
+                Win flag of the match each entry of 'enemies' came from.
+
+        Returns : ChampionStats
+
+        """
+        size = 1 + max([int(ids.max()) for ids in (own, allies, enemies)
+                        if ids.size] or [-1])
+        table = np.empty((size, len(COLUMNS)), dtype=np.int64)
+        for col, (ids, flags) in enumerate(((own, wins), (allies, ally_wins),
+                                            (enemies, enemy_wins))):
+            table[:, col] = np.bincount(ids, minlength=size)
+            table[:, col + 3] = np.bincount(ids[flags.astype(bool)],
+                                            minlength=size)
+        return cls(table)
+
+    def merge(self, other):
+        """
+        Add two sets of counters.
+
+        Parameters:
+            other : ChampionStats
+
+        Returns : ChampionStats
+
+        """
+        big, small = sorted((self.table, other.table), key=len,
+                            reverse=True)
+        table = big.copy()
+        table[:len(small)] += small
+        return ChampionStats(table)
+
+    def seen(self):
+        """
+        Get ids of every champion that appeared in a match.
+
+        Returns : numpy.ndarray
+
+        """
+        return np.flatnonzero(self.table[:, :3].any(axis=1))
+
+    def row(self, champion):
+        """
+        Get one champion's counters in comp_champ_stats() row format.
+
+        Parameters:
+            champion : int
+
+        Returns : list
+            [id, played_as, same_team, other_team, wins_as, wins_with,
+            wins_against]
+
+        """
+        if champion >= len(self.table):
+            return [int(champion)] + [0] * len(COLUMNS)
+        return [int(champion)] + self.table[champion].tolist()
+
+    def rows(self):
+        """
+        Get counters of every champion seen, ordered by id.
+
+        Returns : list
+
+        """
+        return [self.row(champion) for champion in self.seen()]
+
+    def top_k(self, column, k=5, descending=True, min_count=1):
+        """
+        Get ids of the k champions ranking highest on one column.
+
+        Champions below min_count are left out. Ties go to the lower id.
+
+        Parameters:
+            column : int
+                Index into COLUMNS.
+            k : int
+            descending : bool
+                Rank largest values first.
+            min_count : int
+
+        Returns : numpy.ndarray
+
+        """
+        values = self.table[:, column]
+        ids = np.flatnonzero((values >= min_count) &
+                             self.table[:, :3].any(axis=1))
+        key = values[ids] if not descending else -values[ids]
+        key = key * (len(self.table) + 1) + ids
+        if len(ids) > k:
+            part = np.argpartition(key, k - 1)[:k]
+        else:
+            part = np.arange(len(ids))
+        return ids[part[np.argsort(key[part])]]
+
+    def __eq__(self, other):
+        """Compare counters, ignoring trailing unseen ids."""
+        if not isinstance(other, ChampionStats):
+            return NotImplemented
+        size = max(len(self.table), len(other.table))
+        return np.array_equal(self._padded(size), other._padded(size))
+
+    def _padded(self, size):
+        """Get the table padded with zero rows to 'size' ids."""
+        table = np.zeros((size, len(COLUMNS)), dtype=np.int64)
+        table[:len(self.table)] = self.table
+        return table
+
+    __hash__ = None
@@ -0,0 +1,102 @@
+#! /usr/bin/env python3
+"""
+Memo of summoner identities looked up by name.
+
+A summoner's ids rarely change, so one lookup can serve every report
+that needs them for a while. Entries expire after a TTL and the least
+recently used are dropped past a size bound.
+"""
+import collections
+import threading
+import time
+
+
+class IdentityResolver:
+    """Thread-safe TTL-bounded LRU of summoner name lookups."""
+
+    def __init__(self, max_entries=10000, ttl=3600.0, clock=time.monotonic):
+        """
+        Initialize IdentityResolver object.
+
+        Parameters:
+            max_entries : int
+            ttl : float
+                Seconds an identity is reused.
+            clock : callable
+
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    @staticmethod
+    def key(name):
+        """
+        Normalize a summoner name the way Riot compares them.
+
+        Parameters:
+            name : str
+
+        Returns : str
+
+        """
+        return name.replace(" ", "").lower()
+
+    def get(self, name):
+        """
+        Get a remembered identity.
+
+        Parameters:
+            name : str
+
+        Returns : tuple
+            None if unknown or expired.
+
+        """
+        key = self.key(name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self.clock() - entry[0] >= self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, name, identity):
+        """
+        Remember an identity.
+
+        Parameters:
+            name : str
+            identity : tuple
+
+        """
+        key = self.key(name)
+        with self._lock:
+            self._entries[key] = (self.clock(), identity)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def resolve(self, name, lookup):
+        """
+        Get an identity, calling lookup(name) only when it is not known.
+
+        Parameters:
+            name : str
+            lookup : callable
+
+        Returns : tuple
+
+        """
+        identity = self.get(name)
+        if identity is None:
+            identity = lookup(name)
+            self.put(name, identity)
+        return identity
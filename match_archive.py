@@ -0,0 +1,501 @@
+#! /usr/bin/env python3
+"""
+Append-only columnar archive of matches, read through mmap.
+
+Each match is one row: game id, creation time, queue, and the champion,
+team, win flag and player of each of the ten seats. Every column is a
+raw binary file of fixed-width rows, mapped with numpy.memmap when read,
+so aggregations page in only the columns and rows they touch.
+
+Files in an archive directory:
+    meta.json                    committed rows, generation, players
+    <column>.<generation>.bin    one file per COLUMNS entry
+    index_offsets.<generation>.bin, index_entries.<generation>.bin
+                                 per-summoner index built by compact()
+    players.txt                  summoner names, one per line, by id
+
+Appends write past the committed end of the column files and commit by
+replacing meta.json, so a crash mid-append leaves the archive as it
+was. compact() writes the next generation's files, without duplicate
+games and sorted by time, then switches over the same way.
+
+Usage:
+    python match_archive.py import ARCHIVE FILE [FILE ...]
+    python match_archive.py compact ARCHIVE
+    python match_archive.py report ARCHIVE NAME
+"""
+import argparse
+import itertools
+import json
+import os
+import threading
+import numpy as np
+from champ_stats import COMPARISONS, ChampionStats
+from match_decode import loads, project
+from match_record import ALLIES, ENEMIES, MATCH_DTYPE
+
+
+SEATS = 10
+
+# Column name : (dtype, shape of one row)
+COLUMNS = {"game_id": ("<i8", ()), "timestamp": ("<i8", ()),
+           "queue": ("<u2", ()), "champion": ("<u2", (SEATS,)),
+           "team": ("u1", (SEATS,)), "win": ("?", (SEATS,)),
+           "player": ("<u4", (SEATS,))}
+
+
+class MatchArchive:
+    """Directory of memory-mapped match columns."""
+
+    def __init__(self, directory):
+        """
+        Initialize MatchArchive object, creating the directory if needed.
+
+        Parameters:
+            directory : str
+
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.meta = {"rows": 0, "generation": 0, "indexed": 0,
+                     "indexed_players": 0, "players": 0, "players_bytes": 0}
+        path = os.path.join(directory, "meta.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as read_file:
+                self.meta.update(json.load(read_file))
+        self.players = list()
+        if self.meta["players_bytes"]:
+            with open(self._path("players.txt"), 'rb') as read_file:
+                text = read_file.read(self.meta["players_bytes"])
+            self.players = text.decode("utf-8").split("\n")[:-1]
+        self._player_ids = {name: num for num, name in enumerate(self.players)}
+
+    def _path(self, name, generation=None):
+        """Get the path of an archive file, of a generation if given."""
+        if generation is not None:
+            name = f"{name}.{generation}.bin"
+        return os.path.join(self.directory, name)
+
+    def _commit(self, **changes):
+        """Replace meta.json with 'changes' applied. Must hold the lock."""
+        meta = dict(self.meta, **changes)
+        path = self._path("meta.json")
+        with open(path + ".tmp", 'w', encoding="utf-8") as write_file:
+            json.dump(meta, write_file)
+            write_file.flush()
+            os.fsync(write_file.fileno())
+        os.replace(path + ".tmp", path)
+        self.meta = meta
+
+    def __len__(self):
+        """Get the number of committed rows."""
+        return self.meta["rows"]
+
+    def _map(self, name, rows, generation=None):
+        """Map the first 'rows' rows of a generation's column file."""
+        # Index files are flat int64.
+        dtype, shape = COLUMNS.get(name, ("<i8", ()))
+        if generation is None:
+            generation = self.meta["generation"]
+        if rows == 0:
+            return np.zeros((0,) + shape, dtype=dtype)
+        return np.memmap(self._path(name, generation), dtype=dtype,
+                         mode='r', shape=(rows,) + shape)
+
+    def column(self, name):
+        """
+        Map a column read-only.
+
+        Parameters:
+            name : str
+                Key of COLUMNS.
+
+        Returns : numpy.ndarray
+            numpy.memmap of shape (rows,) + COLUMNS[name][1].
+
+        """
+        return self._map(name, len(self))
+
+    def player_ids(self, names):
+        """
+        Get the ids of summoner names, assigning new ones.
+
+        New names are written with the next append.
+
+        Parameters:
+            names : iterable
+
+        Returns : numpy.ndarray
+
+        """
+        ids = list()
+        with self._lock:
+            for name in names:
+                num = self._player_ids.get(name)
+                if num is None:
+                    if "\n" in name:
+                        raise ValueError(f"invalid summoner name {name!r}")
+                    num = self._player_ids[name] = len(self.players)
+                    self.players.append(name)
+                ids.append(num)
+        return np.array(ids, dtype=np.uint32)
+
+    def append_columns(self, columns):
+        """
+        Append rows given column by column.
+
+        Parameters:
+            columns : dict
+                Format : {name : numpy.ndarray} for every name in COLUMNS,
+                with player ids from player_ids().
+
+        Returns : int
+            Rows appended.
+
+        """
+        count = len(columns["game_id"])
+        with self._lock:
+            rows = len(self)
+            generation = self.meta["generation"]
+            for name, (dtype, shape) in COLUMNS.items():
+                values = np.ascontiguousarray(columns[name], dtype=dtype)
+                values = values.reshape((count,) + shape)
+                with open(self._path(name, generation), 'ab') as write_file:
+                    write_file.truncate(
+                        rows * np.dtype((dtype, shape)).itemsize)
+                    write_file.write(values.tobytes())
+                    write_file.flush()
+                    os.fsync(write_file.fileno())
+            new = "".join(name + "\n" for name in
+                          self.players[self.meta["players"]:])
+            with open(self._path("players.txt"), 'ab') as write_file:
+                write_file.truncate(self.meta["players_bytes"])
+                write_file.write(new.encode("utf-8"))
+                write_file.flush()
+                os.fsync(write_file.fileno())
+            self._commit(rows=rows + count, players=len(self.players),
+                         players_bytes=self.meta["players_bytes"] +
+                         len(new.encode("utf-8")))
+        return count
+
+    def append(self, matches, chunk=4096):
+        """
+        Append decoded matches.
+
+        Parameters:
+            matches : iterable
+                Match dicts, as from match_decode.project().
+            chunk : int
+                Matches written per commit.
+
+        Returns : int
+            Rows appended.
+
+        """
+        appended = 0
+        matches = iter(matches)
+        while True:
+            batch = list(itertools.islice(matches, chunk))
+            if not batch:
+                return appended
+            columns = {name: np.zeros((len(batch),) + shape, dtype=dtype)
+                       for name, (dtype, shape) in COLUMNS.items()}
+            names = list()
+            for row, match in enumerate(batch):
+                columns["game_id"][row] = match["gameId"]
+                columns["timestamp"][row] = match.get("gameCreation", 0)
+                columns["queue"][row] = match.get("queueId", 0)
+                seat_names = {ident["participantId"]:
+                              ident["player"]["summonerName"]
+                              for ident in match["participantIdentities"]}
+                seats = [""] * SEATS
+                for seat, part in enumerate(match["participants"][:SEATS]):
+                    columns["champion"][row, seat] = part["championId"]
+                    columns["team"][row, seat] = part["teamId"] // 100
+                    columns["win"][row, seat] = part["stats"]["win"]
+                    seats[seat] = seat_names.get(part["participantId"], "")
+                names.extend(seats)
+            columns["player"] = self.player_ids(names).reshape(-1, SEATS)
+            appended += self.append_columns(columns)
+
+    def append_payloads(self, payloads):
+        """
+        Append raw match JSON, such as the lines of an NDJSON file.
+
+        Parameters:
+            payloads : iterable
+                bytes; blank ones are skipped.
+
+        Returns : int
+            Rows appended.
+
+        """
+        return self.append(project(payload) for payload in payloads
+                           if payload.strip())
+
+    def compact(self, chunk=65536):  # pylint: disable=R0914
+        """
+        Drop repeated games, sort by time and index rows by summoner.
+
+        Parameters:
+            chunk : int
+                Rows copied at a time.
+
+        Returns : int
+            Rows dropped.
+
+        """
+        with self._lock:
+            rows = len(self)
+            old = self.meta["generation"]
+            generation = old + 1
+            game_ids = np.asarray(self._map("game_id", rows))
+            _, first = np.unique(game_ids, return_index=True)
+            timestamps = np.asarray(self._map("timestamp", rows))[first]
+            order = first[np.lexsort((game_ids[first], timestamps))]
+            for name in COLUMNS:
+                source = self._map(name, rows, old)
+                with open(self._path(name, generation), 'wb') as write_file:
+                    for start in range(0, len(order), chunk):
+                        write_file.write(np.ascontiguousarray(
+                            source[order[start:start + chunk]]).tobytes())
+                    write_file.flush()
+                    os.fsync(write_file.fileno())
+            players = np.asarray(self._map("player", len(order),
+                                           generation)).ravel()
+            offsets = np.zeros(len(self.players) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(np.bincount(
+                players, minlength=len(self.players)))
+            for name, values in (("index_offsets", offsets),
+                                 ("index_entries", np.argsort(
+                                     players, kind="stable"))):
+                with open(self._path(name, generation), 'wb') as write_file:
+                    write_file.write(values.astype("<i8").tobytes())
+            self._commit(rows=len(order), generation=generation,
+                         indexed=len(order), indexed_players=len(offsets) - 1)
+            for name in list(COLUMNS) + ["index_offsets", "index_entries"]:
+                if os.path.exists(self._path(name, old)):
+                    os.remove(self._path(name, old))
+        return rows - len(order)
+
+    def entries(self, summoner):
+        """
+        Find a summoner's seats.
+
+        Rows up to the last compaction are looked up in the index; rows
+        appended since are scanned.
+
+        Parameters:
+            summoner : str
+
+        Returns : numpy.ndarray
+            row * SEATS + seat of each of the summoner's games, in
+            archive order.
+
+        """
+        num = self._player_ids.get(summoner)
+        if num is None:
+            return np.zeros(0, dtype=np.int64)
+        indexed = self.meta["indexed"]
+        found = list()
+        if num < self.meta["indexed_players"]:
+            offsets = self._map("index_offsets",
+                                self.meta["indexed_players"] + 1)
+            found.append(np.asarray(self._map(
+                "index_entries", indexed * SEATS)[offsets[num]:
+                                                  offsets[num + 1]]))
+        tail = self.column("player")[indexed:].ravel()
+        found.append(np.flatnonzero(tail == num) + indexed * SEATS)
+        return np.concatenate(found).astype(np.int64)
+
+    def records(self, entries):  # pylint: disable=R0914
+        """
+        Build MATCH_DTYPE rows of the given seats' view of their games.
+
+        Parameters:
+            entries : numpy.ndarray
+                row * SEATS + seat, as from entries().
+
+        Returns : numpy.ndarray
+
+        """
+        rows, seats = np.divmod(entries, SEATS)
+        champions = np.asarray(self.column("champion")[rows])
+        teams = np.asarray(self.column("team")[rows])
+        every = np.arange(len(rows))
+        own_team = teams[every, seats][:, None]
+        present = champions != 0
+        allies = present & (teams == own_team)
+        allies[every, seats] = False
+        records = np.zeros(len(rows), dtype=MATCH_DTYPE)
+        records["win"] = self.column("win")[rows, seats]
+        records["champion"] = champions[every, seats]
+        for field, mask, width in (
+                ("allies", allies, ALLIES),
+                ("enemies", present & (teams != own_team), ENEMIES)):
+            picks = np.argsort(~mask, axis=1, kind="stable")[:, :width]
+            ids = np.take_along_axis(champions, picks, axis=1)
+            ids[~np.take_along_axis(mask, picks, axis=1)] = 0
+            records[field] = ids
+        return records
+
+    def champion_stats(self, summoner=None, chunk=65536):
+        """
+        Count champions like Summoner.create_stat_dict_2().
+
+        Parameters:
+            summoner : str
+                Count this summoner's games. Every seat of every game if
+                None, reading 'chunk' rows at a time.
+            chunk : int
+
+        Returns : ChampionStats
+
+        """
+        if summoner is not None:
+            return ChampionStats.from_records(
+                self.records(self.entries(summoner)))
+        stats = ChampionStats()
+        for start in range(0, len(self), chunk):
+            stats = stats.merge(self.seat_stats(start, start + chunk))
+        return stats
+
+    def seat_stats(self, start, stop):  # pylint: disable=R0914
+        """
+        Count every seat's view of rows 'start' to 'stop'.
+
+        Rather than building ten records per game, each champion is
+        weighted by how many teammates and opponents saw it and how many
+        of them won.
+
+        Parameters:
+            start : int
+            stop : int
+
+        Returns : ChampionStats
+
+        """
+        rows = slice(start, stop)
+        champions = np.asarray(self.column("champion")[rows]).ravel()
+        teams = np.asarray(self.column("team")[rows])
+        present = np.asarray(self.column("champion")[rows]) != 0
+        wins = np.asarray(self.column("win")[rows]) & present
+        counts = dict()
+        for team in (1, 2):
+            members = present & (teams == team)
+            counts[team] = (members.sum(axis=1, keepdims=True),
+                            (wins & members).sum(axis=1, keepdims=True))
+        own = teams == 1
+        same, same_wins = (np.where(own, counts[1][i], counts[2][i])
+                           for i in range(2))
+        other, other_wins = (np.where(own, counts[2][i], counts[1][i])
+                             for i in range(2))
+        weights = (present, same - 1, other, wins, same_wins - wins,
+                   other_wins)
+        size = int(champions.max(initial=0)) + 1
+        table = np.empty((size, len(weights)), dtype=np.int64)
+        for col, weight in enumerate(weights):
+            table[:, col] = np.bincount(
+                champions, (weight * present).ravel(), minlength=size)
+        return ChampionStats(table)
+
+
+def _document_matches(document, path):
+    """Get the matches of a whole JSON document read from 'path'."""
+    if isinstance(document, dict):
+        document = document.get("matches")
+    if not isinstance(document, list):
+        _not_matches(path)
+    return document
+
+
+def _not_matches(path):
+    """Raise the error for a file read_matches() can't read."""
+    raise ValueError(f"{path}: expected NDJSON matches, a JSON array of "
+                     "matches or an object with a \"matches\" array")
+
+
+def read_matches(path):
+    """
+    Yield the matches of an NDJSON file, or of a JSON document.
+
+    NDJSON is decoded a line at a time. A document, either an array of
+    matches or an object with a "matches" array like temp_data_file.json,
+    has to be read whole. Any other file raises ValueError.
+
+    Parameters:
+        path : str
+
+    Returns : generator
+        Yields dict.
+
+    """
+    with open(path, 'rb') as read_file:
+        first = read_file.readline()
+        while first and not first.strip():
+            first = read_file.readline()
+        start = first.lstrip()[:1]
+        if not start:
+            return
+        if start == b"{":
+            try:
+                match = loads(first)
+            except ValueError:
+                match = None  # An object spread over several lines.
+            if isinstance(match, dict) and "gameId" in match:
+                yield project(first)
+                for line in read_file:
+                    if line.strip():
+                        yield project(line)
+                return
+        elif start != b"[":
+            _not_matches(path)
+        read_file.seek(0)
+        yield from _document_matches(loads(read_file.read()), path)
+
+
+def top_champions(stats, k=5):
+    """
+    Rank champions for every comparison, like Summoner.comp_champ_stats().
+
+    Parameters:
+        stats : ChampionStats
+        k : int
+
+    Returns : dict
+        Format : {sort_by : rows}
+
+    """
+    return {sort_by: [stats.row(champ) for champ in stats.top_k(
+        column, k, descending, count)]
+            for sort_by, (column, descending, count) in COMPARISONS.items()}
+
+
+def main(argv=None):
+    """Import, compact or report on an archive from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import")
+    import_cmd.add_argument("archive")
+    import_cmd.add_argument("files", nargs="+")
+    compact_cmd = commands.add_parser("compact")
+    compact_cmd.add_argument("archive")
+    report_cmd = commands.add_parser("report")
+    report_cmd.add_argument("archive")
+    report_cmd.add_argument("name")
+    args = parser.parse_args(argv)
+    archive = MatchArchive(args.archive)
+    if args.command == "import":
+        for path in args.files:
+            print(f"{path}: {archive.append(read_matches(path))} matches")
+    elif args.command == "compact":
+        print(f"{archive.compact()} repeated matches dropped, "
+              f"{len(archive)} kept")
+    else:
+        print(json.dumps(top_champions(archive.champion_stats(args.name)),
+                         indent=2))
+
+
+if __name__ == "__main__":
+    main()
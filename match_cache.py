@@ -0,0 +1,329 @@
+#! /usr/bin/env python3
+"""
+Persistent store of downloaded match details.
+
+Finished matches never change, so a match only needs to be fetched from
+the API once. Payloads are kept zlib-compressed in SQLite, keyed by
+gameId. Every participant's MatchRecord of a match is indexed by
+summoner name, so a report for any player of a game already seen needs
+neither the payload nor the API. The index has its own row budget,
+since its rows outlive the payloads they came from. Per-summoner
+champion stat aggregates are kept alongside so a report only has to
+fold in games played since the last one.
+"""
+import io
+import sqlite3
+import threading
+import time
+import zlib
+import numpy as np
+from champ_stats import ChampionStats
+from match_decode import dumps, loads
+from match_record import MATCH_DTYPE, pack, unpack
+
+
+class MatchCache:  # pylint: disable=R0902
+    """SQLite-backed match payload cache with size and age eviction."""
+
+    # Cache hits whose use times are held back before being written.
+    USED_BATCH = 256
+
+    def __init__(self, path, max_bytes=None,  # pylint: disable=R0913,R0917
+                 max_age=None, max_records=None, clock=time.time):
+        """
+        Initialize MatchCache object.
+
+        Parameters:
+            path : str
+                Database file. ':memory:' keeps the cache in memory.
+            max_bytes : int
+                Compressed size to evict down to. None means no limit.
+            max_age : float
+                Seconds a match, or a participant record, is kept after
+                it was stored. None means no limit.
+            max_records : int
+                Participant records to evict down to, least recently
+                used first. None means no limit.
+            clock : callable
+                Returns the current time in seconds.
+
+        """
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_records = max_records
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.record_hits = 0
+        self._used = dict()
+        self._used_records = dict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS matches ("
+                         "game_id INTEGER PRIMARY KEY, "
+                         "stored REAL NOT NULL, "
+                         "used REAL NOT NULL, "
+                         "size INTEGER NOT NULL, "
+                         "payload BLOB NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS participants ("
+                         "summoner TEXT NOT NULL, "
+                         "game_id INTEGER NOT NULL, "
+                         "stored REAL NOT NULL, "
+                         "record BLOB NOT NULL, "
+                         "used REAL NOT NULL, "
+                         "PRIMARY KEY (summoner, game_id)) WITHOUT ROWID")
+        if "used" not in [column[1] for column in self._db.execute(
+                "PRAGMA table_info(participants)")]:
+            self._db.execute("ALTER TABLE participants "
+                             "ADD COLUMN used REAL NOT NULL DEFAULT 0")
+        self._db.execute("CREATE TABLE IF NOT EXISTS aggregates ("
+                         "key TEXT PRIMARY KEY, "
+                         "last_timestamp INTEGER NOT NULL, "
+                         "last_game_id INTEGER NOT NULL, "
+                         "stats BLOB NOT NULL)")
+        self._db.commit()
+        self.evict()
+
+    def get(self, game_id):
+        """
+        Get a cached match.
+
+        Parameters:
+            game_id : int
+
+        Returns : dict
+            None if the match is not cached.
+
+        """
+        payload = self.get_payload(game_id)
+        if payload is None:
+            return None
+        return loads(payload)
+
+    def get_payload(self, game_id):
+        """
+        Get a cached match as JSON, without decoding it.
+
+        Parameters:
+            game_id : int
+
+        Returns : bytes
+            None if the match is not cached.
+
+        """
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM matches "
+                                   "WHERE game_id = ?",
+                                   (game_id,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used[game_id] = self.clock()
+            if len(self._used) >= self.USED_BATCH:
+                self._write_used()
+                self._db.commit()
+        return zlib.decompress(row[0])
+
+    def _write_used(self):
+        """Write held back use times, without committing. Lock held."""
+        self._db.executemany("UPDATE matches SET used = ? WHERE game_id = ?",
+                             [(used, game_id) for game_id, used
+                              in self._used.items()])
+        self._db.executemany("UPDATE participants SET used = ? "
+                             "WHERE summoner = ? AND game_id = ?",
+                             [(used, summoner, game_id)
+                              for (summoner, game_id), used
+                              in self._used_records.items()])
+        self._used.clear()
+        self._used_records.clear()
+
+    def put(self, game_id, match):
+        """
+        Store a match.
+
+        Parameters:
+            game_id : int
+            match : dict
+
+        """
+        self.put_payload(game_id, dumps(match))
+
+    def put_payload(self, game_id, payload):
+        """
+        Store a match's JSON as received.
+
+        Parameters:
+            game_id : int
+            payload : bytes
+
+        """
+        payload = zlib.compress(payload)
+        now = self.clock()
+        with self._lock:
+            self._used.pop(game_id, None)
+            self._write_used()
+            self._db.execute("INSERT OR REPLACE INTO matches "
+                             "VALUES (?, ?, ?, ?, ?)",
+                             (game_id, now, now, len(payload), payload))
+            self._db.commit()
+
+    def get_record(self, game_id, summoner):
+        """
+        Get one participant's view of an indexed match.
+
+        Parameters:
+            game_id : int
+            summoner : str
+                Summoner name as it appears in the match.
+
+        Returns : MatchRecord
+            None if the match was not indexed for that summoner.
+
+        """
+        with self._lock:
+            row = self._db.execute("SELECT record FROM participants "
+                                   "WHERE summoner = ? AND game_id = ?",
+                                   (summoner, game_id)).fetchone()
+            if row is None:
+                return None
+            self.record_hits += 1
+            self._used_records[summoner, game_id] = self.clock()
+            if len(self._used_records) >= self.USED_BATCH:
+                self._write_used()
+                self._db.commit()
+        return unpack(np.frombuffer(row[0], dtype=MATCH_DTYPE)[0])
+
+    def put_records(self, game_id, records):
+        """
+        Index every participant's view of a match.
+
+        Parameters:
+            game_id : int
+            records : dict
+                Format : {summoner : MatchRecord}
+
+        """
+        rows = pack(records.values())
+        now = self.clock()
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO participants "
+                                 "VALUES (?, ?, ?, ?, ?)",
+                                 [(summoner, game_id, now, row.tobytes(),
+                                   now)
+                                  for summoner, row in zip(records, rows)])
+            self._db.commit()
+
+    def evict(self):
+        """
+        Drop expired matches, then least recently used ones over max_bytes.
+
+        Participant records expire with max_age too, then the least
+        recently used ones over max_records go. They are evicted apart
+        from the payloads: at 21 bytes each they outlive them.
+
+        Hits are only written here, when a match is stored, on close()
+        and every USED_BATCH hits, so each hit doesn't cost a commit.
+
+        Returns : int
+            Number of matches removed.
+
+        """
+        removed = 0
+        with self._lock:
+            # Take the write lock before reading, or two caches on one
+            # file can each wait for the other to stop reading.
+            self._db.execute("BEGIN IMMEDIATE")
+            self._write_used()
+            if self.max_age is not None:
+                removed += self._db.execute(
+                    "DELETE FROM matches WHERE stored < ?",
+                    (self.clock() - self.max_age,)).rowcount
+                self._db.execute("DELETE FROM participants WHERE stored < ?",
+                                 (self.clock() - self.max_age,))
+            if self.max_bytes is not None:
+                total = 0
+                rows = self._db.execute("SELECT game_id, size FROM matches "
+                                        "ORDER BY used DESC, game_id DESC")
+                doomed = list()
+                for game_id, size in rows.fetchall():
+                    total += size
+                    if total > self.max_bytes:
+                        doomed.append((game_id,))
+                self._db.executemany("DELETE FROM matches WHERE game_id = ?",
+                                     doomed)
+                removed += len(doomed)
+            if self.max_records is not None:
+                self._db.execute("DELETE FROM participants "
+                                 "WHERE (summoner, game_id) IN ("
+                                 "SELECT summoner, game_id FROM participants "
+                                 "ORDER BY used DESC, game_id DESC "
+                                 "LIMIT -1 OFFSET ?)", (self.max_records,))
+            self._db.commit()
+        return removed
+
+    def get_aggregate(self, key):
+        """
+        Get a saved champion stat aggregate.
+
+        Parameters:
+            key : str
+
+        Returns : tuple
+            Format : (stats : ChampionStats, last_timestamp : int,
+            last_game_id : int). None if nothing is saved.
+
+        """
+        with self._lock:
+            row = self._db.execute("SELECT stats, last_timestamp, "
+                                   "last_game_id FROM aggregates "
+                                   "WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        table = np.load(io.BytesIO(zlib.decompress(row[0])))
+        return ChampionStats(table), row[1], row[2]
+
+    def put_aggregate(self, key, stats, last_timestamp, last_game_id):
+        """
+        Save a champion stat aggregate and the newest game it includes.
+
+        Parameters:
+            key : str
+            stats : ChampionStats
+            last_timestamp : int
+            last_game_id : int
+
+        """
+        buffer = io.BytesIO()
+        np.save(buffer, stats.table)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO aggregates "
+                             "VALUES (?, ?, ?, ?)",
+                             (key, last_timestamp, last_game_id,
+                              zlib.compress(buffer.getvalue())))
+            self._db.commit()
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns : dict
+            Keys : hits, misses, entries, bytes, record_hits, records
+
+        """
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) "
+                "FROM matches").fetchone()
+            records = self._db.execute(
+                "SELECT COUNT(*) FROM participants").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": entries, "bytes": size,
+                "record_hits": self.record_hits, "records": records}
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._write_used()
+            self._db.commit()
+            self._db.close()
@@ -0,0 +1,151 @@
+#! /usr/bin/env python3
+"""
+Fast JSON decoding, and decoding of match payloads to the fields used.
+
+get_match_data() only reads who played which champion on which team
+and whether they won; MatchArchive also keeps when and in which queue
+the game was played. project() decodes a raw match payload for them
+with the fastest parser installed:
+
+    simdjson : parsed lazily; only those fields ever become Python
+               objects.
+    orjson   : the whole match is decoded, in C.
+    json     : the whole match is decoded.
+
+Neither simdjson nor orjson is required.
+"""
+import json
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+
+MATCH_FIELDS = ("gameId", "gameCreation", "queueId")
+PARTICIPANT_FIELDS = ("participantId", "teamId", "championId")
+
+
+def backends():
+    """
+    Get the projection backends that can be used, fastest first.
+
+    Returns : list
+
+    """
+    found = [name for name, module in (("simdjson", simdjson),
+                                       ("orjson", orjson)) if module]
+    return found + ["json"]
+
+
+def loads(payload):
+    """
+    Decode a whole JSON document.
+
+    Parameters:
+        payload : bytes or str
+
+    Returns : object
+
+    """
+    if orjson is not None:
+        return orjson.loads(payload)  # pylint: disable=E1101
+    return json.loads(payload)
+
+
+def dumps(content):
+    """
+    Encode JSON compactly, on one line.
+
+    Parameters:
+        content : object
+
+    Returns : bytes
+
+    """
+    if orjson is not None:
+        return orjson.dumps(content)  # pylint: disable=E1101
+    return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+
+def ndjson_line(payload):
+    """
+    Get a payload as one NDJSON line, newline included.
+
+    Parameters:
+        payload : bytes
+
+    Returns : bytes
+
+    """
+    if b"\n" in payload or b"\r" in payload:
+        payload = dumps(loads(payload))
+    return payload + b"\n"
+
+
+def project_tree(match):
+    """
+    Copy the fields get_match_data() and MatchArchive read out of a match.
+
+    Parameters:
+        match : dict or simdjson.Object
+
+    Returns : dict
+
+    """
+    projected = {key: match[key] for key in MATCH_FIELDS if key in match}
+    projected["participantIdentities"] = [
+        {"participantId": ident["participantId"],
+         "player": {"summonerName": ident["player"]["summonerName"]}}
+        for ident in match["participantIdentities"]]
+    projected["participants"] = [
+        dict({key: part[key] for key in PARTICIPANT_FIELDS},
+             stats={"win": part["stats"]["win"]})
+        for part in match["participants"]]
+    return projected
+
+
+_PARSERS = threading.local()
+
+
+def _simdjson_parser():
+    """Get this thread's simdjson parser, which is not thread-safe."""
+    parser = getattr(_PARSERS, "parser", None)
+    if parser is None:
+        parser = _PARSERS.parser = simdjson.Parser()
+    return parser
+
+
+def project(payload, backend=None):
+    """
+    Decode a match payload for get_match_data().
+
+    Parameters:
+        payload : bytes
+            Match JSON, as returned by the API.
+        backend : str
+            One of backends(). Defaults to the fastest.
+
+    Returns : dict
+        With simdjson, only {gameId, gameCreation, queueId,
+        participantIdentities : [{participantId, player :
+        {summonerName}}], participants : [{participantId, teamId,
+        championId, stats : {win}}]}. Otherwise the whole match.
+
+    """
+    if backend is None:
+        backend = backends()[0]
+    elif backend not in backends():
+        raise ValueError(f"JSON backend {backend!r} is not available")
+    if backend == "simdjson":
+        # Copy out of the lazy document before the parser is reused.
+        return project_tree(_simdjson_parser().parse(payload))
+    if backend == "orjson":
+        return orjson.loads(payload)  # pylint: disable=E1101
+    return json.loads(payload)
@@ -0,0 +1,491 @@
+#! /usr/bin/env python3
+"""
+Match pipeline behind Summoner reports.
+
+Requests go to the Riot API through the region's client. Matchlists are
+paged as they are read, match details are downloaded on a thread pool
+in matchlist order and kept in the match cache, and each game is
+decoded into a MatchRecord, from the cache's participant index where
+it has one.
+"""
+import collections
+import concurrent.futures
+import os
+import tempfile
+import requests
+from match_cache import MatchCache
+from match_decode import loads, ndjson_line, project
+from match_record import MatchRecord, MatchRecords
+
+
+class MatchPipelineMixin:
+    """
+    Riot API requests and match downloads for Summoner.
+
+    Settings come from the class it is mixed into: region, clients,
+    API_BASE, SEASON, QUEUE, match_workers, index_participants, verbose
+    and the MATCH_CACHE_* settings, as do '_match_cache', '_lock' and
+    _stage().
+    """
+
+    @property
+    def match_cache(self):
+        """Get the match cache, opened on first use. None if disabled."""
+        with self._lock:
+            if self._match_cache is None:
+                self._match_cache = self.open_match_cache(self.region)
+            return self._match_cache
+
+    @classmethod
+    def open_match_cache(cls, region):
+        """
+        Open a region's match cache with the class settings.
+
+        Parameters:
+            region : str
+
+        Returns : MatchCache
+            None if MATCH_CACHE_PATH is None.
+
+        """
+        if cls.MATCH_CACHE_PATH is None:
+            return None
+        return MatchCache(cls.match_cache_path(region),
+                          cls.MATCH_CACHE_MAX_BYTES,
+                          max_records=cls.MATCH_CACHE_MAX_RECORDS)
+
+    @classmethod
+    def match_cache_path(cls, region):
+        """
+        Get a region's match cache file.
+
+        Game ids are only unique within a region, so each region has
+        its own file.
+
+        Parameters:
+            region : str
+
+        Returns : str
+
+        """
+        root, ext = os.path.splitext(cls.MATCH_CACHE_PATH)
+        return f"{root}-{region}{ext}"
+
+    @property
+    def client(self):
+        """Get the client for this summoner's region."""
+        return self.clients.get(self.region)
+
+    @property
+    def api_base(self):
+        """Get the API url for this summoner's region."""
+        return self.API_BASE.format(platform=self.region)
+
+    def handle_request(self, ext, **queries):
+        """
+        Handle API request.
+
+        Return result if successful. Rate limits, server errors and
+        connection failures are retried by the client; other errors are
+        raised.
+
+        Parameters:
+            ext : str
+                Riot API request url extension. Appended to 'base.'
+            queries : str
+                Key-value pairs passed in to form querystring.
+        Returns : dict
+
+        """
+        return loads(self.handle_raw_request(ext, **queries))
+
+    def handle_raw_request(self, ext, **queries):
+        """
+        Handle API request, returning the response body undecoded.
+
+        Errors are handled as in handle_request().
+
+        Parameters:
+            ext : str
+            queries : str
+
+        Returns : bytes
+
+        """
+        querystring = {key: value for key, value in queries.items()}
+        url = f"{self.api_base}{ext}"
+        try:
+            return self.client.get(url, querystring).content
+        except requests.exceptions.HTTPError as http_except:
+            if self.verbose:
+                print(f"HTTP Error: {http_except}")
+            raise
+
+    def get_matchlist_by_summoner(self, summ_name, api_key, begin_time=None):
+        """
+        Get summoner's games for current season.
+
+        Parameters:
+            summ_name : str
+            api_key : str
+            begin_time : int
+                Only list games from this epoch millisecond on.
+
+        Returns : dict
+
+        """
+        account_id = self.get_summoner_by_name(summ_name, api_key)[2]
+        query = {"season": self.SEASON, "queue": self.QUEUE,
+                 "api_key": api_key}
+        if begin_time is not None:
+            query["beginTime"] = begin_time
+        match_list = self.handle_request(f"match/v4/matchlists/by-account/\
+{account_id}", **query)
+        return match_list
+
+    def iter_matchlist(self, account_id, api_key, limit=None,
+                       begin_time=None):
+        """
+        Yield the summoner's games for current season, newest first.
+
+        Pages of up to 100 games are requested with beginIndex/endIndex
+        as the generator is consumed, until the list runs out.
+
+        Parameters:
+            account_id : str
+            api_key : str
+            limit : int
+                Most games to yield. None yields every game.
+            begin_time : int
+                Only list games from this epoch millisecond on.
+
+        Returns : generator
+            Yields dict.
+
+        """
+        query = {"season": self.SEASON, "queue": self.QUEUE,
+                 "api_key": api_key}
+        if begin_time is not None:
+            query["beginTime"] = begin_time
+        begin = 0
+        while limit is None or begin < limit:
+            end = begin + 100
+            if limit is not None:
+                end = min(end, limit)
+            page = self.handle_request(f"match/v4/matchlists/by-account/\
+{account_id}", beginIndex=begin, endIndex=end, **query)
+            yield from page["matches"]
+            if len(page["matches"]) < end - begin:
+                return
+            begin = end
+
+    def iter_match_details(self, matchlist, api_key, workers=None,
+                           raw=False):
+        """
+        Yield detailed data for each match, in matchlist order.
+
+        Match details are fetched on a pool of worker threads that share
+        the rate limiter, with at most two per worker held at once.
+        Matches already in the match cache are not requested again.
+
+        Parameters:
+            matchlist : dict or iterable
+                A matchlist response, or its "matches" entries.
+            api_key : str
+            workers : int
+                Number of concurrent downloads. Defaults to match_workers.
+            raw : bool
+                Yield each match's JSON undecoded.
+
+        Returns : generator
+            Yields dict, or bytes if raw.
+
+        """
+        fetch = self.get_match_payload if raw else self.get_match
+        return self._fetch_in_order(
+            matchlist, lambda match_id: fetch(match_id, api_key), workers)
+
+    def _fetch_in_order(self, matchlist, fetch, workers=None):
+        """
+        Yield fetch(gameId) for each match, in matchlist order.
+
+        Calls run on a pool of worker threads, with at most two per
+        worker held at once.
+
+        Parameters:
+            matchlist : dict or iterable
+            fetch : callable
+            workers : int
+                Defaults to match_workers.
+
+        Returns : generator
+
+        """
+        if workers is None:
+            workers = self.match_workers
+        if isinstance(matchlist, dict):
+            matchlist = matchlist["matches"]
+        match_ids = (match["gameId"] for match in matchlist)
+        if self.verbose:
+            print("Updating stats...")
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            window = collections.deque()
+            for match_id in match_ids:
+                window.append(pool.submit(fetch, match_id))
+                if len(window) >= 2 * workers:
+                    yield self._next_match(window)
+            while window:
+                yield self._next_match(window)
+        if self.verbose:
+            print("Stats updated.")
+        if self.match_cache is not None:
+            self.match_cache.evict()
+
+    def _next_match(self, window):
+        """Wait for the oldest download in a window of futures."""
+        with self._stage("match_wait"):
+            return self._checked_match(window.popleft().result())
+
+    @staticmethod
+    def _checked_match(match):
+        """
+        Raise TypeError for a match that failed to download.
+
+        Parameters:
+            match : dict
+
+        Returns : dict
+
+        """
+        if match is None:
+            print(f"Failure retrieving match {match}")
+            raise TypeError
+        return match
+
+    def stream_match_data(self, summoner, matchlist, api_key, raw_file=None):
+        """
+        Yield get_match_data() for each match as it arrives.
+
+        With index_participants, a match already indexed for the
+        summoner, because any of its ten players was reported on, is
+        read from the match cache's index without fetching or decoding
+        its payload. Other matches are decoded with project(), and
+        every participant's record is indexed.
+
+        Parameters:
+            summoner : str
+            matchlist : dict or iterable
+            api_key : str
+            raw_file : str
+                Also append each raw match to this NDJSON file. Every
+                payload is then fetched.
+
+        Returns : generator
+            Yields MatchRecord.
+
+        """
+        if raw_file is None:
+            yield from self._fetch_in_order(
+                matchlist,
+                lambda match_id: self.get_match_record(match_id, api_key,
+                                                       summoner))
+            return
+
+        def fetch(match_id):
+            payload = self.get_match_payload(match_id, api_key)
+            return payload, self._index_match(match_id, payload, summoner)
+
+        with open(raw_file, 'ab') as write_file:
+            for payload, record in self._fetch_in_order(matchlist, fetch):
+                write_file.write(ndjson_line(payload))
+                yield record
+
+    def get_match_record(self, match_id, api_key, summoner):
+        """
+        Get get_match_data() for one match, from the index if possible.
+
+        Parameters:
+            match_id : int
+            api_key : str
+            summoner : str
+
+        Returns : MatchRecord
+
+        """
+        if self.index_participants and self.match_cache is not None:
+            record = self.match_cache.get_record(match_id, summoner)
+            if record is not None:
+                return record
+        return self._index_match(
+            match_id, self.get_match_payload(match_id, api_key), summoner)
+
+    def _index_match(self, match_id, payload, summoner):
+        """
+        Decode a match, index all of its participants and get one's data.
+
+        Timed as "match_parse".
+
+        Returns : MatchRecord
+
+        """
+        with self._stage("match_parse"):
+            game = project(payload)
+            if not self.index_participants or self.match_cache is None:
+                return self.get_match_data(game, summoner)
+            records = self.get_participant_data(game)
+            self.match_cache.put_records(match_id, records)
+            if summoner in records:
+                return records[summoner]
+            return self.get_match_data(game, summoner)
+
+    def compile_match_list(self, matchlist, api_key, workers=None,
+                           file_name=None):
+        """
+        Save detailed data for each match to an NDJSON file.
+
+        Only needed to keep raw matches; reports stream them instead.
+
+        Parameters:
+            matchlist : dict or iterable
+            api_key : str
+            workers : int
+            file_name : str
+                Defaults to a new matches-*.ndjson file in the working
+                directory.
+
+        Returns : str
+            Name of the file written.
+
+        """
+        if file_name is None:
+            handle, file_name = tempfile.mkstemp(prefix="matches-",
+                                                 suffix=".ndjson", dir=".")
+            os.close(handle)
+        try:
+            with open(file_name, 'wb') as write_file:
+                for payload in self.iter_match_details(matchlist, api_key,
+                                                       workers, raw=True):
+                    write_file.write(ndjson_line(payload))
+        except Exception:
+            os.remove(file_name)
+            raise
+        return file_name
+
+    def get_match(self, match_id, api_key):
+        """
+        Get detailed data for one match, from the match cache if possible.
+
+        Parameters:
+            match_id : int
+            api_key : str
+
+        Returns : dict
+
+        """
+        return loads(self.get_match_payload(match_id, api_key))
+
+    def get_match_payload(self, match_id, api_key):
+        """
+        Get one match's JSON, from the match cache if possible.
+
+        Parameters:
+            match_id : int
+            api_key : str
+
+        Returns : bytes
+
+        """
+        if self.match_cache is not None:
+            cached = self.match_cache.get_payload(match_id)
+            if cached is not None:
+                return cached
+        query = {"api_key": api_key}
+        payload = self.handle_raw_request(f"match/v4/matches/{match_id}",
+                                          **query)
+        if self.match_cache is not None:
+            self.match_cache.put_payload(match_id, payload)
+        return payload
+
+    @staticmethod
+    def get_match_data(game, summoner):
+        """
+        Get data from match.
+
+        Gets win/loss value, summoner's champion, teammates' champions, and
+        opponents' champions.
+
+        Parameters:
+            game : dict
+            summoner : str
+
+        Returns : MatchRecord
+
+        """
+        for summ in game["participantIdentities"]:
+            if summ["player"]["summonerName"] == summoner:
+                player_id = summ["participantId"]
+                player_stats = game["participants"][player_id-1]
+                player_team = player_stats["teamId"]
+                player_champion = player_stats["championId"]
+                player_win = player_stats["stats"]["win"]
+
+        if player_team == 100:
+            teammates = [summ for summ in game["participants"][0:5]
+                         if summ["participantId"] != player_id]
+            opponents = [summ for summ in game["participants"][5:10]]
+        else:
+            teammates = [summ for summ in game["participants"][5:10]
+                         if summ["participantId"] != player_id]
+            opponents = [summ for summ in game["participants"][0:5]]
+
+        team = [summoner["championId"] for summoner in teammates]
+        enemy = [summoner["championId"] for summoner in opponents]
+
+        return_data = MatchRecord(player_win, player_champion, team, enemy)
+        return return_data
+
+    @staticmethod
+    def get_participant_data(game):
+        """
+        Get get_match_data() of a match for each of its players at once.
+
+        Parameters:
+            game : dict
+
+        Returns : dict
+            Format : {summoner name : MatchRecord}
+
+        """
+        names = {ident["participantId"]: ident["player"]["summonerName"]
+                 for ident in game["participantIdentities"]}
+        teams = {100: game["participants"][0:5],
+                 200: game["participants"][5:10]}
+        records = dict()
+        for team, players in teams.items():
+            enemy = [summ["championId"]
+                     for summ in teams[200 if team == 100 else 100]]
+            for player in players:
+                allies = [summ["championId"] for summ in players
+                          if summ is not player]
+                records[names[player["participantId"]]] = MatchRecord(
+                    player["stats"]["win"], player["championId"], allies,
+                    enemy)
+        return records
+
+    def get_match_list_data(self, summoner, temp_file):
+        """
+        Make list of results from get_match_data().
+
+        Parameters :
+            summoner : str
+            temp_file : str
+                NDJSON file written by compile_match_list().
+
+        Returns : MatchRecords
+
+        """
+        with open(temp_file, 'rb') as data:
+            ret_list = MatchRecords.from_iterable(
+                self.get_match_data(project(line), summoner)
+                for line in data if line.strip())
+        return ret_list
@@ -0,0 +1,283 @@
+#! /usr/bin/env python3
+"""
+Compact representation of the part of a match a report needs.
+
+A match is reduced to the player's win flag, their champion, up to four
+ally and five enemy champion ids. MatchRecord holds one such match in a
+slotted object; MatchRecords packs many into a structured numpy array
+of MATCH_DTYPE rows, 21 bytes each. Unused id slots hold 0, which is
+never a champion id.
+"""
+import itertools
+import numpy as np
+
+
+ALLIES = 4
+ENEMIES = 5
+MATCH_DTYPE = np.dtype([("win", "?"), ("champion", "<u2"),
+                        ("allies", "<u2", (ALLIES,)),
+                        ("enemies", "<u2", (ENEMIES,))])
+
+
+class MatchRecord:
+    """
+    One match as seen by one player.
+
+    Unpacks and indexes like the (win, champion, allies, enemies) tuples
+    get_match_data() used to return.
+    """
+
+    __slots__ = ("win", "champion", "allies", "enemies")
+
+    def __init__(self, win, champion, allies, enemies):
+        """
+        Initialize MatchRecord object.
+
+        Parameters:
+            win : bool
+            champion : int
+            allies : iterable
+                Teammates' champion ids, at most four.
+            enemies : iterable
+                Opponents' champion ids, at most five.
+
+        """
+        self.win = bool(win)
+        self.champion = champion
+        self.allies = tuple(allies)
+        self.enemies = tuple(enemies)
+
+    def __iter__(self):
+        """Iterate as (win, champion, allies, enemies)."""
+        return iter((self.win, self.champion, self.allies, self.enemies))
+
+    def __getitem__(self, index):
+        """Index as (win, champion, allies, enemies)."""
+        return tuple(self)[index]
+
+    def __len__(self):
+        """Get the number of fields."""
+        return 4
+
+    def __eq__(self, other):
+        """Compare field by field."""
+        if not isinstance(other, MatchRecord):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __hash__(self):
+        """Hash the fields."""
+        return hash(tuple(self))
+
+    def __repr__(self):
+        """Get a readable representation."""
+        return (f"MatchRecord({self.win}, {self.champion}, {self.allies}, "
+                f"{self.enemies})")
+
+
+def slots(groups, width):
+    """
+    Pack lists of champion ids into rows of fixed width, padded with 0.
+
+    Parameters:
+        groups : list
+            One sequence of ids per match.
+        width : int
+
+    Returns : numpy.ndarray
+
+    """
+    lengths = np.fromiter(map(len, groups), dtype=np.intp,
+                          count=len(groups))
+    if lengths.max(initial=0) > width:
+        raise ValueError(f"{lengths.max()} champions do not fit in "
+                         f"{width} slots")
+    ids = np.fromiter(itertools.chain.from_iterable(groups), dtype=np.uint16,
+                      count=int(lengths.sum()))
+    rows = np.zeros((len(groups), width), dtype=np.uint16)
+    rows[np.arange(width) < lengths[:, None]] = ids
+    return rows
+
+
+def pack(matches):
+    """
+    Convert matches to a MATCH_DTYPE array.
+
+    Parameters:
+        matches : iterable
+            MatchRecord objects or (win, champion, allies, enemies)
+            tuples.
+
+    Returns : numpy.ndarray
+
+    """
+    matches = list(matches)
+    array = np.zeros(len(matches), dtype=MATCH_DTYPE)
+    if not matches:
+        return array
+    if all(isinstance(m, MatchRecord) for m in matches):
+        wins = [m.win for m in matches]
+        champions = [m.champion for m in matches]
+        allies = [m.allies for m in matches]
+        enemies = [m.enemies for m in matches]
+    else:
+        wins = [bool(m[0]) for m in matches]
+        champions = [m[1] for m in matches]
+        allies = [m[2] for m in matches]
+        enemies = [m[3] for m in matches]
+    array["win"] = wins
+    array["champion"] = champions
+    array["allies"] = slots(allies, ALLIES)
+    array["enemies"] = slots(enemies, ENEMIES)
+    return array
+
+
+def unpack(row):
+    """
+    Convert one MATCH_DTYPE row to a MatchRecord.
+
+    Parameters:
+        row : numpy.void
+
+    Returns : MatchRecord
+
+    """
+    return MatchRecord(bool(row["win"]), int(row["champion"]),
+                       [i for i in row["allies"].tolist() if i],
+                       [i for i in row["enemies"].tolist() if i])
+
+
+class MatchRecords:
+    """Growable MATCH_DTYPE array of matches."""
+
+    def __init__(self, capacity=0):
+        """
+        Initialize MatchRecords object.
+
+        Parameters:
+            capacity : int
+                Rows to allocate up front.
+
+        """
+        self._array = np.zeros(capacity, dtype=MATCH_DTYPE)
+        self._size = 0
+
+    @classmethod
+    def from_iterable(cls, matches, chunk=4096):
+        """
+        Pack matches, converting a chunk at a time.
+
+        The buffer is trimmed to the number of matches afterwards.
+
+        Parameters:
+            matches : iterable
+            chunk : int
+
+        Returns : MatchRecords
+
+        """
+        records = cls()
+        records.extend(matches, chunk)
+        records._array = records.array.copy()
+        return records
+
+    @property
+    def array(self):
+        """Get the filled rows as a MATCH_DTYPE array view."""
+        return self._array[:self._size]
+
+    @property
+    def nbytes(self):
+        """Get the bytes used by the filled rows."""
+        return self.array.nbytes
+
+    def _reserve(self, size):
+        """Grow the buffer, doubling, to hold at least size rows."""
+        if size <= len(self._array):
+            return
+        grown = np.zeros(max(size, 2 * len(self._array)), dtype=MATCH_DTYPE)
+        grown[:self._size] = self.array
+        self._array = grown
+
+    def append(self, match):
+        """
+        Add one match.
+
+        Parameters:
+            match : MatchRecord or tuple
+
+        """
+        self.extend((match,))
+
+    def extend(self, matches, chunk=4096):
+        """
+        Add matches, converting a chunk at a time.
+
+        Parameters:
+            matches : iterable
+            chunk : int
+
+        """
+        matches = iter(matches)
+        while True:
+            packed = pack(itertools.islice(matches, chunk))
+            if packed.size == 0:
+                return
+            self._reserve(self._size + len(packed))
+            self._array[self._size:self._size + len(packed)] = packed
+            self._size += len(packed)
+
+    def __len__(self):
+        """Get the number of matches."""
+        return self._size
+
+    def __getitem__(self, index):
+        """Get one match as a MatchRecord."""
+        return unpack(self.array[index])
+
+    def __iter__(self):
+        """Iterate over matches as MatchRecord objects."""
+        return (unpack(row) for row in self.array)
+
+    def __eq__(self, other):
+        """Compare with other records or a sequence of matches."""
+        if isinstance(other, MatchRecords):
+            return np.array_equal(self.array, other.array)
+        try:
+            return np.array_equal(self.array, pack(other))
+        except (TypeError, ValueError, IndexError):
+            return NotImplemented
+
+    __hash__ = None
+
+
+def fold(matches, count, empty, chunk=65536):
+    """
+    Count matches in packed chunks, merging the counts as they go.
+
+    A stream of matches is never held in memory at once.
+
+    Parameters:
+        matches : iterable
+            MatchRecords, or MatchRecord objects or (win, champion,
+            allies, enemies) tuples.
+        count : callable
+            count(records) counts a MATCH_DTYPE array.
+        empty : object
+            Count of no matches, with a merge() method.
+        chunk : int
+            Matches packed at a time.
+
+    Returns : object
+        Same type as 'empty'.
+
+    """
+    if isinstance(matches, MatchRecords):
+        return count(matches.array)
+    total = empty
+    matches = iter(matches)
+    while True:
+        batch = pack(itertools.islice(matches, chunk))
+        if batch.size == 0:
+            return total
+        total = total.merge(count(batch))
@@ -0,0 +1,232 @@
+#! /usr/bin/env python3
+"""
+Pairwise champion statistics.
+
+For every champion a player used, counts games and wins together with
+each ally champion and against each enemy champion. Champions are mapped
+to dense indices, so the matrices are (n, n) over the n champions seen
+rather than over every possible champion id.
+"""
+import numpy as np
+from match_record import fold
+
+
+RELATIONS = ("ally", "enemy")
+
+
+class PairStats:
+    """Own champion x ally and own champion x enemy game and win counts."""
+
+    def __init__(self, ids=None, games=None, wins=None):
+        """
+        Initialize PairStats object.
+
+        Parameters:
+            ids : numpy.ndarray
+                Sorted champion ids; row and column i belong to ids[i].
+            games : dict
+                Format : {relation : (n, n) numpy.ndarray}
+                Games with own champion ids[row] and ally or enemy
+                ids[column], for relation in RELATIONS.
+            wins : dict
+                Same format as 'games', counting won games.
+
+        """
+        if ids is None:
+            ids = np.zeros(0, dtype=np.int64)
+        self.ids = ids
+        size = (len(ids), len(ids))
+        self.games = games or {rel: np.zeros(size, dtype=np.int64)
+                               for rel in RELATIONS}
+        self.wins = wins or {rel: np.zeros(size, dtype=np.int64)
+                             for rel in RELATIONS}
+
+    @classmethod
+    def from_matches(cls, matches, chunk=65536):
+        """
+        Count pairs over matches.
+
+        Parameters:
+            matches : iterable
+                MatchRecords, or MatchRecord objects or (win, champion,
+                team, enemy) tuples.
+            chunk : int
+                Matches packed at a time.
+
+        Returns : PairStats
+
+        """
+        return fold(matches, cls.from_records, cls(), chunk)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Count pairs over a MATCH_DTYPE array in one pass.
+
+        Parameters:
+            records : numpy.ndarray
+
+        Returns : PairStats
+
+        """
+        own = records["champion"].astype(np.int64)
+        others = {"ally": records["allies"], "enemy": records["enemies"]}
+        ids = np.union1d(own, np.concatenate(
+            [group.ravel() for group in others.values()]))
+        ids = ids[ids != 0]
+        size = len(ids)
+        rows = np.searchsorted(ids, own)
+        games = dict()
+        wins = dict()
+        for rel, group in others.items():
+            mask = group != 0
+            flat = (np.broadcast_to(rows[:, None], group.shape)[mask] * size +
+                    np.searchsorted(ids, group[mask]))
+            won = np.broadcast_to(records["win"][:, None], group.shape)[mask]
+            games[rel] = np.bincount(flat, minlength=size * size).reshape(
+                size, size)
+            wins[rel] = np.bincount(flat[won], minlength=size * size).reshape(
+                size, size)
+        return cls(ids, games, wins)
+
+    def expanded(self, ids):
+        """
+        Get the counters re-indexed onto more champions.
+
+        Parameters:
+            ids : numpy.ndarray
+                Sorted champion ids, a superset of self.ids.
+
+        Returns : tuple
+            Format : (games : dict, wins : dict), as in __init__().
+
+        """
+        where = np.searchsorted(ids, self.ids)
+        index = np.ix_(where, where)
+        games = dict()
+        wins = dict()
+        for rel in RELATIONS:
+            games[rel] = np.zeros((len(ids), len(ids)), dtype=np.int64)
+            wins[rel] = np.zeros((len(ids), len(ids)), dtype=np.int64)
+            games[rel][index] = self.games[rel]
+            wins[rel][index] = self.wins[rel]
+        return games, wins
+
+    def merge(self, other):
+        """
+        Add two sets of counters.
+
+        Parameters:
+            other : PairStats
+
+        Returns : PairStats
+
+        """
+        ids = np.union1d(self.ids, other.ids)
+        games, wins = self.expanded(ids)
+        other_games, other_wins = other.expanded(ids)
+        for rel in RELATIONS:
+            games[rel] += other_games[rel]
+            wins[rel] += other_wins[rel]
+        return PairStats(ids, games, wins)
+
+    def pair(self, champion, other, relation="ally"):
+        """
+        Get the counters of one pair.
+
+        Parameters:
+            champion : int
+                Champion the player used.
+            other : int
+                Ally or enemy champion.
+            relation : str
+                "ally" or "enemy".
+
+        Returns : tuple
+            Format : (games : int, wins : int)
+
+        """
+        row = self._index(champion)
+        col = self._index(other)
+        if row is None or col is None:
+            return 0, 0
+        return (int(self.games[relation][row, col]),
+                int(self.wins[relation][row, col]))
+
+    def _index(self, champion):
+        """Get the matrix index of a champion id. None if never seen."""
+        index = int(np.searchsorted(self.ids, champion))
+        if index < len(self.ids) and self.ids[index] == champion:
+            return index
+        return None
+
+    def top_k(self, champion=None,  # pylint: disable=R0914
+              relation="ally", k=5, descending=True, min_games=1):
+        """
+        Get the pairs with the highest or lowest win rate.
+
+        Ties go to the pair with more games, then to the lower ids.
+
+        Parameters:
+            champion : int
+                Only pairs where the player used this champion. Every
+                pair if None.
+            relation : str
+                "ally" or "enemy".
+            k : int
+            descending : bool
+                Best win rates first.
+            min_games : int
+
+        Returns : list
+            Format : [(champion : int, other : int, games : int,
+            wins : int)]
+
+        """
+        games = self.games[relation]
+        wins = self.wins[relation]
+        if champion is not None:
+            row = self._index(champion)
+            if row is None:
+                return []
+            games = games[row:row + 1]
+            wins = wins[row:row + 1]
+        rows, cols = np.nonzero(games >= max(min_games, 1))
+        pair_games = games[rows, cols]
+        pair_wins = wins[rows, cols]
+        rate = pair_wins / pair_games
+        if descending:
+            rate = -rate
+        order = np.lexsort((cols, rows, -pair_games, rate))[:k]
+        owners = self.ids[rows] if champion is None else \
+            np.full(len(rows), champion)
+        return [(int(owners[i]), int(self.ids[cols[i]]), int(pair_games[i]),
+                 int(pair_wins[i])) for i in order]
+
+    def best_allies(self, champion, k=5, min_games=1):
+        """Get the allies the player wins most with on a champion."""
+        return self.top_k(champion, "ally", k, True, min_games)
+
+    def worst_allies(self, champion, k=5, min_games=1):
+        """Get the allies the player loses most with on a champion."""
+        return self.top_k(champion, "ally", k, False, min_games)
+
+    def best_matchups(self, champion=None, k=5, min_games=1):
+        """Get the enemies the player wins most against."""
+        return self.top_k(champion, "enemy", k, True, min_games)
+
+    def worst_matchups(self, champion=None, k=5, min_games=1):
+        """Get the enemies the player loses most against."""
+        return self.top_k(champion, "enemy", k, False, min_games)
+
+    def __eq__(self, other):
+        """Compare counters, ignoring champions never paired."""
+        if not isinstance(other, PairStats):
+            return NotImplemented
+        ids = np.union1d(self.ids, other.ids)
+        mine = self.expanded(ids)
+        theirs = other.expanded(ids)
+        return all(np.array_equal(mine[part][rel], theirs[part][rel])
+                   for part in range(2) for rel in RELATIONS)
+
+    __hash__ = None
@@ -0,0 +1,179 @@
+#! /usr/bin/env python3
+"""
+Count champions over large match sets on several cores.
+
+Matches are split into row ranges, each range is counted into a partial
+ChampionStats table in a worker process, and the partial tables are
+added together with ChampionStats.merge(), which gives the same
+counters in any order. The result is what Summoner.comp_champ_stats()
+takes.
+
+Packed records are written once to a file in /dev/shm, which is kept
+in memory, and every worker maps it with numpy.memmap, so only a path
+and a row range are sent to each task and only a small table comes
+back. A MatchArchive is already a set of such files.
+
+Usage:
+    python parallel_stats.py ARCHIVE [--workers N] [--chunk ROWS]
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import functools
+import itertools
+import json
+import os
+import tempfile
+import numpy as np
+from champ_stats import ChampionStats
+from match_archive import MatchArchive, top_champions
+from match_record import MATCH_DTYPE, MatchRecords
+
+
+# Memory-backed directory for records shared with workers, if any.
+SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# State of a worker process, set by _open_archive().
+_WORKER = dict()
+
+
+def ranges(total, workers, chunk=None):
+    """
+    Split 'total' rows into ranges for 'workers' processes.
+
+    Parameters:
+        total : int
+        workers : int
+        chunk : int
+            Rows per range. Defaults to four ranges per worker, so a
+            slow worker holds up the others less.
+
+    Returns : list
+        Format : [(start : int, stop : int)]
+
+    """
+    if chunk is None:
+        chunk = -(-total // (4 * workers))
+    chunk = max(1, chunk)
+    return [(start, min(total, start + chunk))
+            for start in range(0, total, chunk)]
+
+
+def merge(tables):
+    """
+    Add partial counter tables together.
+
+    Parameters:
+        tables : iterable
+            numpy.ndarray tables of ChampionStats.
+
+    Returns : ChampionStats
+
+    """
+    return functools.reduce(ChampionStats.merge, map(ChampionStats, tables),
+                            ChampionStats())
+
+
+def _count_shared(path, size, start, stop):
+    """Count rows 'start' to 'stop' of a MATCH_DTYPE file."""
+    records = np.memmap(path, dtype=MATCH_DTYPE, mode='r', shape=(size,))
+    return ChampionStats.from_records(records[start:stop]).table
+
+
+def _open_archive(directory):
+    """Open the archive once per worker process."""
+    _WORKER["archive"] = MatchArchive(directory)
+
+
+def _count_archive(start, stop):
+    """Count every seat of rows 'start' to 'stop' of the worker's archive."""
+    return _WORKER["archive"].seat_stats(start, stop).table
+
+
+def champion_stats(matches, workers=None, chunk=None, executor=None):
+    """
+    Count champions like Summoner.create_stat_dict_2(), in parallel.
+
+    Parameters:
+        matches : iterable
+            MatchRecords, a MATCH_DTYPE array, or records from
+            Summoner.get_match_data().
+        workers : int
+            Processes to start. Defaults to the number of CPUs. With
+            one, and no executor, matches are counted in this process.
+        chunk : int
+            Rows per task. See ranges().
+        executor : concurrent.futures.Executor
+            Pool to run tasks on instead of starting one.
+
+    Returns : ChampionStats
+
+    """
+    if isinstance(matches, MatchRecords):
+        records = matches.array
+    elif isinstance(matches, np.ndarray):
+        records = matches
+    else:
+        records = MatchRecords.from_iterable(matches).array
+    workers = workers or os.cpu_count() or 1
+    if len(records) == 0 or (workers == 1 and executor is None):
+        return ChampionStats.from_records(records)
+    starts, stops = zip(*ranges(len(records), workers, chunk))
+    pool = executor
+    with contextlib.ExitStack() as stack:
+        if pool is None:
+            pool = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(workers))
+        handle, path = tempfile.mkstemp(".bin", "records-", SHARED_DIR)
+        try:
+            with os.fdopen(handle, 'wb') as write_file:
+                write_file.write(np.ascontiguousarray(records).data)
+            return merge(pool.map(_count_shared, itertools.repeat(path),
+                                  itertools.repeat(len(records)),
+                                  starts, stops))
+        finally:
+            os.remove(path)
+
+
+def archive_stats(directory, workers=None, chunk=65536):
+    """
+    Count every seat of every game of a MatchArchive, in parallel.
+
+    Parameters:
+        directory : str
+            Archive directory. It must not be compacted meanwhile.
+        workers : int
+            Processes to start. Defaults to the number of CPUs.
+        chunk : int
+            Rows per task.
+
+    Returns : ChampionStats
+        Equal to MatchArchive(directory).champion_stats().
+
+    """
+    workers = workers or os.cpu_count() or 1
+    total = len(MatchArchive(directory))
+    if total == 0:
+        return ChampionStats()
+    starts, stops = zip(*ranges(total, workers, chunk))
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=_open_archive,
+            initargs=(directory,)) as pool:
+        return merge(pool.map(_count_archive, starts, stops))
+
+
+def main(argv=None):
+    """Print an archive's top champions, counted on several cores."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("archive")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes, the number of CPUs by default")
+    parser.add_argument("--chunk", type=int, default=65536,
+                        help="Rows per task")
+    args = parser.parse_args(argv)
+    print(json.dumps(top_champions(archive_stats(
+        args.archive, args.workers, args.chunk)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#! /usr/bin/env python3
+"""
+Rate limiter shared by every request made with one Riot API key.
+
+Riot enforces several limits at once (20 requests every second and 100
+requests every two minutes for a development key), so a request may only
+go out once every window has room for it.
+"""
+import collections
+import threading
+import time
+
+
+DEV_KEY_LIMITS = ((20, 1), (100, 120))
+
+
+class RateLimiter:
+    """
+    Token bucket for each (count, seconds) window of a Riot rate limit.
+
+    A spent token is returned to its bucket exactly one window after it
+    was taken, so no window ever sees more than 'count' requests. The
+    limiter is thread safe and is meant to be shared by every worker
+    using the same API key.
+    """
+
+    def __init__(self, limits=DEV_KEY_LIMITS, clock=time.monotonic,
+                 sleep=time.sleep):
+        """
+        Initialize RateLimiter object.
+
+        Parameters:
+            limits : tuple
+                Format : ((count : int, seconds : float), ...)
+            clock : callable
+                Returns the current time in seconds.
+            sleep : callable
+                Blocks for the given number of seconds.
+
+        """
+        self.limits = tuple(limits)
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._spent = [collections.deque() for _ in self.limits]
+        self._paused_until = 0.0
+
+    def _wait_time(self, now):
+        """
+        Get seconds until a token is free in every bucket.
+
+        Must be called with the lock held.
+
+        Parameters:
+            now : float
+
+        Returns : float
+
+        """
+        wait = self._paused_until - now
+        for (count, period), spent in zip(self.limits, self._spent):
+            while spent and spent[0] <= now - period:
+                spent.popleft()
+            if len(spent) >= count:
+                wait = max(wait, spent[0] + period - now)
+        return wait
+
+    def acquire(self):
+        """
+        Block until a request may be sent, then take one token.
+
+        Returns : float
+            Seconds spent waiting.
+
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                wait = self._wait_time(now)
+                if wait <= 0:
+                    for spent in self._spent:
+                        spent.append(now)
+                    return waited
+            self.sleep(wait)
+            waited += wait
+
+    def delay(self):
+        """
+        Get seconds a request made now would wait for a token.
+
+        Returns : float
+
+        """
+        with self._lock:
+            return max(0.0, self._wait_time(self.clock()))
+
+    def pause(self, seconds):
+        """
+        Stop handing out tokens for a number of seconds.
+
+        Used when the API answers 429 with a Retry-After header.
+
+        Parameters:
+            seconds : float
+
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until,
+                                     self.clock() + seconds)
+
+
+class BudgetLimiter:
+    """
+    A fraction of another limiter's budget, for background work.
+
+    Every request takes a token from a private RateLimiter whose windows
+    allow 'fraction' of the shared limiter's counts, then one from the
+    shared limiter. Background work can then never use more than that
+    fraction of any window, and the rest stays free for interactive
+    requests made on the shared limiter directly.
+    """
+
+    def __init__(self, shared, fraction):
+        """
+        Initialize BudgetLimiter object.
+
+        Parameters:
+            shared : RateLimiter
+                Limiter of the API key the budget is taken from.
+            fraction : float
+                Share of each window, above 0 and at most 1. At least one
+                request per window is always allowed.
+
+        """
+        if not 0 < fraction <= 1:
+            raise ValueError(f"fraction must be in (0, 1], got {fraction}")
+        self.shared = shared
+        self.fraction = fraction
+        self.own = RateLimiter(
+            tuple((max(1, int(count * fraction)), period)
+                  for count, period in shared.limits),
+            shared.clock, shared.sleep)
+
+    def acquire(self):
+        """
+        Block until the budget and the shared limiter allow a request.
+
+        Returns : float
+            Seconds spent waiting.
+
+        """
+        return self.own.acquire() + self.shared.acquire()
+
+    def delay(self):
+        """
+        Get seconds a request made now would wait for a token.
+
+        Returns : float
+
+        """
+        return max(self.own.delay(), self.shared.delay())
+
+    def pause(self, seconds):
+        """
+        Pause the shared limiter, as a 429 applies to the whole key.
+
+        Parameters:
+            seconds : float
+
+        """
+        self.shared.pause(seconds)
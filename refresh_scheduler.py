@@ -0,0 +1,352 @@
+#! /usr/bin/env python3
+"""
+Keep reports of a roster of summoners fresh in the background.
+
+Tracked summoners wait in a priority queue ordered by when their next
+refresh is due. A refresh first polls the newest game in the summoner's
+matchlist, one request, and only recomputes the report when a game was
+played since the last one. Summoners who keep playing are polled every
+min_interval; each poll finding nothing new doubles the interval, up to
+max_interval.
+
+Background requests go through a BudgetLimiter, so they use at most
+'fraction' of each rate limit window and interactive reports always
+have the rest.
+
+Usage:
+    python refresh_scheduler.py [names_file] [--fraction F]
+                                [--min-interval S] [--max-interval S]
+                                [--metrics-every S] [--region PLATFORM]
+"""
+import argparse
+import heapq
+import itertools
+import json
+import sys
+import threading
+import time
+from batch import open_arg, read_names
+from rate_limiter import BudgetLimiter
+from regions import (PLATFORMS, RegionCaches, RegionClients,
+                     check_platform, split_name)
+from riot_client import RiotClient
+from summoner_container import Summoner
+
+
+class TrackedSummoner:  # pylint: disable=R0902,R0903
+    """Refresh state of one tracked summoner."""
+
+    def __init__(self, region, name, due):
+        """
+        Initialize TrackedSummoner object.
+
+        Parameters:
+            region : str
+            name : str
+            due : float
+                Time of the first refresh.
+
+        """
+        self.region = region
+        self.name = name
+        self.due = due
+        self.newest = None
+        self.report = None
+        self.refreshed = None
+        self.idle_polls = 0
+        self.error = None
+
+
+class RefreshScheduler:  # pylint: disable=R0902,R0913,R0917
+    """Priority queue of tracked summoners refreshed within a budget."""
+
+    def __init__(self, names=(), fraction=0.25, min_interval=300.0,
+                 max_interval=3600.0, region=None, clients=None,
+                 clock=time.monotonic):
+        """
+        Initialize RefreshScheduler object.
+
+        Parameters:
+            names : iterable
+                Summoners to track, as "Name" or "platform/Name".
+            fraction : float
+                Share of each rate limit window background refreshes
+                may use.
+            min_interval : float
+                Seconds between polls of an active summoner.
+            max_interval : float
+                Longest wait between polls of an idle summoner.
+            region : str
+                Platform of names without a prefix. Defaults to
+                Summoner.region.
+            clients : RegionClients
+                Clients for background requests. Defaults to clients
+                limited to 'fraction' of Summoner.clients' limiters.
+            clock : callable
+
+        """
+        self.fraction = fraction
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.region = check_platform(region or Summoner.region)
+        self.clients = clients
+        if clients is None:
+            self.clients = RegionClients(lambda platform: RiotClient(
+                BudgetLimiter(Summoner.clients.get(platform).rate_limiter,
+                              fraction)))
+        self.clock = clock
+        self.counters = {"polls": 0, "unchanged": 0, "refreshes": 0,
+                         "failures": 0}
+        self._lock = threading.Lock()
+        self._tracked = dict()
+        self._queue = list()
+        self._order = itertools.count()
+        self._lag = [0, 0.0, 0.0]
+        self._match_caches = RegionCaches(Summoner.open_match_cache)
+        self._stop = threading.Event()
+        self._thread = None
+        for entry in names:
+            self.track(entry)
+
+    def track(self, entry):
+        """
+        Start tracking a summoner, refreshing it as soon as possible.
+
+        Parameters:
+            entry : str
+                "Name" or "platform/Name".
+
+        """
+        region, name = split_name(entry, self.region)
+        if not Summoner.valid_name(name):
+            raise ValueError(f"invalid summoner name {name!r}")
+        with self._lock:
+            if (region, name) not in self._tracked:
+                tracked = TrackedSummoner(region, name, self.clock())
+                self._tracked[(region, name)] = tracked
+                self._push(tracked)
+
+    def untrack(self, entry):
+        """
+        Stop tracking a summoner and forget its report.
+
+        Parameters:
+            entry : str
+
+        """
+        with self._lock:
+            self._tracked.pop(split_name(entry, self.region), None)
+
+    def _push(self, tracked):
+        """Queue a summoner at its due time. Must hold the lock."""
+        heapq.heappush(self._queue, (tracked.due, next(self._order),
+                                     tracked))
+
+    def _pop_due(self, now):
+        """
+        Take the most overdue summoner off the queue.
+
+        Entries left behind by untrack() are dropped on the way.
+
+        Returns : TrackedSummoner
+            None if no tracked summoner is due.
+
+        """
+        with self._lock:
+            while self._queue and self._queue[0][0] <= now:
+                tracked = heapq.heappop(self._queue)[2]
+                key = (tracked.region, tracked.name)
+                if self._tracked.get(key) is tracked:
+                    return tracked
+            return None
+
+    def refresh(self, tracked):
+        """
+        Poll one summoner and recompute their report if they played.
+
+        Parameters:
+            tracked : TrackedSummoner
+
+        Returns : bool
+            Whether the report was recomputed.
+
+        """
+        summ = Summoner(tracked.name, match_cache=self._match_caches.get(
+            tracked.region), verbose=False, region=tracked.region,
+                        clients=self.clients)
+        key = summ.API_TEST_KEY
+        account_id = summ.get_summoner_by_name(tracked.name, key)[2]
+        newest = next(summ.iter_matchlist(account_id, key, 1), None)
+        if newest is not None:
+            newest = (newest["timestamp"], newest["gameId"])
+        if tracked.report is not None and newest == tracked.newest:
+            return False
+        report = summ.compute_results()
+        with self._lock:
+            tracked.report = report
+            tracked.newest = newest
+        return True
+
+    def _wait(self, idle_polls):
+        """Get the seconds between polls after 'idle_polls' idle ones."""
+        # 64 doublings reach max_interval from any sane min_interval,
+        # and keep the power a finite float.
+        return min(self.max_interval,
+                   self.min_interval * 2.0 ** min(idle_polls, 64))
+
+    def run_pending(self):
+        """
+        Refresh every summoner that is due, most overdue first.
+
+        Returns : float
+            Seconds until the next refresh is due.
+
+        """
+        while not self._stop.is_set():
+            now = self.clock()
+            tracked = self._pop_due(now)
+            if tracked is None:
+                break
+            lag = now - tracked.due
+            # Any failure is one summoner's, so it must not stop the
+            # refresh thread for everyone else.
+            try:
+                changed = self.refresh(tracked)
+                error = None
+            except Exception as failure:  # pylint: disable=W0703
+                changed = False
+                error = repr(failure)
+            with self._lock:
+                self._lag[0] += 1
+                self._lag[1] += lag
+                self._lag[2] = max(self._lag[2], lag)
+                self.counters["polls"] += 1
+                if error is not None:
+                    self.counters["failures"] += 1
+                elif changed:
+                    self.counters["refreshes"] += 1
+                else:
+                    self.counters["unchanged"] += 1
+                tracked.error = error
+                if changed:
+                    tracked.idle_polls = 0
+                elif self._wait(tracked.idle_polls) < self.max_interval:
+                    tracked.idle_polls += 1
+                if error is None:
+                    tracked.refreshed = self.clock()
+                tracked.due = self.clock() + self._wait(tracked.idle_polls)
+                if self._tracked.get((tracked.region,
+                                      tracked.name)) is tracked:
+                    self._push(tracked)
+        with self._lock:
+            if not self._queue:
+                return self.max_interval
+            return max(0.0, self._queue[0][0] - self.clock())
+
+    def report(self, entry):
+        """
+        Get the latest precomputed report of a tracked summoner.
+
+        Parameters:
+            entry : str
+
+        Returns : tuple
+            Format : (report : SummonerReport, age : float)
+            None if there is no report yet.
+
+        """
+        with self._lock:
+            tracked = self._tracked.get(split_name(entry, self.region))
+            if tracked is None or tracked.report is None:
+                return None
+            return tracked.report, self.clock() - tracked.refreshed
+
+    def metrics(self):
+        """
+        Get queue and freshness counters.
+
+        Returns : dict
+            Keys : tracked, queue_depth, lag_seconds, mean_lag_seconds,
+            max_lag_seconds, max_staleness_seconds, polls, unchanged,
+            refreshes, failures.
+            queue_depth counts summoners due now. lag_seconds is how
+            long the most overdue one has waited, and the mean and max
+            lags are over every refresh started.
+
+        """
+        with self._lock:
+            now = self.clock()
+            overdue = [now - tracked.due
+                       for tracked in self._tracked.values()
+                       if tracked.due <= now]
+            ages = [now - (tracked.refreshed if tracked.refreshed is not None
+                           else tracked.due)
+                    for tracked in self._tracked.values()]
+            ret = dict(self.counters,
+                       tracked=len(self._tracked),
+                       queue_depth=len(overdue),
+                       lag_seconds=max(overdue, default=0.0),
+                       mean_lag_seconds=(self._lag[1] / self._lag[0]
+                                         if self._lag[0] else 0.0),
+                       max_lag_seconds=self._lag[2],
+                       max_staleness_seconds=max(ages, default=0.0))
+        return ret
+
+    def start(self, idle_wait=1.0):
+        """
+        Refresh in a daemon thread until stop() is called.
+
+        Parameters:
+            idle_wait : float
+                Longest sleep between checks of the queue, so newly
+                tracked summoners are picked up.
+
+        """
+        def loop():
+            while not self._stop.is_set():
+                self._stop.wait(min(self.run_pending(), idle_wait))
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the refresh thread after its current refresh."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main(argv=None):
+    """Run the scheduler from the command line, printing metrics."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("names", nargs="?", default="-",
+                        help="File of summoner names, '-' for stdin")
+    parser.add_argument("--fraction", type=float, default=0.25,
+                        help="Share of the rate limit to use")
+    parser.add_argument("--min-interval", type=float, default=300.0)
+    parser.add_argument("--max-interval", type=float, default=3600.0)
+    parser.add_argument("--metrics-every", type=float, default=60.0,
+                        help="Seconds between metrics lines on stdout")
+    parser.add_argument("--region", default=Summoner.region,
+                        choices=sorted(PLATFORMS),
+                        help="Platform of names without a prefix")
+    args = parser.parse_args(argv)
+    with open_arg(args.names, "r") as names:
+        scheduler = RefreshScheduler(read_names(names), args.fraction,
+                                     args.min_interval, args.max_interval,
+                                     args.region)
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(args.metrics_every)
+            print(json.dumps(scheduler.metrics()), flush=True)
+    except KeyboardInterrupt:
+        print("Stopping.", file=sys.stderr)
+    finally:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#! /usr/bin/env python3
+"""
+Riot API platforms and the clients used for each.
+
+Riot enforces rate limits per platform, so every platform gets its own
+RiotClient, with its own connection pool and its own RateLimiter. A
+platform that is throttled then never holds back requests to another.
+"""
+import threading
+from rate_limiter import RateLimiter
+from riot_client import RiotClient
+
+
+# Platform routing value : Data Dragon realm.
+PLATFORMS = {"br1": "br", "eun1": "eune", "euw1": "euw", "jp1": "jp",
+             "kr": "kr", "la1": "lan", "la2": "las", "na1": "na",
+             "oc1": "oce", "ru": "ru", "tr1": "tr"}
+
+
+def check_platform(platform):
+    """
+    Raise ValueError for an unknown platform.
+
+    Parameters:
+        platform : str
+
+    Returns : str
+        The platform.
+
+    """
+    if platform not in PLATFORMS:
+        raise ValueError(f"unknown platform {platform!r}, expected one of "
+                         f"{', '.join(sorted(PLATFORMS))}")
+    return platform
+
+
+def split_name(entry, default):
+    """
+    Split an optional "platform/" prefix off a summoner name.
+
+    Parameters:
+        entry : str
+            "Name" or "platform/Name".
+        default : str
+            Platform used when there is no prefix.
+
+    Returns : tuple
+        Format : (platform : str, name : str)
+
+    """
+    platform, _, name = entry.rpartition("/")
+    return check_platform(platform or default), name
+
+
+class RegionClients:
+    """Thread-safe map of platform to its own RiotClient."""
+
+    def __init__(self, factory=None):
+        """
+        Initialize RegionClients object.
+
+        Parameters:
+            factory : callable
+                factory(platform) returns a new RiotClient. Defaults to a
+                client with development key limits.
+
+        """
+        self.factory = factory
+        if factory is None:
+            self.factory = lambda platform: RiotClient(RateLimiter())
+        self._lock = threading.Lock()
+        self._clients = dict()
+
+    def get(self, platform):
+        """
+        Get a platform's client, creating it on first use.
+
+        Parameters:
+            platform : str
+
+        Returns : RiotClient
+
+        """
+        with self._lock:
+            client = self._clients.get(platform)
+            if client is None:
+                client = self.factory(check_platform(platform))
+                self._clients[platform] = client
+            return client
+
+    def items(self):
+        """
+        Get the clients created so far.
+
+        Returns : list
+            Format : [(platform : str, client : RiotClient)]
+
+        """
+        with self._lock:
+            return sorted(self._clients.items())
+
+
+class RegionCaches:  # pylint: disable=R0903
+    """Thread-safe map of platform to the match cache its players share."""
+
+    def __init__(self, factory, caches=None):
+        """
+        Initialize RegionCaches object.
+
+        Parameters:
+            factory : callable
+                factory(platform) opens a platform's MatchCache, or
+                returns None to go without, as
+                Summoner.open_match_cache() does.
+            caches : dict
+                Format : {platform : MatchCache}
+                Caches to use instead of opening them.
+
+        """
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._caches = dict(caches or {})
+
+    def get(self, platform):
+        """
+        Get a platform's cache, opening it on first use.
+
+        Parameters:
+            platform : str
+
+        Returns : MatchCache
+            None if the factory gave none.
+
+        """
+        with self._lock:
+            if platform not in self._caches:
+                self._caches[platform] = self.factory(
+                    check_platform(platform))
+            return self._caches[platform]
@@ -0,0 +1,217 @@
+#! /usr/bin/env python3
+"""
+Timing and profiling for Summoner reports.
+
+A Profiler collects wall and CPU time per named stage, and hooks are
+called as each stage finishes. Wrapping a run in capture() also records
+the HTTP traffic it caused and, when asked for, a cProfile and
+tracemalloc summary. report() returns everything as a JSON-ready dict.
+"""
+import contextlib
+import cProfile
+import pstats
+import threading
+import time
+import tracemalloc
+
+
+HTTP_COUNTERS = ("calls", "retries", "errors", "bytes", "sleep_seconds",
+                 "total_seconds")
+
+
+class Profiler:  # pylint: disable=R0902
+    """Per-stage timers with optional cProfile and tracemalloc capture."""
+
+    def __init__(self, hooks=(), cprofile=False, trace_memory=False,
+                 top=20):
+        """
+        Initialize Profiler object.
+
+        Parameters:
+            hooks : iterable
+                Callables called as hook(stage, wall, cpu) when a stage
+                finishes.
+            cprofile : bool
+                Run cProfile during capture().
+            trace_memory : bool
+                Run tracemalloc during capture().
+            top : int
+                Functions and allocation sites kept in the report.
+
+        """
+        self.hooks = list(hooks)
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.top = top
+        self.stages = dict()
+        self.http = None
+        self.wall_seconds = None
+        self.functions = None
+        self.memory = None
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """
+        Call hook(stage, wall, cpu) whenever a stage finishes.
+
+        Parameters:
+            hook : callable
+
+        """
+        self.hooks.append(hook)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Time the block as one run of a stage.
+
+        CPU time is the whole process's, so it includes worker threads.
+
+        Parameters:
+            name : str
+
+        """
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall,
+                        time.process_time() - cpu)
+
+    def record(self, name, wall, cpu):
+        """
+        Add one run of a stage timed elsewhere.
+
+        Parameters:
+            name : str
+            wall : float
+            cpu : float
+
+        """
+        with self._lock:
+            entry = self.stages.setdefault(
+                name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0})
+            entry["calls"] += 1
+            entry["wall_seconds"] += wall
+            entry["cpu_seconds"] += cpu
+        for hook in self.hooks:
+            hook(name, wall, cpu)
+
+    @contextlib.contextmanager
+    def capture(self, metrics=None):
+        """
+        Profile everything run in the block.
+
+        Parameters:
+            metrics : ClientMetrics
+                Counters whose growth during the block is reported as
+                HTTP traffic. Other threads using the same client are
+                counted too.
+
+        """
+        before = metrics.snapshot() if metrics is not None else None
+        profile = None
+        if self.cprofile:
+            profile = cProfile.Profile()
+            profile.enable()
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall_seconds = time.perf_counter() - start
+            if self.trace_memory:
+                self.memory = memory_summary(self.top)
+                tracemalloc.stop()
+            if profile is not None:
+                profile.disable()
+                self.functions = function_summary(profile, self.top)
+            if metrics is not None:
+                self.http = http_delta(before, metrics.snapshot())
+
+    def report(self):
+        """
+        Get everything measured so far.
+
+        Returns : dict
+            Format : {wall_seconds, stages : {stage : {calls,
+            wall_seconds, cpu_seconds}}, http, cprofile, tracemalloc}
+            Sections that were not captured are None.
+
+        """
+        with self._lock:
+            stages = {name: dict(entry)
+                      for name, entry in self.stages.items()}
+        return {"wall_seconds": self.wall_seconds,
+                "stages": stages,
+                "http": self.http,
+                "cprofile": self.functions,
+                "tracemalloc": self.memory}
+
+
+def http_delta(before, after):
+    """
+    Get the traffic between two ClientMetrics snapshots.
+
+    Parameters:
+        before : dict
+        after : dict
+
+    Returns : dict
+        Format : {calls, retries, errors, bytes, sleep_seconds,
+        total_seconds, endpoints : {endpoint : {same counters}}}
+
+    """
+    endpoints = dict()
+    for endpoint, entry in after.items():
+        old = before.get(endpoint, dict())
+        delta = {key: entry.get(key, 0) - old.get(key, 0)
+                 for key in HTTP_COUNTERS}
+        if delta["calls"]:
+            endpoints[endpoint] = delta
+    totals = {key: sum(entry[key] for entry in endpoints.values())
+              for key in HTTP_COUNTERS}
+    totals["endpoints"] = endpoints
+    return totals
+
+
+def function_summary(profile, top):
+    """
+    Get the functions with the most cumulative time.
+
+    Parameters:
+        profile : cProfile.Profile
+        top : int
+
+    Returns : list
+        Format : [{function, calls, total_seconds, cumulative_seconds}]
+
+    """
+    stats = pstats.Stats(profile).stats
+    rows = [{"function": f"{path}:{line}({name})", "calls": calls,
+             "total_seconds": total, "cumulative_seconds": cumulative}
+            for (path, line, name), (_, calls, total, cumulative, _)
+            in stats.items()]
+    rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+    return rows[:top]
+
+
+def memory_summary(top):
+    """
+    Get traced memory use and the largest allocation sites.
+
+    Parameters:
+        top : int
+
+    Returns : dict
+        Format : {current_bytes, peak_bytes, top : [{location, bytes,
+        count}]}
+
+    """
+    current, peak = tracemalloc.get_traced_memory()
+    sites = tracemalloc.take_snapshot().statistics("lineno")[:top]
+    return {"current_bytes": current, "peak_bytes": peak,
+            "top": [{"location": str(site.traceback), "bytes": site.size,
+                     "count": site.count} for site in sites]}
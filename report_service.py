@@ -0,0 +1,286 @@
+#! /usr/bin/env python3
+"""
+HTTP service returning summoner reports as JSON.
+
+Concurrent requests for one summoner share a single computation, and
+finished reports are cached for a TTL. Every upstream call goes through
+Summoner's shared client and rate limiter. When too many reports are
+already being computed, a stale cached report is served if there is
+one, and 503 with Retry-After otherwise, instead of queueing more work
+behind rate-limit sleeps. The same happens while the rate limiter is
+backed up for longer than max_delay.
+
+Usage:
+    python report_service.py [--host H] [--port P] [--workers N]
+
+Endpoints:
+    GET /report/<summoner name>
+    GET /health
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import time
+from urllib.parse import unquote, urlparse
+import requests
+from identities import IdentityResolver
+from summoner_container import Summoner
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error",
+           502: "Bad Gateway", 503: "Service Unavailable"}
+
+
+class ReportService:  # pylint: disable=R0902,R0911,R0913,R0917
+    """Coalescing, caching front end for Summoner reports."""
+
+    def __init__(self, workers=4, max_pending=16, ttl=300.0,
+                 stale_ttl=3600.0, max_delay=10.0, compute=None,
+                 limiter=None, clock=time.monotonic):
+        """
+        Initialize ReportService object.
+
+        Parameters:
+            workers : int
+                Reports computed at once.
+            max_pending : int
+                Reports computed or waiting before new ones are refused.
+            ttl : float
+                Seconds a report is served from cache.
+            stale_ttl : float
+                Seconds an expired report may still be served when the
+                service is overloaded. Older reports are dropped.
+            max_delay : float
+                Longest rate limiter wait at which new reports are still
+                started.
+            compute : callable
+                compute(name) returns a report dict. Defaults to running
+                Summoner.compute_results().
+            limiter : RateLimiter
+                Limiter to watch. Defaults to the one of Summoner's
+                default region.
+            clock : callable
+
+        """
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_delay = max_delay
+        self.limiter = limiter
+        if limiter is None:
+            self.limiter = Summoner.clients.get(
+                Summoner.region).rate_limiter
+        self.compute = compute
+        if compute is None:
+            self.compute = self.summoner_report
+        self.clock = clock
+        self.pool = concurrent.futures.ThreadPoolExecutor(workers)
+        self.computations = 0
+        self.coalesced = 0
+        # key : (time, report), oldest first.
+        self._cache = collections.OrderedDict()
+        self._in_flight = dict()
+
+    @staticmethod
+    def summoner_report(name):
+        """
+        Compute one summoner's report.
+
+        Parameters:
+            name : str
+
+        Returns : dict
+
+        """
+        summ = Summoner(name, verbose=False)
+        return summ.summarize_results(summ.compute_results())
+
+    def _cached(self, key, max_age):
+        """
+        Get a cached report no older than max_age.
+
+        Returns : dict
+            None if there is none.
+
+        """
+        entry = self._cache.get(key)
+        if entry is not None and self.clock() - entry[0] < max_age:
+            return entry[1]
+        return None
+
+    async def get_report(self, name):
+        """
+        Get a summoner's report.
+
+        Parameters:
+            name : str
+
+        Returns : tuple
+            Format : (status : int, body : dict)
+
+        """
+        if not Summoner.valid_name(name):
+            return 400, {"error": f"invalid summoner name {name!r}"}
+        key = IdentityResolver.key(name)
+        report = self._cached(key, self.ttl)
+        if report is not None:
+            return 200, {"summoner": name, "results": report,
+                         "cached": True}
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            if self.overloaded():
+                return self._overloaded(key, name)
+            task = asyncio.ensure_future(self._run(key, name))
+            self._in_flight[key] = task
+        try:
+            report = await asyncio.shield(task)
+        except requests.exceptions.HTTPError as error:
+            if error.response is not None and \
+                    error.response.status_code == 404:
+                return 404, {"error": f"summoner {name!r} not found"}
+            return 502, {"error": str(error)}
+        except requests.exceptions.RequestException as error:
+            return 502, {"error": str(error)}
+        except Exception as error:  # pylint: disable=W0703
+            return 500, {"error": repr(error)}
+        return 200, {"summoner": name, "results": report, "cached": False}
+
+    async def _run(self, key, name):
+        """Compute a report on the worker pool and cache it."""
+        try:
+            self.computations += 1
+            loop = asyncio.get_running_loop()
+            report = await loop.run_in_executor(self.pool, self.compute, name)
+            self._store(key, report)
+            return report
+        finally:
+            del self._in_flight[key]
+
+    def _store(self, key, report):
+        """Cache a report, dropping reports older than stale_ttl."""
+        now = self.clock()
+        self._cache.pop(key, None)
+        self._cache[key] = (now, report)
+        while self._cache:
+            old, (stored, _) = next(iter(self._cache.items()))
+            if now - stored < self.stale_ttl:
+                break
+            del self._cache[old]
+
+    def overloaded(self):
+        """
+        Check whether new reports should be refused.
+
+        Returns : bool
+
+        """
+        return (len(self._in_flight) >= self.max_pending or
+                (self.limiter is not None and
+                 self.limiter.delay() > self.max_delay))
+
+    def _overloaded(self, key, name):
+        """
+        Answer when no more reports can be started.
+
+        Returns : tuple
+            Format : (status : int, body : dict)
+
+        """
+        report = self._cached(key, self.stale_ttl)
+        if report is not None:
+            return 200, {"summoner": name, "results": report,
+                         "cached": True, "stale": True}
+        retry_after = 5
+        if self.limiter is not None:
+            retry_after = max(retry_after, int(self.limiter.delay()) + 1)
+        return 503, {"error": "too many reports in progress",
+                     "retry_after": retry_after}
+
+    async def handle(self, reader, writer):
+        """Answer one HTTP request on a connection."""
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            try:
+                status, body = await self.route(*parts[:2])
+            except Exception as error:  # pylint: disable=W0703
+                status, body = 500, {"error": repr(error)}
+            payload = json.dumps(body).encode("utf-8")
+            headers = [f"HTTP/1.1 {status} {REASONS[status]}",
+                       "Content-Type: application/json",
+                       f"Content-Length: {len(payload)}",
+                       "Connection: close"]
+            if status == 503:
+                headers.append(f"Retry-After: {body['retry_after']}")
+            writer.write("\r\n".join(headers).encode("latin-1") +
+                         b"\r\n\r\n" + payload)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def route(self, method=None, target=None):
+        """
+        Dispatch a request line.
+
+        Parameters:
+            method : str
+            target : str
+
+        Returns : tuple
+            Format : (status : int, body : dict)
+
+        """
+        if target is None:
+            return 400, {"error": "bad request line"}
+        if method != "GET":
+            return 405, {"error": "only GET is supported"}
+        path = unquote(urlparse(target).path)
+        if path == "/health":
+            return 200, {"status": "ok",
+                         "in_flight": len(self._in_flight),
+                         "cached": len(self._cache),
+                         "computations": self.computations,
+                         "coalesced": self.coalesced}
+        if path.startswith("/report/"):
+            return await self.get_report(path[len("/report/"):])
+        return 404, {"error": f"no such endpoint {path!r}"}
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """
+        Start listening.
+
+        Returns : asyncio.AbstractServer
+
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def serve(service, host, port):
+    """Run a service until cancelled."""
+    server = await service.start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    """Run the service from the command line."""
+    parser = argparse.ArgumentParser(description="Serve summoner reports.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=16)
+    parser.add_argument("--ttl", type=float, default=300.0)
+    args = parser.parse_args(argv)
+    service = ReportService(args.workers, args.max_pending, args.ttl)
+    asyncio.run(serve(service, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
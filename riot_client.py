@@ -0,0 +1,259 @@
+#! /usr/bin/env python3
+"""
+HTTP client used for every Riot API and Data Dragon request.
+
+Keeps one pooled keep-alive session, retries 429s, 5xx responses and
+connection failures with capped exponential backoff, and records latency,
+retries, bytes received and time spent sleeping per endpoint.
+"""
+import math
+import random
+import re
+import sys
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from match_decode import loads
+
+
+class ClientMetrics:
+    """Thread-safe per-endpoint request counters."""
+
+    def __init__(self):
+        """Initialize ClientMetrics object."""
+        self._lock = threading.Lock()
+        self._endpoints = dict()
+
+    @staticmethod
+    def endpoint_of(url):
+        """
+        Get the endpoint an url belongs to, with identifiers masked.
+
+        Parameters:
+            url : str
+
+        Returns : str
+
+        """
+        path = re.sub(r"^\w+://[^/]+", "", url.split("?")[0])
+        parts = path.split("/")
+        masked = [parts[0]]
+        for prev, part in zip(parts, parts[1:]):
+            if prev.startswith("by-") or part.isdigit():
+                part = "{id}"
+            masked.append(part)
+        return "/".join(masked)
+
+    def record(self, endpoint,  # pylint: disable=R0913,R0917
+               seconds=None, retried=False, failed=False, nbytes=0,
+               slept=0.0):
+        """
+        Record one attempt against an endpoint.
+
+        Parameters:
+            endpoint : str
+            seconds : float
+                Time until a response arrived. None if none did.
+            retried : bool
+                The attempt is going to be retried.
+            failed : bool
+                The attempt ended the request with an error.
+            nbytes : int
+                Size of the response body.
+            slept : float
+                Seconds waited on the rate limiter or backoff before the
+                attempt.
+
+        """
+        with self._lock:
+            entry = self._endpoints.setdefault(
+                endpoint, {"calls": 0, "retries": 0, "errors": 0,
+                           "bytes": 0, "sleep_seconds": 0.0,
+                           "total_seconds": 0.0, "max_seconds": 0.0})
+            entry["calls"] += 1
+            entry["retries"] += int(retried)
+            entry["errors"] += int(failed)
+            entry["bytes"] += nbytes
+            entry["sleep_seconds"] += slept
+            if seconds is not None:
+                entry["total_seconds"] += seconds
+                entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def snapshot(self):
+        """
+        Get a copy of the counters.
+
+        Returns : dict
+            Format : {endpoint : {calls, retries, errors, bytes,
+            sleep_seconds, total_seconds, max_seconds, mean_seconds}}
+
+        """
+        with self._lock:
+            ret = {key: dict(value) for key, value in self._endpoints.items()}
+        for entry in ret.values():
+            entry["mean_seconds"] = entry["total_seconds"] / entry["calls"]
+        return ret
+
+
+class RiotClient:  # pylint: disable=R0902
+    """Pooled HTTP session with a bounded retry and backoff policy."""
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self,  # pylint: disable=R0913,R0917
+                 rate_limiter=None, pool_size=10, timeout=(3.05, 10),
+                 max_attempts=5, backoff=0.5, max_backoff=30.0,
+                 retry_padding=2, sleep=time.sleep):
+        """
+        Initialize RiotClient object.
+
+        Parameters:
+            rate_limiter : RateLimiter
+                Shared limiter for rate limited requests. None disables.
+            pool_size : int
+                Keep-alive connections kept per host.
+            timeout : tuple
+                Format : (connect : float, read : float)
+            max_attempts : int
+                Attempts per request before giving up.
+            backoff : float
+                Base delay in seconds for exponential backoff.
+            max_backoff : float
+                Largest delay between two attempts.
+            retry_padding : float
+                Seconds added to a 429's Retry-After.
+            sleep : callable
+
+        """
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_padding = retry_padding
+        self.sleep = sleep
+        self.metrics = ClientMetrics()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def backoff_delay(self, attempt):
+        """
+        Get a jittered exponential delay before the next attempt.
+
+        Parameters:
+            attempt : int
+                Number of attempts made so far.
+
+        Returns : float
+
+        """
+        ceiling = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def get(self, url, params=None, limited=True, headers=None):
+        """
+        Send a GET request, retrying transient failures.
+
+        4xx responses other than 429 are not retried. After max_attempts
+        the last error is raised.
+
+        Parameters:
+            url : str
+            params : dict
+            limited : bool
+                Take a token from the rate limiter before each attempt.
+            headers : dict
+                Extra request headers.
+
+        Returns : requests.Response
+
+        """
+        endpoint = self.metrics.endpoint_of(url)
+        attempt = 0
+        slept = 0.0
+        while True:
+            attempt += 1
+            if limited and self.rate_limiter is not None:
+                slept += self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params,
+                                            headers=headers,
+                                            timeout=self.timeout)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                last_try = attempt == self.max_attempts
+                self.metrics.record(endpoint, retried=not last_try,
+                                    failed=last_try, slept=slept)
+                if last_try:
+                    raise
+                slept = self.backoff_delay(attempt)
+                self.sleep(slept)
+                continue
+            elapsed = time.perf_counter() - start
+            retry = (response.status_code in self.RETRY_STATUSES and
+                     attempt < self.max_attempts)
+            self.metrics.record(endpoint, elapsed, retried=retry,
+                                failed=response.status_code >= 400 and
+                                not retry, nbytes=len(response.content),
+                                slept=slept)
+            if not retry:
+                response.raise_for_status()
+                return response
+            slept = self._wait_before_retry(response, attempt, limited)
+
+    def _wait_before_retry(self, response, attempt, limited):
+        """
+        Wait out a retryable response.
+
+        A 429 with Retry-After pauses the shared rate limiter so every
+        worker holds back, not just this one. A Retry-After that is not
+        a number of seconds, such as an HTTP date, falls back to
+        backoff_delay().
+
+        Parameters:
+            response : requests.Response
+            attempt : int
+            limited : bool
+
+        Returns : float
+            Seconds slept. 0 when the rate limiter was paused instead,
+            since the wait then shows up in the next acquire().
+
+        """
+        sleep_time = None
+        if response.status_code == 429:
+            try:
+                sleep_time = float(response.headers["Retry-After"])
+            except (KeyError, ValueError):
+                pass
+        if sleep_time is not None and 0 <= sleep_time < math.inf:
+            sleep_time += self.retry_padding
+            print(f"Rate limit reached. Resting for {sleep_time} seconds.",
+                  file=sys.stderr)
+            if limited and self.rate_limiter is not None:
+                self.rate_limiter.pause(sleep_time)
+                return 0.0
+            self.sleep(sleep_time)
+            return float(sleep_time)
+        delay = self.backoff_delay(attempt)
+        self.sleep(delay)
+        return delay
+
+    def get_json(self, url, params=None, limited=True):
+        """
+        Send a GET request and decode the JSON body.
+
+        Parameters:
+            url : str
+            params : dict
+            limited : bool
+
+        Returns : object
+
+        """
+        return loads(self.get(url, params, limited).content)
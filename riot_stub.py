@@ -0,0 +1,558 @@
+#! /usr/bin/env python3
+"""
+Local stand-in for the Riot API and Data Dragon.
+
+Serves generated or recorded summoner, matchlist, match and static data
+from a background HTTP server so the client can be exercised without a
+key or network access. Latency and 429 responses can be injected.
+
+Recording a fixture directory from the live API (needs a valid key):
+    python riot_stub.py record "Summoner Name" ... --out fixtures/
+Serving a fixture directory:
+    python riot_stub.py serve fixtures/ --port 8081
+"""
+import argparse
+import collections
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from requests.adapters import HTTPAdapter
+
+
+VERSION = "10.1.1"
+
+
+class FakeRiotData:  # pylint: disable=too-many-instance-attributes
+    """Generated players, matches and champions served by RiotStub."""
+
+    def __init__(self, n_champions=40, seed=0):
+        """
+        Initialize FakeRiotData object.
+
+        Parameters:
+            n_champions : int
+            seed : int
+
+        """
+        self.rand = random.Random(seed)
+        self.champions = {key: f"Champion{key}"
+                          for key in range(1, n_champions + 1)}
+        self.summoners = {}
+        self.matchlists = collections.defaultdict(list)
+        self.matches = {}
+        self.next_game_id = 3000000000
+        self.next_timestamp = 1578000000000
+        self.version = VERSION
+
+    def add_summoner(self, name, n_matches=0):
+        """
+        Add a summoner and give them a number of solo games.
+
+        Parameters:
+            name : str
+            n_matches : int
+
+        Returns : dict
+
+        """
+        if name not in self.summoners:
+            index = len(self.summoners)
+            self.summoners[name] = {"name": name,
+                                    "id": f"summ-{index}",
+                                    "accountId": f"acct-{index}",
+                                    "puuid": f"puuid-{index}",
+                                    "profileIconId": index}
+        for _ in range(n_matches):
+            self.add_match([name])
+        return self.summoners[name]
+
+    def add_match(self, names):
+        """
+        Add one game containing the named summoners.
+
+        Missing seats are filled with generated players.
+
+        Parameters:
+            names : list
+
+        Returns : int
+            The new gameId.
+
+        """
+        players = list(names)
+        players += [f"Filler{self.next_game_id}x{seat}"
+                    for seat in range(10 - len(players))]
+        self.rand.shuffle(players)
+        champs = self.rand.sample(sorted(self.champions), 10)
+        blue_win = self.rand.random() < 0.5
+        game_id = self.next_game_id
+        self.next_game_id += 1
+        self.next_timestamp += 1800000
+        self.matches[game_id] = {
+            "gameId": game_id,
+            "gameCreation": self.next_timestamp,
+            "queueId": 400,
+            "seasonId": 13,
+            "participantIdentities": [
+                {"participantId": seat + 1,
+                 "player": {"summonerName": player,
+                            "accountId": self.summoners.get(
+                                player, {}).get("accountId", "")}}
+                for seat, player in enumerate(players)],
+            "participants": [
+                {"participantId": seat + 1,
+                 "teamId": 100 if seat < 5 else 200,
+                 "championId": champs[seat],
+                 "stats": {"win": blue_win == (seat < 5)}}
+                for seat in range(10)]}
+        for seat, player in enumerate(players):
+            if player in self.summoners:
+                account = self.summoners[player]["accountId"]
+                self.matchlists[account].insert(0, {
+                    "gameId": game_id,
+                    "champion": champs[seat],
+                    "queue": 400,
+                    "season": 13,
+                    "timestamp": self.next_timestamp})
+        return game_id
+
+    def save(self, directory):
+        """
+        Write the data to a fixture directory.
+
+        Parameters:
+            directory : str
+
+        """
+        os.makedirs(directory, exist_ok=True)
+        parts = {"realm.json": {"v": self.version},
+                 "champions.json": self.champions,
+                 "summoners.json": self.summoners,
+                 "matchlists.json": self.matchlists}
+        for name, content in parts.items():
+            with open(os.path.join(directory, name), 'w',
+                      encoding="utf-8") as write_file:
+                json.dump(content, write_file)
+        with open(os.path.join(directory, "matches.ndjson"), 'w',
+                  encoding="utf-8") as write_file:
+            for game_id in sorted(self.matches):
+                write_file.write(json.dumps(self.matches[game_id]) + "\n")
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Read data written by save().
+
+        Parameters:
+            directory : str
+
+        Returns : FakeRiotData
+
+        """
+        def read(name):
+            with open(os.path.join(directory, name), 'r',
+                      encoding="utf-8") as read_file:
+                return json.load(read_file)
+
+        data = cls(n_champions=0)
+        data.version = read("realm.json")["v"]
+        data.champions = {int(key): name
+                          for key, name in read("champions.json").items()}
+        data.summoners = read("summoners.json")
+        data.matchlists.update(read("matchlists.json"))
+        with open(os.path.join(directory, "matches.ndjson"), 'r',
+                  encoding="utf-8") as read_file:
+            for line in read_file:
+                match = json.loads(line)
+                data.matches[match["gameId"]] = match
+        if data.matches:
+            data.next_game_id = max(data.matches) + 1
+        return data
+
+    def record(self, path, body):
+        """
+        Keep a live API or Data Dragon response for serving later.
+
+        Parameters:
+            path : str
+                Request path, as route() would receive it.
+            body : object
+                Decoded JSON response.
+
+        """
+        if re.fullmatch(r"/lol/summoner/v4/summoners/by-name/.+", path):
+            self.summoners[body["name"]] = body
+        elif re.fullmatch(r"/lol/match/v4/matchlists/by-account/.+", path):
+            games = self.matchlists[path.rsplit("/", 1)[1]]
+            known = {game["gameId"] for game in games}
+            games.extend(game for game in body["matches"]
+                         if game["gameId"] not in known)
+            games.sort(key=lambda game: game["timestamp"], reverse=True)
+        elif re.fullmatch(r"/lol/match/v4/matches/\d+", path):
+            self.matches[body["gameId"]] = body
+        elif re.fullmatch(r"/realms/\w+\.json", path):
+            self.version = body["v"]
+        elif path.endswith("/champion.json"):
+            self.champions = {int(champ["key"]): champ["id"]
+                              for champ in body["data"].values()}
+
+    def route(self, path, query):
+        """
+        Answer one request.
+
+        Parameters:
+            path : str
+            query : dict
+
+        Returns : tuple
+            Format : (status : int, body : object)
+
+        """
+        routes = ((r"/lol/status/v3/shard-data", self._status),
+                  (r"/lol/summoner/v4/summoners/by-name/(.+)",
+                   self._summoner),
+                  (r"/lol/match/v4/matchlists/by-account/(.+)",
+                   self._matchlist),
+                  (r"/lol/match/v4/matches/(\d+)", self._match),
+                  (r"/lol/champion-mastery/v4/champion-masteries/"
+                   r"by-summoner/(.+)", self._mastery),
+                  (r"/realms/\w+\.json", self._realm),
+                  (r"/cdn/[^/]+/data/en_US/champion\.json",
+                   self._champions))
+        for pattern, handler in routes:
+            found = re.fullmatch(pattern, path)
+            if found is not None:
+                return handler(query, *found.groups())
+        return 404, {"status": {"status_code": 404}}
+
+    @staticmethod
+    def _status(_query):
+        """Answer shard status."""
+        return 200, {"name": "North America", "slug": "na"}
+
+    def _summoner(self, _query, name):
+        """Answer summoner-by-name."""
+        if name not in self.summoners:
+            return 404, {"status": {"status_code": 404}}
+        return 200, self.summoners[name]
+
+    def _matchlist(self, query, account_id):
+        """Answer matchlist-by-account with Riot's paging rules."""
+        games = self.matchlists.get(account_id, [])
+        if "beginTime" in query:
+            games = [game for game in games
+                     if game["timestamp"] >= int(query["beginTime"])]
+        begin = int(query.get("beginIndex", 0))
+        end = min(int(query.get("endIndex", begin + 100)), begin + 100)
+        page = games[begin:end]
+        return 200, {"matches": page,
+                     "startIndex": begin,
+                     "endIndex": begin + len(page),
+                     "totalGames": len(games)}
+
+    def _match(self, _query, game_id):
+        """Answer match-by-id."""
+        if int(game_id) not in self.matches:
+            return 404, {"status": {"status_code": 404}}
+        return 200, self.matches[int(game_id)]
+
+    def _mastery(self, _query, summoner_id):
+        """Answer champion mastery for a summoner."""
+        rand = random.Random(summoner_id)
+        return 200, [{"championId": key,
+                      "championPoints": rand.randrange(100000)}
+                     for key in sorted(self.champions)]
+
+    def _realm(self, _query):
+        """Answer the current Data Dragon version."""
+        return 200, {"v": self.version, "n": {"champion": self.version}}
+
+    def _champions(self, _query):
+        """Answer Data Dragon champion data."""
+        return 200, {"version": self.version,
+                     "data": {name: {"id": name, "key": str(key)}
+                              for key, name in self.champions.items()}}
+
+
+def random_matches(count, seed=0, n_champions=150, steps=None):
+    """
+    Generate match tuples in Summoner.get_match_data() format.
+
+    Ten distinct champions are drawn per game, with an even chance to
+    win.
+
+    Parameters:
+        count : int
+        seed : int
+        n_champions : int
+        steps : sequence
+            Seconds between games to draw from. If given, each game is
+            paired with a timestamp, starting from 0.
+
+    Returns : list
+        Format : [(win, champion, allies, enemies)], or
+        [(timestamp : float, (win, champion, allies, enemies))] with
+        steps.
+
+    """
+    rand = random.Random(seed)
+    matches = list()
+    timestamp = 0.0
+    for _ in range(count):
+        champs = rand.sample(range(1, n_champions + 1), 10)
+        if steps is not None:
+            timestamp += rand.choice(steps)
+        match = (rand.random() < 0.5, champs[0], champs[1:5], champs[5:])
+        matches.append(match if steps is None else (timestamp, match))
+    return matches
+
+
+class RiotStub:  # pylint: disable=R0902,R0913,R0917
+    """
+    Background HTTP server answering from a FakeRiotData.
+
+    Use as a context manager. 'api_base' and 'ddragon_base' are the urls
+    to point Summoner at.
+    """
+
+    def __init__(self, data, latency=0.0, throttle_every=0, retry_after=0,
+                 fail_every=0, port=0):
+        """
+        Initialize RiotStub object.
+
+        Parameters:
+            data : FakeRiotData
+            latency : float
+                Seconds to wait before answering each request.
+            throttle_every : int
+                Answer every nth request with 429. 0 disables.
+            retry_after : int
+                Retry-After value sent with 429s.
+            fail_every : int
+                Answer every nth request with 503. 0 disables.
+            port : int
+                Port to listen on. 0 picks a free one.
+
+        """
+        self.data = data
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.fail_every = fail_every
+        self.hits = collections.Counter()
+        self.throttled = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._count = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port),
+                                          self._make_handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever,
+                                        kwargs={"poll_interval": 0.05},
+                                        daemon=True)
+
+    @property
+    def url(self):
+        """Root url of the server."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base(self):
+        """Url to use in place of https://na1.api.riotgames.com/lol/."""
+        return f"{self.url}/lol/"
+
+    @property
+    def platform_api_base(self):
+        """Url template to use as Summoner.API_BASE for any platform."""
+        return f"{self.url}/{{platform}}/lol/"
+
+    @property
+    def ddragon_base(self):
+        """Url to use in place of https://ddragon.leagueoflegends.com."""
+        return self.url
+
+    def __enter__(self):
+        """Start serving."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, raw_path, etag=None):
+        """
+        Apply injected faults, then route the request.
+
+        Every 200 carries an ETag. A matching 'etag' gets a bodiless 304.
+
+        Parameters:
+            raw_path : str
+            etag : str
+                The request's If-None-Match header.
+
+        Returns : tuple
+            Format : (status : int, body : object, headers : dict)
+
+        """
+        parsed = urlparse(raw_path)
+        query = {key: value[-1]
+                 for key, value in parse_qs(parsed.query).items()}
+        with self._lock:
+            self._count += 1
+            count = self._count
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if self.throttle_every and count % self.throttle_every == 0:
+                with self._lock:
+                    self.throttled += 1
+                return (429, {"status": {"status_code": 429}},
+                        {"Retry-After": str(self.retry_after)})
+            if self.fail_every and count % self.fail_every == 0:
+                with self._lock:
+                    self.failed += 1
+                return 503, {"status": {"status_code": 503}}, {}
+            path = unquote(parsed.path)
+            status, body = self.data.route(
+                re.sub(r"^/\w+(?=/lol/)", "", path), query)
+            with self._lock:
+                self.hits[path] += 1
+            if status != 200:
+                return status, body, {}
+            digest = zlib.crc32(json.dumps(body, sort_keys=True).encode())
+            tag = f'"{digest:08x}"'
+            if etag == tag:
+                return 304, None, {"ETag": tag}
+            return status, body, {"ETag": tag}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _make_handler(self):
+        """Build the request handler class bound to this stub."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Serve GET requests from the stub."""
+
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Answer one GET request."""
+                status, body, headers = stub.answer(
+                    self.path, self.headers.get("If-None-Match"))
+                payload = b""
+                if body is not None:
+                    payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                """Keep test output quiet."""
+
+        return Handler
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter copying successful responses into FakeRiotData."""
+
+    def __init__(self, data, **kwargs):
+        """
+        Initialize RecordingAdapter object.
+
+        Parameters:
+            data : FakeRiotData
+            kwargs :
+                Passed to HTTPAdapter.
+
+        """
+        super().__init__(**kwargs)
+        self.data = data
+        self._lock = threading.Lock()
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=W0221
+        """Send a request and record its response."""
+        response = super().send(request, *args, **kwargs)
+        if response.status_code == 200:
+            with self._lock:
+                self.data.record(unquote(urlparse(request.url).path),
+                                 response.json())
+        return response
+
+
+def record(names, directory, match_limit=20):
+    """
+    Record fixtures for summoners from the live API.
+
+    Parameters:
+        names : list
+        directory : str
+        match_limit : int
+            Games recorded per summoner.
+
+    """
+    # Imported here so the stub itself does not depend on Summoner.
+    from summoner_container import Summoner  # pylint: disable=C0415
+    data = FakeRiotData(n_champions=0)
+    client = Summoner.clients.get(Summoner.region)
+    client.session.mount("https://", RecordingAdapter(data))
+    version = client.get_json(f"{Summoner.DDRAGON_BASE}/realms/na.json",
+                              limited=False)["v"]
+    client.get_json(f"{Summoner.DDRAGON_BASE}/cdn/{version}/data/en_US/"
+                    f"champion.json", limited=False)
+    for name in names:
+        summ = Summoner(name, verbose=False, match_limit=match_limit,
+                        incremental=False, MATCH_CACHE_PATH=None)
+        summ.compute_results()
+    data.save(directory)
+
+
+def main(argv=None):
+    """Record or serve fixtures from the command line."""
+    parser = argparse.ArgumentParser(description="Riot API stand-in.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_cmd = commands.add_parser("record")
+    record_cmd.add_argument("names", nargs="+")
+    record_cmd.add_argument("--out", required=True)
+    record_cmd.add_argument("--matches", type=int, default=20)
+    serve_cmd = commands.add_parser("serve")
+    serve_cmd.add_argument("fixtures")
+    serve_cmd.add_argument("--port", type=int, default=8081)
+    serve_cmd.add_argument("--latency", type=float, default=0.0)
+    serve_cmd.add_argument("--throttle-every", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        record(args.names, args.out, args.matches)
+        return
+    stub = RiotStub(FakeRiotData.load(args.fixtures), args.latency,
+                    args.throttle_every, port=args.port)
+    with stub:
+        print(f"Serving {args.fixtures} at {stub.api_base}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#! /usr/bin/env python3
+"""
+Champion statistics over sliding windows of recent games.
+
+A RollingStats window keeps the ChampionStats counters of its last N
+games, or of its games from the last so many seconds, up to date as
+games arrive: the new game is added and every game falling out of the
+window is subtracted, touching at most ten counters each. Queries read
+the counters only, never the games behind them.
+"""
+import collections
+import numpy as np
+from champ_stats import COLUMNS, COMPARISONS, ChampionStats
+
+
+class RollingStats:
+    """ChampionStats over the most recent games."""
+
+    def __init__(self, max_games=None, max_age=None):
+        """
+        Initialize RollingStats object.
+
+        Parameters:
+            max_games : int
+                Games kept. Unlimited if None.
+            max_age : float
+                Seconds a game is kept, counted back from the newest
+                timestamp seen. Unlimited if None.
+
+        """
+        if max_games is None and max_age is None:
+            raise ValueError("a window needs max_games or max_age")
+        self.max_games = max_games
+        self.max_age = max_age
+        self.table = np.zeros((0, len(COLUMNS)), dtype=np.int64)
+        self.newest = None
+        self._window = collections.deque()
+
+    def _count(self, match, sign):
+        """Add a match to the counters, or subtract it if sign is -1."""
+        win, champion, allies, enemies = match
+        top = max(champion, *allies, *enemies)
+        if top >= len(self.table):
+            table = np.zeros((max(top + 1, 2 * len(self.table)),
+                              len(COLUMNS)), dtype=np.int64)
+            table[:len(self.table)] = self.table
+            self.table = table
+        table = self.table
+        for ids, col in (((champion,), 0), (allies, 1), (enemies, 2)):
+            for champ in ids:
+                if champ:
+                    table[champ, col] += sign
+                    if win:
+                        table[champ, col + 3] += sign
+
+    def add(self, match, timestamp=None):
+        """
+        Add a game, dropping any that fall out of the window.
+
+        Parameters:
+            match : MatchRecord or tuple
+                (win, champion, allies, enemies), as returned by
+                Summoner.get_match_data().
+            timestamp : float
+                Seconds; required with max_age. Must not be older than
+                the newest game added.
+
+        """
+        if timestamp is None:
+            if self.max_age is not None:
+                raise ValueError("games need a timestamp with max_age")
+        elif self.newest is not None and timestamp < self.newest:
+            raise ValueError(f"game at {timestamp} is older than the "
+                             f"newest one, at {self.newest}")
+        else:
+            self.newest = timestamp
+        match = tuple(match)
+        self._window.append((timestamp, match))
+        self._count(match, 1)
+        while self.max_games is not None and \
+                len(self._window) > self.max_games:
+            self._count(self._window.popleft()[1], -1)
+        if timestamp is not None:
+            self.expire(timestamp)
+
+    def expire(self, now):
+        """
+        Drop games older than max_age at time 'now'.
+
+        Parameters:
+            now : float
+
+        Returns : int
+            Number of games dropped.
+
+        """
+        if self.max_age is None:
+            return 0
+        dropped = 0
+        while self._window and self._window[0][0] <= now - self.max_age:
+            self._count(self._window.popleft()[1], -1)
+            dropped += 1
+        return dropped
+
+    def holds(self, index, age):
+        """
+        Check whether the window would keep a game.
+
+        Parameters:
+            index : int
+                Number of newer games.
+            age : float
+                Seconds before the newest game it was played.
+
+        Returns : bool
+
+        """
+        return ((self.max_games is None or index < self.max_games) and
+                (self.max_age is None or age < self.max_age))
+
+    @property
+    def stats(self):
+        """
+        Get the window's counters.
+
+        Shares the counters, so it changes as games are added.
+
+        Returns : ChampionStats
+
+        """
+        return ChampionStats(self.table)
+
+    def top(self, sort_by, k=5):
+        """
+        Rank champions in the window like Summoner.comp_champ_stats().
+
+        Parameters:
+            sort_by : str
+                Key of COMPARISONS.
+            k : int
+
+        Returns : list
+            Rows of [id, played_as, same_team, other_team, wins_as,
+            wins_with, wins_against].
+
+        """
+        column, descending, count = COMPARISONS[sort_by]
+        stats = self.stats
+        return [stats.row(champ)
+                for champ in stats.top_k(column, k, descending, count)]
+
+    def __len__(self):
+        """Get the number of games in the window."""
+        return len(self._window)
+
+
+class RecentForm:
+    """Several named RollingStats windows fed the same games."""
+
+    def __init__(self, windows):
+        """
+        Initialize RecentForm object.
+
+        Parameters:
+            windows : dict
+                Format : {name : RollingStats}
+
+        """
+        self.windows = dict(windows)
+
+    def add(self, match, timestamp=None):
+        """
+        Add a game to every window.
+
+        Parameters:
+            match : MatchRecord or tuple
+            timestamp : float
+
+        """
+        for window in self.windows.values():
+            window.add(match, timestamp)
+
+    def expire(self, now):
+        """
+        Drop games older than each window's max_age at time 'now'.
+
+        Parameters:
+            now : float
+
+        Returns : int
+            Number of games dropped, over every window.
+
+        """
+        return sum(window.expire(now) for window in self.windows.values())
+
+    def holds(self, index, age):
+        """
+        Check whether any window would keep a game.
+
+        Parameters:
+            index : int
+            age : float
+
+        Returns : bool
+            See RollingStats.holds().
+
+        """
+        return any(window.holds(index, age)
+                   for window in self.windows.values())
+
+    def top(self, name, sort_by, k=5):
+        """
+        Rank champions in one window.
+
+        Parameters:
+            name : str
+            sort_by : str
+            k : int
+
+        Returns : list
+            See RollingStats.top().
+
+        """
+        return self.windows[name].top(sort_by, k)
+
+    def __getitem__(self, name):
+        """Get a window by name."""
+        return self.windows[name]
@@ -0,0 +1,145 @@
+#! /usr/bin/env python3
+"""
+Data Dragon static data kept on disk between runs.
+
+The current version of a realm is revalidated with ETag/If-Modified-Since
+at most once per TTL, and champion data for a version is only downloaded
+once, whichever realm asked for it.
+The champion id to name index is built at download time and stored
+with it. Loaded data is handed out as read-only mappings, shared by
+every thread.
+"""
+import json
+import os
+import threading
+import time
+import types
+
+
+class StaticDataCache:  # pylint: disable=R0902,R0913,R0917
+    """Versioned Data Dragon champion data stored in a directory."""
+
+    def __init__(self, directory, client, ddragon_base, ttl=3600.0,
+                 clock=time.time, realm="na"):
+        """
+        Initialize StaticDataCache object.
+
+        Parameters:
+            directory : str
+            client : RiotClient
+            ddragon_base : str
+            ttl : float
+                Seconds a known version is trusted without asking.
+            clock : callable
+            realm : str
+                Data Dragon realm, such as "na" or "euw".
+
+        """
+        self.directory = directory
+        self.client = client
+        self.ddragon_base = ddragon_base
+        self.ttl = ttl
+        self.clock = clock
+        self.realm = realm
+        self._lock = threading.Lock()
+        self._loaded = None
+
+    def _path(self, name):
+        """Get the path of a file in the cache directory."""
+        return os.path.join(self.directory, name)
+
+    def _read(self, name):
+        """
+        Read a JSON file from the cache directory.
+
+        Returns : object
+            None if the file is missing or unreadable.
+
+        """
+        try:
+            with open(self._path(name), 'r', encoding="utf-8") as read_file:
+                return json.load(read_file)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, name, content):
+        """Atomically write a JSON file to the cache directory."""
+        os.makedirs(self.directory, exist_ok=True)
+        temp = self._path(f".{name}.{threading.get_ident()}")
+        with open(temp, 'w', encoding="utf-8") as write_file:
+            json.dump(content, write_file)
+        os.replace(temp, self._path(name))
+
+    def current_version(self):
+        """
+        Get the current Data Dragon version, revalidating when stale.
+
+        Returns : str
+
+        """
+        name = f"realm-{self.realm}.json"
+        realm = self._read(name)
+        now = self.clock()
+        if realm is not None and now - realm["checked"] < self.ttl:
+            return realm["v"]
+        headers = dict()
+        if realm is not None:
+            if realm.get("etag"):
+                headers["If-None-Match"] = realm["etag"]
+            if realm.get("last_modified"):
+                headers["If-Modified-Since"] = realm["last_modified"]
+        response = self.client.get(f"{self.ddragon_base}/realms/"
+                                   f"{self.realm}.json",
+                                   limited=False, headers=headers)
+        if response.status_code != 304 or realm is None:
+            realm = {"v": response.json()["v"]}
+        realm.update(checked=now,
+                     etag=response.headers.get("ETag", realm.get("etag")),
+                     last_modified=response.headers.get(
+                         "Last-Modified", realm.get("last_modified")))
+        self._write(name, realm)
+        return realm["v"]
+
+    def load(self):
+        """
+        Get static data, downloading only what is missing or stale.
+
+        Returns : tuple
+            Format : (version : str, champions : mappingproxy,
+            index : mappingproxy)
+            'index' maps champion key to champion id name.
+
+        """
+        with self._lock:
+            if (self._loaded is not None and
+                    self.clock() - self._loaded[0] < self.ttl):
+                return self._loaded[1]
+            version = self.current_version()
+            name = f"champion-{version}.json"
+            stored = self._read(name)
+            if stored is None:
+                champions = self.client.get_json(
+                    f"{self.ddragon_base}/cdn/{version}/data/en_US/"
+                    f"champion.json", limited=False)
+                stored = {"champions": champions,
+                          "index": build_index(champions)}
+                self._write(name, stored)
+            data = (version, types.MappingProxyType(stored["champions"]),
+                    types.MappingProxyType(stored["index"]))
+            self._loaded = (self.clock(), data)
+            return data
+
+
+def build_index(static_champions):
+    """
+    Map champion keys to readable champion ids.
+
+    Parameters:
+        static_champions : dict
+            Data Dragon champion.json.
+
+    Returns : dict
+
+    """
+    return {str(champ["key"]): champ["id"]
+            for champ in static_champions["data"].values()}
@@ -5,97 +5,277 @@ Container for module containing data for one summoner.
 Class contains methods to operate on data.
 """
 import argparse
+import contextlib
 import json
-import time
 import re
-import requests
+import threading
+from champ_stats import COMPARISONS, ChampionStats
+from identities import IdentityResolver
+from match_pipeline import MatchPipelineMixin
+from pair_stats import PairStats
+from parallel_stats import champion_stats
+from regions import PLATFORMS, RegionClients, check_platform
+from report_profiler import Profiler
+from rolling_stats import RecentForm
+from static_data import StaticDataCache, build_index
+from summoner_report import REPORT_KEYS, SummonerReport, label
+
+
+class Summoner(MatchPipelineMixin):
+    """
+    Contains data for one summoner and methods to calculate return data.
+
+    Class attributes hold settings and caches every instance shares:
+    clients, identities and static data, all safe to use from many
+    threads. Everything a report computes stays local to the call, so
+    one Summoner, or many, can run reports concurrently. Requests and
+    match downloads come from MatchPipelineMixin.
+    """
+
+    verbose = True
+    API_TEST_KEY = "RGAPI-fa695a0d-056b-48fd-8546-e05e28120a29"
+    API_BASE = "https://{platform}.api.riotgames.com/lol/"
+    DDRAGON_BASE = "https://ddragon.leagueoflegends.com"
+    SEASON = 13
+    QUEUE = 400
+    MATCH_CACHE_PATH = "match_cache.sqlite3"
+    MATCH_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    # About 100000 games' participants, some 70 MB of index.
+    MATCH_CACHE_MAX_RECORDS = 1000000
+    STATIC_DATA_DIR = "static_data"
+    STATIC_DATA_TTL = 3600
+    match_workers = 8
+    incremental = True
+    index_participants = True
+    match_limit = None
+    raw_file = None
+    profiler = None
+    region = "na1"
+    clients = RegionClients()
+    identities = IdentityResolver()
+    _static_caches = dict()
+    _static_lock = threading.Lock()
+
+    comp_list = REPORT_KEYS[:-1]
+
+    def __init__(self, name=None, static_data=None, match_cache=None,
+                 identities=None, **config):
+        """
+        Initialize Summoner object.
+
+        No requests are made and no files are opened until a method
+        needs them.
 
+        Parameters:
+            name : str
+                Summoner to report on.
+            static_data : tuple
+                Output of get_static_data() to reuse. Loaded on first use
+                if None.
+            match_cache : MatchCache
+                Shared match cache. MATCH_CACHE_PATH is opened on first
+                use if None.
+            identities : IdentityResolver
+                Memo of get_summoner_by_name() results. Defaults to one
+                shared by every Summoner.
+            config :
+                Overrides for class settings such as region,
+                match_workers, match_limit, incremental,
+                index_participants, raw_file, verbose or profiler.
+
+        """
+        for key, value in config.items():
+            if key.startswith("_") or not hasattr(Summoner, key):
+                raise TypeError(f"unknown Summoner setting {key!r}")
+            setattr(self, key, value)
+        check_platform(self.region)
+        self.summoner_in = "" if name is None else name
+        self.bad_connect = False
+        if identities is not None:
+            self.identities = identities
+        self._static_data = static_data
+        self._match_cache = match_cache
+        self._lock = threading.Lock()
+
+    @property
+    def static_data(self):
+        """Get Data Dragon data, loaded on first use."""
+        with self._lock:
+            if self._static_data is None:
+                self._static_data = self.get_static_data(self.region)
+            return self._static_data
+
+    def _stage(self, name):
+        """Time a block as a stage of 'profiler', if there is one."""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.stage(name)
 
-class Summoner:
-    """Contains data for one summoner and methods to calculate return data."""
+    def process(self):
+        """Call functions used for getting information."""
+        report = self.compute_results()
+        with self._stage("static_data"):
+            id_dict = self.static_data[2]
+        with self._stage("report"):
+            self.parse_results(id_dict, report)
+        return "all clear"
 
-    bad_connect = False
-    API_TEST_KEY = "RGAPI-fa695a0d-056b-48fd-8546-e05e28120a29"
-    summoner_in = ""
-    static_data = ()
+    def compute_results(self):
+        """
+        Download and compare the summoner's matches.
 
-    big_data = list()
+        Returns : SummonerReport
+            Six comp_champ_stats() results in 'comp_list' order, followed
+            by the mastery comparison.
 
-    def __init__(self):
-        """Initialize Summoner object."""
-        con = self.check_connection()
-        if con is True:
-            self.summoner_in = self.get_user_input()
-            self.static_data = self.get_static_data()
-        else:
-            self.bad_connect = True
-            return
+        """
+        api_key = self.API_TEST_KEY
+        name = self.summoner_in
+        with self._stage("summoner"):
+            summoner_by_name = self.get_summoner_by_name(name, api_key)
+        with self._stage("mastery"):
+            mastery = self.get_champion_mastery(summoner_by_name[1],
+                                                api_key)
+        champ_stats = self.update_champion_stats(name, summoner_by_name[2],
+                                                 api_key)
+        with self._stage("compare"):
+            comp_results = [self.comp_champ_stats(champ_stats, d)
+                            for d in self.comp_list]
+            comp_results.append(self.comp_champ_stats(champ_stats,
+                                                      'wins-against',
+                                                      mastery))
+        return SummonerReport(name, self.region, comp_results)
+
+    def update_champion_stats(self, name, account_id, api_key):
+        """
+        Get champion stats, folding new games into the saved aggregate.
+
+        Only games newer than the last one counted are requested, so the
+        cost follows the number of new games. A saved aggregate covers
+        the whole season, so it is only used without a match_limit; the
+        newest match_limit games are counted from scratch, from cached
+        payloads where possible. Without a match cache, or with
+        incremental off, every game is counted from scratch too.
 
-    def process(self):
-        """Call functions used for getting information."""
+        Parameters:
+            name : str
+            account_id : str
+            api_key : str
+
+        Returns : ChampionStats
+
+        """
+        key = f"{account_id}:{self.SEASON}:{self.QUEUE}"
+        folding = (self.incremental and self.match_cache is not None and
+                   self.match_limit is None)
+        saved = None
+        if folding:
+            saved = self.match_cache.get_aggregate(key)
+        begin_time = None
+        newest = (0, 0)
+        champ_stats = ChampionStats()
+        if saved is not None:
+            champ_stats, begin_time, last_game_id = saved
+            newest = (begin_time, last_game_id)
+        high_water = [newest]
+
+        def new_games():
+            for match in self.iter_matchlist(account_id, api_key,
+                                             self.match_limit, begin_time):
+                mark = (match["timestamp"], match["gameId"])
+                if mark > newest:
+                    high_water[0] = max(high_water[0], mark)
+                    yield match
+
+        matchlist_data = self.stream_match_data(name, new_games(), api_key,
+                                                self.raw_file)
+        # Downloads overlap with counting, so "match_wait" and
+        # "match_parse" are parts of "match_stats", not extra time.
+        with self._stage("match_stats"):
+            champ_stats = champ_stats.merge(self.create_stat_dict_2(
+                matchlist_data))
+        if folding and high_water[0] > newest:
+            self.match_cache.put_aggregate(key, champ_stats, *high_water[0])
+        return champ_stats
+
+    def get_pair_stats(self):
+        """
+        Count the summoner's games per pair of champions.
+
+        Covers the same games as compute_results(), at most match_limit,
+        taking matches from the match cache where it has them.
+
+        Returns : PairStats
+
+        """
         api_key = self.API_TEST_KEY
         name = self.summoner_in
-        summoner_by_name = self.get_summoner_by_name(name, api_key)
-        matchlist_by_summ = self.get_matchlist_by_summoner(name, api_key)
-        tmp_file_name = self.compile_match_list(matchlist_by_summ, api_key)
-        mastery = self.get_champion_mastery(summoner_by_name[1], api_key)
-        matchlist_data = self.get_match_list_data(name, tmp_file_name)
-        stat_dict = self.create_stat_dict_2(matchlist_data)
-        data_array = self.flatten_stat_dict(stat_dict)
-        comp_list = ["wins-as", "wins-with", "wins-against",
-                     "losses-as", "losses-with", "losses-against"]
-        comp_results = [self.comp_champ_stats(data_array, d)
-                        for d in comp_list]
-
-        self.big_data.append(comp_results[0])
-        self.big_data.append(comp_results[1])
-        self.big_data.append(comp_results[2])
-        self.big_data.append(comp_results[3])
-        self.big_data.append(comp_results[4])
-        self.big_data.append(comp_results[5])
-        self.big_data.append(self.comp_champ_stats(data_array,
-                                                   'wins-against',
-                                                   mastery))
-        self.parse_results(self.get_champion_ids(self.static_data[1]))
-        return "all clear"
+        account_id = self.get_summoner_by_name(name, api_key)[2]
+        games = self.iter_matchlist(account_id, api_key, self.match_limit)
+        with self._stage("pair_stats"):
+            return PairStats.from_matches(self.stream_match_data(
+                name, games, api_key))
 
-    def handle_request(self, ext, **queries):
+    def get_recent_form(self, windows):
         """
-        Handle API request.
+        Fill rolling windows with the summoner's games, oldest first.
 
-        Return result if successful. Handle status code otherwise.
+        Only the newest games some window can hold are listed and
+        fetched, at most match_limit, taking matches from the match
+        cache where it has them. Later games can be added to the result
+        as they are played.
 
         Parameters:
-            ext : str
-                Riot API request url extension. Appended to 'base.'
-            queries : str
-                Key-value pairs passed in to form querystring.
+            windows : dict
+                Format : {name : RollingStats}
+
+        Returns : RecentForm
+
+        """
+        api_key = self.API_TEST_KEY
+        name = self.summoner_in
+        account_id = self.get_summoner_by_name(name, api_key)[2]
+        form = RecentForm(windows)
+        times = list()
+
+        def wanted():
+            # Newest first, so the first game no window holds ends the
+            # list, and the pages after it are never requested.
+            for index, game in enumerate(self.iter_matchlist(
+                    account_id, api_key, self.match_limit)):
+                seconds = game["timestamp"] / 1000
+                if not form.holds(index, times[0] - seconds if times else 0):
+                    return
+                times.append(seconds)
+                yield game
+
+        # Windows take games oldest first, so the bounded tail is held
+        # until the oldest of it has arrived.
+        records = list(self.stream_match_data(name, wanted(), api_key))
+        for seconds, record in zip(reversed(times), reversed(records)):
+            form.add(record, seconds)
+        return form
+
+    def summarize_results(self, comp_results):
+        """
+        Label compute_results() output for JSON serialization.
+
+        Parameters:
+            comp_results : SummonerReport or list
+
         Returns : dict
+            Format : {comparison : [{champion, id, played_as, same_team,
+            other_team, wins_as, wins_with, wins_against}]}
 
         """
-        base = 'https://na1.api.riotgames.com/lol/'
-        querystring = {key: value for key, value in queries.items()}
-        url = f"{base}{ext}"
-        try:
-            request = requests.get(url, params=querystring)
-            header = request.headers
-            if request.raise_for_status() is None:
-                return request.json()
-            raise requests.exceptions.HTTPError
-        except requests.exceptions.HTTPError as http_except:
-            if request.status_code == 429:
-                sleep_time = int(header["Retry-After"])+2
-                print(f"Rate limit reached. Resting for {sleep_time} seconds.")
-                time.sleep(sleep_time)
-                retry = self.handle_request(ext, **queries)
-                return retry
-            print(f"HTTP Error: {http_except}")
-            raise requests.exceptions.HTTPError
+        return label(comp_results, self.static_data[2])
 
     def check_connection(self):
         """
         Check connection before proceeding.
 
+        Sets bad_connect when the check fails.
+
         Returns : bool
 
         """
@@ -107,6 +287,7 @@ class Summoner:
             connect = False
         else:
             connect = True
+        self.bad_connect = not connect
         return connect
 
     @staticmethod
@@ -117,148 +298,76 @@ class Summoner:
         Returns : str
 
         """
-        parser = argparse.ArgumentParser()
-        parser.add_argument("summoner", type=str, help="Name of summoner")
-        args = parser.parse_args()
-        name = args.summoner
-        name_is_valid = False
-        while name_is_valid is False:
-            try:
-                if re.match(r"^[\w ]+$", name) is not None:
-                    if re.match(r".*_.*", name) is None:
-                        return name
-                    raise ValueError
-                raise ValueError
-            except ValueError:
-                name = input("Name invalid. Please try again: ")
-
-    def get_summoner_by_name(self, summ_name, api_key):
-        """
-        Get summoner's identifiers by name.
+        return Summoner.get_arguments().summoner
 
-        Parameters:
-            summ_name : string
-        Returns: tuple
-            format : (name : str, summoner_id :
-            str, account_id : str, icon : str)
-
-        """
-        query = {"api_key": api_key}
-        summoner = self.handle_request(f"summoner/v4/summoners/by-name/\
-{summ_name}", **query)
-        name = summoner['name']
-        summoner_id = summoner['id']
-        account_id = summoner['accountId']
-        current_ver = self.static_data[0]
-        icon = f"http://ddragon.leagueoflegends.com/cdn/{current_ver}/img/\
-profileicon/{summoner['profileIconId']}.png"
-        return (name, summoner_id, account_id, icon)
-
-    def get_matchlist_by_summoner(self, summ_name, api_key):
+    @staticmethod
+    def get_arguments(argv=None):
         """
-        Get summoner's games for current season.
+        Parse command line arguments, prompting until the name is valid.
 
         Parameters:
-            summ_name : str
-            api_key : str
+            argv : list
+                Defaults to sys.argv.
 
-        Returns : dict
-
-        """
-        account_id = self.get_summoner_by_name(summ_name, api_key)[2]
-        query = {"season": 13, "queue": 400, "api_key": api_key}
-        match_list = self.handle_request(f"match/v4/matchlists/by-account/\
-{account_id}", **query)
-        return match_list
+        Returns : argparse.Namespace
 
-    def compile_match_list(self, matchlist, api_key):
         """
-        Compile matches into one json file with detailed data.
-
-        Parameters:
-            matchlist : dict
-
-        """
-        header = "{\"matches\":["
-        closer = "]}"
-        breaker = ","
-        temp_file_name = "temp_data_file.json"
-        with open(temp_file_name, 'w+', encoding="utf-8") as write_file:
-            print("Updating stats...")
-            write_file.write(header)
-            for match in matchlist["matches"][0:100]:
-                match_id = match["gameId"]
-                query = {"api_key": api_key}
-                match_data = self.handle_request(f"match/v4/matches/\
-{match_id}", **query)
-                write_file.write(json.dumps(match_data))
-                if match is not matchlist["matches"][99]:
-                    write_file.write(breaker)
-            write_file.write(closer)
-            print("Stats updated.")
-
-        with open(temp_file_name, 'r', encoding='utf-8') as check:
-            test = json.load(check)
-            for match in test["matches"]:
-                if match is None:
-                    print(f"Failure retrieving match {match}")
-                    raise TypeError
-        return temp_file_name
+        parser = argparse.ArgumentParser()
+        parser.add_argument("summoner", type=str, help="Name of summoner")
+        parser.add_argument("--region", default=Summoner.region,
+                            choices=sorted(PLATFORMS),
+                            help="platform the summoner plays on")
+        parser.add_argument("--profile", metavar="FILE",
+                            help="write a JSON timing report to FILE")
+        parser.add_argument("--capture", action="append", default=list(),
+                            choices=["cprofile", "tracemalloc"],
+                            help="also profile functions or memory")
+        args = parser.parse_args(argv)
+        while not Summoner.valid_name(args.summoner):
+            args.summoner = input("Name invalid. Please try again: ")
+        return args
 
     @staticmethod
-    def get_match_data(game, summoner):
+    def valid_name(name):
         """
-        Get data from match.
-
-        Gets win/loss value, summoner's champion, teammates' champions, and
-        opponents' champions.
+        Check that a summoner name is well formed.
 
         Parameters:
-            game : dict
-            summoner : str
+            name : str
 
-        Returns : tuple
+        Returns : bool
 
         """
-        for summ in game["participantIdentities"]:
-            if summ["player"]["summonerName"] == summoner:
-                player_id = summ["participantId"]
-                player_stats = game["participants"][player_id-1]
-                player_team = player_stats["teamId"]
-                player_champion = player_stats["championId"]
-                player_win = player_stats["stats"]["win"]
+        return (re.match(r"^[\w ]+$", name) is not None and
+                re.match(r".*_.*", name) is None)
 
-        if player_team == 100:
-            teammates = [summ for summ in game["participants"][0:5]
-                         if summ["participantId"] != player_id]
-            opponents = [summ for summ in game["participants"][5:10]]
-        else:
-            teammates = [summ for summ in game["participants"][5:10]
-                         if summ["participantId"] != player_id]
-            opponents = [summ for summ in game["participants"][0:5]]
-
-        team = [summoner["championId"] for summoner in teammates]
-        enemy = [summoner["championId"] for summoner in opponents]
-
-        return_data = (player_win, player_champion, team, enemy)
-        return return_data
-
-    def get_match_list_data(self, summoner, temp_file):
+    def get_summoner_by_name(self, summ_name, api_key):
         """
-        Make list of results from get_match_data().
+        Get summoner's identifiers by name.
 
-        Parameters :
-            summoner : str
+        Results are remembered in 'identities', so repeated lookups of the
+        same summoner in the same region cost one request.
 
-        Returns : list
+        Parameters:
+            summ_name : string
+        Returns: tuple
+            format : (name : str, summoner_id :
+            str, account_id : str, icon : str, puuid : str)
 
         """
-        with open(temp_file, 'r', encoding="utf-8") as data:
-            matchlist = json.load(data)
-            num = summoner
-            ret_list = [self.get_match_data(i, num)
-                        for i in matchlist["matches"]]
-        return ret_list
+        def lookup(_key):
+            query = {"api_key": api_key}
+            summoner = self.handle_request(f"summoner/v4/summoners/by-name/\
+{summ_name}", **query)
+            name = summoner['name']
+            summoner_id = summoner['id']
+            account_id = summoner['accountId']
+            current_ver = self.static_data[0]
+            icon = f"http://ddragon.leagueoflegends.com/cdn/{current_ver}/\
+img/profileicon/{summoner['profileIconId']}.png"
+            return (name, summoner_id, account_id, icon, summoner['puuid'])
+
+        return self.identities.resolve(f"{self.region}:{summ_name}", lookup)
 
     def get_champion_mastery(self, summoner_id, api_key):
         """
@@ -280,25 +389,35 @@ profileicon/{summoner['profileIconId']}.png"
         m_list_2 = sorted(m_list, key=lambda x: x[1], reverse=True)[0:5]
         return m_list_2
 
-    @staticmethod
-    def get_static_data():
+    @classmethod
+    def get_static_data(cls, region=None):
         """
         Get current version data.
 
         Retrieves latest version data and matching champion data from static
-        data.
+        data. Both are kept in STATIC_DATA_DIR and only downloaded again
+        when Data Dragon publishes a new version.
+
+        Parameters:
+            region : str
+                Platform whose Data Dragon realm is used. Defaults to
+                'region'.
 
         Returns : tuple
-            Format : (string, dict)
+            Format : (string, dict, dict)
+            The last dict is get_champion_ids() of the champion data.
 
         """
-        base = "https://ddragon.leagueoflegends.com"
-        cv_request = requests.get(f"{base}/realms/na.json")
-        current_ver = cv_request.json()["v"]
-        champ_request = requests.get(f"{base}/cdn/{current_ver}\
-/data/en_US/champion.json")
-        champion_ids = champ_request.json()
-        return current_ver, champion_ids
+        region = check_platform(region or cls.region)
+        key = (cls.STATIC_DATA_DIR, cls.DDRAGON_BASE, region)
+        with cls._static_lock:
+            if key not in cls._static_caches:
+                cls._static_caches[key] = StaticDataCache(
+                    cls.STATIC_DATA_DIR, cls.clients.get(region),
+                    cls.DDRAGON_BASE, cls.STATIC_DATA_TTL,
+                    realm=PLATFORMS[region])
+            cache = cls._static_caches[key]
+        return cache.load()
 
     @staticmethod
     def get_champion_ids(static_champions):
@@ -308,133 +427,26 @@ profileicon/{summoner['profileIconId']}.png"
         Returns : dict
 
         """
-        clist = dict()
-        for champ in static_champions["data"]:
-            key = str(static_champions["data"][champ]["key"])
-            name = static_champions["data"][champ]["id"]
-            clist[key] = name
-        return clist
+        return build_index(static_champions)
 
     @staticmethod
-    def stat_entry(stats, update=None):
-        """
-        Update stat entry.
-
-        Parameters:
-            stats : tuple
-                (self, ally, enemy, win_self, win_with, win_against)
-            update : dict
-
-        Returns : dict
-
-        """
-        if update is None:
-            stat_entry = {"id": stats[0],
-                          "played_as": stats[1],
-                          "same_team": stats[2],
-                          "other_team": stats[3],
-                          "wins_as": stats[4],
-                          "wins_with": stats[5],
-                          "wins_against": stats[6]}
-            return stat_entry
-
-        ret_update = update
-        for num, key in enumerate(ret_update):
-            if num > 0:
-                ret_update[key] += stats[num]
-        return ret_update
-
-    def debrancher_true(self, update_dict, match_tuple):
-        """
-        Substitute branch.
-
-        Parameters:
-            update_dict : dict
-            match_tuple : tuple
-
-        Returns: dict
-
+    def create_stat_dict_2(list_of_tuples, workers=1):
         """
-        if match_tuple[1] not in update_dict:
-            update_dict[match_tuple[1]] = self.stat_entry((match_tuple[1],
-                                                           1, 0, 0, 1, 0, 0))
-        else:
-            update_dict[match_tuple[1]] = self.stat_entry((match_tuple[1],
-                                                           1, 0, 0, 1, 0, 0),
-                                                          update_dict[
-                                                              match_tuple[1]])
-        for summ_2 in match_tuple[2]:
-            if summ_2 not in update_dict:
-                update_dict[summ_2] = self.stat_entry((summ_2,
-                                                       0, 1, 0, 0, 1, 0))
-            else:
-                update_dict[summ_2] = self.stat_entry((summ_2,
-                                                       0, 1, 0, 0, 1, 0),
-                                                      update_dict[summ_2])
-        for summ_3 in match_tuple[3]:
-            if summ_3 not in update_dict:
-                update_dict[summ_3] = self.stat_entry((summ_3,
-                                                       0, 0, 1, 0, 0, 1))
-            else:
-                update_dict[summ_3] = self.stat_entry((summ_3,
-                                                       0, 0, 1, 0, 0, 1),
-                                                      update_dict[summ_3])
-        return update_dict
-
-    def debrancher_false(self, update_dict, match_tuple):
-        """
-        Substitute branch.
+        Count games as, with and against each champion.
 
         Parameters:
-            update_dict : dict
-            match_tuple : tuple
+            list_of_tuples : iterable
+                MatchRecords, or records from get_match_data().
+            workers : int
+                Processes to count in. Only worth more than one for
+                millions of records; see parallel_stats.
 
-        Returns: dict
+        Returns : ChampionStats
 
         """
-        if match_tuple[1] not in update_dict:
-            update_dict[match_tuple[1]] = self.stat_entry(([match_tuple[1]],
-                                                           1, 0, 0, 0, 0, 0))
-        else:
-            update_dict[match_tuple[1]] = self.stat_entry(([match_tuple[1]],
-                                                           1, 0, 0, 0, 0, 0),
-                                                          update_dict[
-                                                              match_tuple[1]])
-        for summ_2 in match_tuple[2]:
-            if summ_2 not in update_dict:
-                update_dict[summ_2] = self.stat_entry((summ_2,
-                                                       0, 1, 0, 0, 0, 0))
-            else:
-                update_dict[summ_2] = self.stat_entry((summ_2,
-                                                       0, 1, 0, 0, 0, 0),
-                                                      update_dict[summ_2])
-        for summ_3 in match_tuple[3]:
-            if summ_3 not in update_dict:
-                update_dict[summ_3] = self.stat_entry((summ_3,
-                                                       0, 0, 1, 0, 0, 0))
-            else:
-                update_dict[summ_3] = self.stat_entry((summ_3,
-                                                       0, 0, 1, 0, 0, 0),
-                                                      update_dict[summ_3])
-        return update_dict
-
-    def create_stat_dict_2(self, list_of_tuples):
-        """
-        Create dict containing data for each champion.
-
-        Parameters:
-            list_of_tuples : tuple
-
-        Returns : dict
-
-        """
-        stat_dict = dict()
-        for match in list_of_tuples:
-            if match[0] is True:
-                stat_dict = self.debrancher_true(stat_dict, match)
-            else:
-                stat_dict = self.debrancher_false(stat_dict, match)
-        return stat_dict
+        if workers != 1:
+            return champion_stats(list_of_tuples, workers)
+        return ChampionStats.from_matches(list_of_tuples)
 
     @staticmethod
     def flatten_stat_dict(stat_dict):
@@ -453,54 +465,45 @@ profileicon/{summoner['profileIconId']}.png"
     @staticmethod
     def comp_champ_stats(champion_array, sort_by, compare=None):
         """
-        Operate on 2D array of champion statistics, returning based on key.
+        Operate on champion statistics, returning based on key.
 
         Parameters:
-            champion_array : list
-                2D array containing statistics.
+            champion_array : ChampionStats
             compare : list
                 List containing ids of highest mastery champions.
             sort_by : str
                 Key indicating what to return.
         Returns : list
+            Rows of [id, played_as, same_team, other_team, wins_as,
+            wins_with, wins_against].
 
         """
         if compare is not None:
-            cmp_array = list()
-            for c_tuple in compare:
-                for d_tuple in champion_array:
-                    if c_tuple[0] == d_tuple[0]:
-                        cmp_array.append(d_tuple)
+            seen = set(champion_array.seen().tolist())
+            cmp_array = [champion_array.row(c_tuple[0]) for c_tuple in compare
+                         if c_tuple[0] in seen]
             return sorted(cmp_array, key=lambda x: x[6], reverse=True)
-        count = 5
-        if sort_by == "wins-as":
-            team, rev_value, count = (1, True, 1)
-        if sort_by == "wins-with":
-            team, rev_value = (2, True)
-        if sort_by == "wins-against":
-            team, rev_value = (3, True)
-        if sort_by == "losses-as":
-            team, rev_value = (1, False)
-        if sort_by == "losses-with":
-            team, rev_value = (2, False)
-        if sort_by == "losses-against":
-            team, rev_value = (3, False)
-
-        ret_list = [x for x in champion_array if x[team] >= count]
-        ret_list_2 = sorted(ret_list,
-                            key=lambda x: x[team],
-                            reverse=rev_value)[0:5]
-
-        return ret_list_2
-
-    def parse_results(self, id_dict):
-        """Interpret results to be readable."""
-        high_wins_as = self.big_data[0]
-        high_wins_with = self.big_data[1]
-        high_wins_against = self.big_data[2]
-        low_wins_as = self.big_data[3]
-        low_wins_with = self.big_data[4]
-        low_wins_against = self.big_data[5]
+        column, rev_value, count = COMPARISONS[sort_by]
+        return [champion_array.row(champ)
+                for champ in champion_array.top_k(column, 5, rev_value,
+                                                  count)]
+
+    @staticmethod
+    def parse_results(id_dict, report):
+        """
+        Print results in readable form.
+
+        Parameters:
+            id_dict : dict
+            report : SummonerReport
+
+        """
+        high_wins_as = report[0]
+        high_wins_with = report[1]
+        high_wins_against = report[2]
+        low_wins_as = report[3]
+        low_wins_with = report[4]
+        low_wins_against = report[5]
 
         print("Most frequently played as:")
         a_1 = [(id_dict[str(x[0])], f"{x[1]} games")
@@ -532,6 +535,23 @@ profileicon/{summoner['profileIconId']}.png"
         print(f_6)
 
 
+def main(argv=None):
+    """Report on one summoner from the command line."""
+    args = Summoner.get_arguments(argv)
+    profiler = None
+    capture = contextlib.nullcontext()
+    if args.profile is not None:
+        profiler = Profiler(cprofile="cprofile" in args.capture,
+                            trace_memory="tracemalloc" in args.capture)
+        capture = profiler.capture(Summoner.clients.get(args.region).metrics)
+    instance = Summoner(args.summoner, profiler=profiler, region=args.region)
+    if instance.check_connection():
+        with capture:
+            print(instance.process())
+        if profiler is not None:
+            with open(args.profile, 'w', encoding="utf-8") as write_file:
+                json.dump(profiler.report(), write_file, indent=2)
+
+
 if __name__ == "__main__":
-    INSTANCE = Summoner()
-    print(INSTANCE.process())
+    main()
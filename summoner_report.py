@@ -0,0 +1,122 @@
+#! /usr/bin/env python3
+"""
+Immutable result of one summoner report.
+
+Summoner.compute_results() builds a SummonerReport once and never
+changes it, so reports can be cached, compared and handed between
+threads without copying.
+"""
+from champ_stats import COMPARISONS
+
+
+# Comparison names, in report order, followed by the mastery comparison.
+REPORT_KEYS = tuple(COMPARISONS) + ("mastery",)
+
+ROW_FIELDS = ("id", "played_as", "same_team", "other_team",
+              "wins_as", "wins_with", "wins_against")
+
+
+def label(results, id_dict):
+    """
+    Label report results for JSON serialization.
+
+    Parameters:
+        results : iterable
+            comp_champ_stats() results in REPORT_KEYS order. May stop
+            early.
+        id_dict : dict
+            Champion key to champion id name.
+
+    Returns : dict
+        Format : {comparison : [{champion, id, played_as, same_team,
+        other_team, wins_as, wins_with, wins_against}]}
+
+    """
+    summary = dict()
+    for key, rows in zip(REPORT_KEYS, results):
+        summary[key] = [dict(zip(ROW_FIELDS, row),
+                             champion=id_dict.get(str(row[0])))
+                        for row in rows]
+    return summary
+
+
+class SummonerReport:  # pylint: disable=E1101
+    """
+    Ranked champion rows of every comparison for one summoner.
+
+    Iterates and indexes like the list of seven comp_champ_stats()
+    results compute_results() used to return, and by comparison name.
+    """
+
+    __slots__ = ("summoner", "region", "results")
+
+    def __init__(self, summoner, region, results):
+        """
+        Initialize SummonerReport object.
+
+        Parameters:
+            summoner : str
+            region : str
+            results : iterable
+                comp_champ_stats() results in REPORT_KEYS order.
+
+        """
+        results = tuple(tuple(tuple(int(value) for value in row)
+                              for row in rows) for rows in results)
+        if len(results) != len(REPORT_KEYS):
+            raise ValueError(f"expected {len(REPORT_KEYS)} results, got "
+                             f"{len(results)}")
+        object.__setattr__(self, "summoner", summoner)
+        object.__setattr__(self, "region", region)
+        object.__setattr__(self, "results", results)
+
+    def __setattr__(self, name, value):
+        """Refuse changes."""
+        raise AttributeError("SummonerReport is immutable")
+
+    def __delattr__(self, name):
+        """Refuse changes."""
+        raise AttributeError("SummonerReport is immutable")
+
+    def __getitem__(self, key):
+        """Get results by position or comparison name."""
+        if isinstance(key, str):
+            return self.results[REPORT_KEYS.index(key)]
+        return self.results[key]
+
+    def __iter__(self):
+        """Iterate over results in REPORT_KEYS order."""
+        return iter(self.results)
+
+    def __len__(self):
+        """Get the number of comparisons."""
+        return len(self.results)
+
+    def summary(self, id_dict):
+        """
+        Label the results for JSON serialization.
+
+        Parameters:
+            id_dict : dict
+
+        Returns : dict
+            See label().
+
+        """
+        return label(self.results, id_dict)
+
+    def __eq__(self, other):
+        """Compare summoner, region and results."""
+        if not isinstance(other, SummonerReport):
+            return NotImplemented
+        return ((self.summoner, self.region, self.results) ==
+                (other.summoner, other.region, other.results))
+
+    def __hash__(self):
+        """Hash summoner, region and results."""
+        return hash((self.summoner, self.region, self.results))
+
+    def __repr__(self):
+        """Get a readable representation."""
+        return (f"SummonerReport({self.summoner!r}, {self.region!r}, "
+                f"{self.results!r})")
@@ -0,0 +1,90 @@
+#! /usr/bin/env python3
+"""Module to test batch reports against a local stub server."""
+import io
+import json
+import pytest
+from batch import BatchRunner, parse_limit, read_names
+from identities import IdentityResolver
+from match_cache import MatchCache
+from rate_limiter import RateLimiter
+from regions import RegionClients
+from riot_client import RiotClient
+from riot_stub import FakeRiotData, RiotStub
+from summoner_container import Summoner
+
+
+@pytest.fixture()
+def stub(monkeypatch, tmp_path):
+    data = FakeRiotData()
+    for name in ("Bork", "Thirty One", "Yassuo"):
+        data.add_summoner(name, 12)
+    with RiotStub(data, throttle_every=11) as server:
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(Summoner, "API_BASE", server.api_base)
+        monkeypatch.setattr(Summoner, "DDRAGON_BASE", server.ddragon_base)
+        monkeypatch.setattr(Summoner, "identities", IdentityResolver())
+        monkeypatch.setattr(Summoner, "clients", RegionClients(
+            lambda _: RiotClient(RateLimiter(((100, 1),)), retry_padding=0)))
+        yield server
+
+
+def test_read_names():
+    """Test that blanks, comments and repeats are skipped."""
+    lines = ["Bork\n", "\n", "# ladder\n", " Yassuo \n", "Bork\n"]
+    assert list(read_names(lines)) == ["Bork", "Yassuo"]
+
+
+def test_batch_run(stub):
+    """Test that failures are recorded without stopping the batch."""
+    out = io.StringIO()
+    runner = BatchRunner(workers=2, match_cache=MatchCache(":memory:"))
+    summary = runner.run(["Bork", "Nobody", "B@rk", "Thirty One", "Yassuo"],
+                         out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(line["summoner"] for line in lines) == [
+        "Bork", "Thirty One", "Yassuo"]
+    for line in lines:
+        assert len(line["results"]) == 7
+        assert line["results"]["wins-as"][0]["champion"].startswith("Champ")
+    assert sorted(f["summoner"] for f in summary["failures"]) == [
+        "B@rk", "Nobody"]
+    assert summary["players"] == 5
+    assert summary["players_per_second"] > 0
+    assert stub.hits["/realms/na.json"] == 1
+    for name in ("Bork", "Thirty One", "Yassuo"):
+        assert stub.hits[f"/lol/summoner/v4/summoners/by-name/{name}"] == 1
+
+
+def test_regions_run_independently(monkeypatch, tmp_path):
+    """Test that a throttled region does not hold back another one."""
+    data = FakeRiotData()
+    for name in ("Bork", "Thirty One", "Yassuo"):
+        data.add_summoner(name, 12)
+    limits = {"na1": ((4, 0.5),), "euw1": ((1000, 1),)}
+    with RiotStub(data) as server:
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(Summoner, "API_BASE", server.platform_api_base)
+        monkeypatch.setattr(Summoner, "DDRAGON_BASE", server.ddragon_base)
+        monkeypatch.setattr(Summoner, "identities", IdentityResolver())
+        monkeypatch.setattr(Summoner, "clients", RegionClients(
+            lambda platform: RiotClient(RateLimiter(limits[platform]))))
+        out = io.StringIO()
+        runner = BatchRunner(workers=1, match_limit=12)
+        summary = runner.run(["Bork", "euw1/Yassuo", "euw1/Thirty One",
+                              "xx9/Bork"], out)
+        again = runner.report("euw1/Yassuo")
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [line["region"] for line in lines] == ["euw1", "euw1", "na1"]
+    assert [f["summoner"] for f in summary["failures"]] == ["xx9/Bork"]
+    assert server.hits["/na1/lol/summoner/v4/summoners/by-name/Bork"] == 1
+    assert server.hits["/euw1/lol/summoner/v4/summoners/by-name/Yassuo"] == 1
+    assert "/euw1/lol/summoner/v4/summoners/by-name/Bork" not in server.hits
+    assert (tmp_path / "match_cache-euw1.sqlite3").exists()
+    assert again in lines
+
+
+@pytest.mark.parametrize("text, limit", [("all", None), ("ALL", None),
+                                         ("250", 250)])
+def test_parse_limit(text, limit):
+    """Test that 'all' lifts the game limit."""
+    assert parse_limit(text) == limit
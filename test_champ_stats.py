@@ -0,0 +1,50 @@
+#! /usr/bin/env python3
+"""Module to test ChampionStats against a plain dict count."""
+import numpy as np
+import pytest
+from champ_stats import COMPARISONS, ChampionStats
+from riot_stub import random_matches
+
+
+def reference_rows(matches):
+    """Count the way the old stat_entry dicts did."""
+    stats = dict()
+    for win, own, team, enemy in matches:
+        for ids, col in (([own], 0), (team, 1), (enemy, 2)):
+            for champ in ids:
+                row = stats.setdefault(champ, [champ, 0, 0, 0, 0, 0, 0])
+                row[col + 1] += 1
+                row[col + 4] += int(win)
+    return [stats[key] for key in sorted(stats)]
+
+
+@pytest.mark.parametrize("count", [0, 1, 250])
+def test_counts_match_reference(count):
+    """Test that every counter equals a straightforward recount."""
+    matches = random_matches(count, n_champions=60)
+    stats = ChampionStats.from_matches(matches, chunk=64)
+    assert stats.rows() == reference_rows(matches)
+
+
+@pytest.mark.parametrize("sort_by", sorted(COMPARISONS))
+def test_top_k_matches_sort(sort_by):
+    """Test that top_k picks what a full sort with id tie-break picks."""
+    matches = random_matches(120, seed=3, n_champions=60)
+    stats = ChampionStats.from_matches(iter(matches))
+    column, descending, count = COMPARISONS[sort_by]
+    rows = [r for r in reference_rows(matches) if r[column + 1] >= count]
+    sign = -1 if descending else 1
+    expected = sorted(rows, key=lambda r: (sign * r[column + 1], r[0]))[:5]
+    got = [stats.row(champ) for champ in stats.top_k(column, 5, descending,
+                                                     count)]
+    assert got == expected
+
+
+def test_merge_equals_single_pass():
+    """Test that merging partial counts gives the whole count."""
+    matches = random_matches(300, seed=5, n_champions=60)
+    whole = ChampionStats.from_matches(matches)
+    parts = ChampionStats.from_matches(matches[:100]).merge(
+        ChampionStats.from_matches(matches[100:]))
+    assert parts == whole
+    assert np.array_equal(parts.table, whole.table)
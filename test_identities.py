@@ -0,0 +1,46 @@
+#! /usr/bin/env python3
+"""Module to test IdentityResolver."""
+from identities import IdentityResolver
+
+
+class FakeClock:
+    """Settable clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_resolve_memoizes_normalized_names():
+    """Test that spacing and case variants share one lookup."""
+    calls = list()
+    resolver = IdentityResolver()
+    lookup = lambda name: calls.append(name) or ("id", name)
+    assert resolver.resolve("Thirty One", lookup) == ("id", "Thirty One")
+    assert resolver.resolve("thirtyone", lookup) == ("id", "Thirty One")
+    assert calls == ["Thirty One"]
+    assert (resolver.hits, resolver.misses) == (1, 1)
+
+
+def test_entries_expire():
+    """Test that an identity is looked up again after the TTL."""
+    clock = FakeClock()
+    resolver = IdentityResolver(ttl=10, clock=clock)
+    resolver.put("Bork", ("a",))
+    clock.now = 9
+    assert resolver.get("Bork") == ("a",)
+    clock.now = 10
+    assert resolver.get("Bork") is None
+
+
+def test_least_recently_used_dropped():
+    """Test that the size bound drops the coldest entry."""
+    resolver = IdentityResolver(max_entries=2)
+    resolver.put("a", 1)
+    resolver.put("b", 2)
+    resolver.get("a")
+    resolver.put("c", 3)
+    assert resolver.get("b") is None
+    assert (resolver.get("a"), resolver.get("c")) == (1, 3)
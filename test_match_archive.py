@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+"""Module to test MatchArchive against counts from the match dicts."""
+import json
+import numpy as np
+import pytest
+from champ_stats import ChampionStats
+from match_archive import MatchArchive, read_matches
+from match_decode import dumps
+from riot_stub import FakeRiotData
+from summoner_container import Summoner
+
+
+@pytest.fixture()
+def data():
+    data = FakeRiotData(seed=5)
+    for name in ("Bork", "Thirty One", "Yassuo"):
+        data.add_summoner(name, 15)
+    for _ in range(10):
+        data.add_match(["Bork", "Yassuo"])
+    return data
+
+
+def expected_stats(matches, name=None):
+    records = list()
+    for match in matches:
+        views = Summoner.get_participant_data(match)
+        records.extend(views.values() if name is None else
+                       [views[name]] if name in views else [])
+    return ChampionStats.from_matches(records)
+
+
+def test_summoner_stats_through_compaction(data, tmp_path):
+    """Test that stats per summoner hold before and after compaction."""
+    matches = list(data.matches.values())
+    archive = MatchArchive(str(tmp_path / "archive"))
+    assert archive.append(matches[25:], chunk=7) == len(matches) - 25
+    assert archive.append(matches[:30]) == 30
+    appended = matches[25:] + matches[:30]
+    for name in ("Bork", "Yassuo", "Nobody"):
+        assert archive.champion_stats(name) == expected_stats(appended, name)
+    assert archive.compact() == 5
+    assert len(archive) == len(matches)
+    times = archive.column("timestamp")
+    assert np.all(np.diff(times) > 0)
+    assert archive.meta["indexed"] == len(matches)
+    for name in ("Bork", "Thirty One", "Yassuo", "Nobody"):
+        assert archive.champion_stats(name) == expected_stats(matches, name)
+    data.add_match(["Bork", "Thirty One"])
+    newest = data.matches[max(data.matches)]
+    archive.append([newest])
+    assert archive.champion_stats("Bork") == expected_stats(
+        matches + [newest], "Bork")
+    assert len(archive.entries("Bork")) == 26
+
+
+def test_all_seats_chunked(data, tmp_path):
+    """Test that chunked whole-archive stats count every seat."""
+    matches = list(data.matches.values())
+    archive = MatchArchive(str(tmp_path))
+    archive.append(matches)
+    assert archive.champion_stats(chunk=4) == expected_stats(matches)
+    assert archive.records(np.arange(10)).size == 10
+
+
+def test_reopen_and_torn_append(data, tmp_path):
+    """Test that uncommitted bytes are ignored and overwritten."""
+    matches = list(data.matches.values())
+    archive = MatchArchive(str(tmp_path))
+    archive.append(matches[:20])
+    archive.compact()
+    with open(archive._path("champion", 1), 'ab') as write_file:
+        write_file.write(b"torn write")
+    archive = MatchArchive(str(tmp_path))
+    assert len(archive) == 20
+    archive.append(matches[20:])
+    assert archive.champion_stats("Yassuo") == expected_stats(matches,
+                                                              "Yassuo")
+    assert archive.players == MatchArchive(str(tmp_path)).players
+
+
+def test_import_files(data, tmp_path):
+    """Test that NDJSON and JSON array files import alike."""
+    matches = list(data.matches.values())
+    ndjson = tmp_path / "matches.ndjson"
+    ndjson.write_bytes(b"".join(dumps(match) + b"\n" for match in matches))
+    array = tmp_path / "temp_data_file.json"
+    array.write_text(json.dumps(matches))
+    first = MatchArchive(str(tmp_path / "a"))
+    first.append(read_matches(str(ndjson)))
+    second = MatchArchive(str(tmp_path / "b"))
+    second.append(read_matches(str(array)))
+    for column in ("game_id", "champion", "player", "win", "queue"):
+        assert np.array_equal(first.column(column), second.column(column))
+    assert first.champion_stats("Bork") == expected_stats(matches, "Bork")
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_import_matches_object(data, tmp_path, indent):
+    """Test that an object with a "matches" array imports like NDJSON."""
+    matches = list(data.matches.values())
+    wrapped = tmp_path / "temp_data_file.json"
+    wrapped.write_text(json.dumps({"matches": matches}, indent=indent))
+    assert [match["gameId"] for match in read_matches(str(wrapped))] == [
+        match["gameId"] for match in matches]
+
+
+@pytest.mark.parametrize("content", ['"matches"', '{"games": []}', "1"])
+def test_import_unknown_file(tmp_path, content):
+    """Test that a file of no known format raises ValueError."""
+    path = tmp_path / "other.json"
+    path.write_text(content)
+    with pytest.raises(ValueError, match="matches"):
+        list(read_matches(str(path)))
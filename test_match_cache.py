@@ -0,0 +1,139 @@
+#! /usr/bin/env python3
+"""Module to test MatchCache."""
+import sqlite3
+from champ_stats import ChampionStats
+from match_cache import MatchCache
+from match_record import MatchRecord
+
+
+class FakeClock:
+    """Settable clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_and_miss_counters(tmp_path):
+    """Test that hits and misses are counted and payloads survive reopen."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = MatchCache(path)
+    assert cache.get(1) is None
+    cache.put(1, {"gameId": 1, "participants": []})
+    cache.close()
+    cache = MatchCache(path)
+    assert cache.get(1) == {"gameId": 1, "participants": []}
+    assert cache.get(2) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_age_eviction():
+    """Test that matches older than max_age are dropped."""
+    clock = FakeClock()
+    cache = MatchCache(":memory:", max_age=60, clock=clock)
+    cache.put(1, {"gameId": 1})
+    clock.now += 30
+    cache.put(2, {"gameId": 2})
+    clock.now += 45
+    assert cache.evict() == 1
+    assert cache.get(1) is None
+    assert cache.get(2) == {"gameId": 2}
+
+
+def test_size_eviction_keeps_recently_used():
+    """Test that the least recently used matches go first."""
+    clock = FakeClock()
+    cache = MatchCache(":memory:", clock=clock)
+    for game_id in range(5):
+        clock.now += 1
+        cache.put(game_id, {"gameId": game_id, "pad": "x" * 200})
+    clock.now += 1
+    cache.get(0)
+    cache.max_bytes = cache.stats()["bytes"] * 3 // 5
+    assert cache.evict() == 2
+    assert cache.get(0) is not None
+    assert cache.get(1) is None
+    assert cache.get(2) is None
+
+
+def test_hits_written_in_batches(tmp_path):
+    """Test that hits are written on evict() and close(), not each time."""
+    path = str(tmp_path / "cache.sqlite3")
+    clock = FakeClock()
+    cache = MatchCache(path, clock=clock)
+    cache.put(1, {"gameId": 1})
+    other = sqlite3.connect(path)
+    clock.now += 10
+    assert cache.get(1) == {"gameId": 1}
+    used = "SELECT used FROM matches WHERE game_id = 1"
+    assert other.execute(used).fetchone() == (1000.0,)
+    cache.evict()
+    assert other.execute(used).fetchone() == (1010.0,)
+    clock.now += 10
+    cache.get(1)
+    cache.close()
+    assert other.execute(used).fetchone() == (1020.0,)
+
+
+def test_aggregate_round_trip():
+    """Test that a saved aggregate comes back with its high-water mark."""
+    cache = MatchCache(":memory:")
+    assert cache.get_aggregate("acct") is None
+    stats = ChampionStats.from_matches([(True, 3, [1, 2], [4, 5])])
+    cache.put_aggregate("acct", stats, 1578000000000, 42)
+    saved, timestamp, game_id = cache.get_aggregate("acct")
+    assert saved == stats
+    assert (timestamp, game_id) == (1578000000000, 42)
+
+
+def test_participant_records():
+    """Test that indexed records come back per summoner and game."""
+    cache = MatchCache(":memory:")
+    assert cache.get_record(7, "Bork") is None
+    cache.put_records(7, {"Bork": MatchRecord(True, 3, [1, 2], [4, 5]),
+                          "Yassuo": MatchRecord(False, 4, [5], [3, 1, 2])})
+    assert cache.get_record(7, "Bork") == MatchRecord(True, 3, [1, 2],
+                                                      [4, 5])
+    assert cache.get_record(7, "Yassuo").enemies == (3, 1, 2)
+    assert cache.get_record(8, "Bork") is None
+    stats = cache.stats()
+    assert (stats["record_hits"], stats["records"], stats["hits"]) == \
+        (2, 2, 0)
+
+
+def test_record_eviction_keeps_recently_used():
+    """Test that participant records over max_records go by last use."""
+    clock = FakeClock()
+    cache = MatchCache(":memory:", clock=clock)
+    record = MatchRecord(True, 3, [1, 2], [4, 5])
+    for game_id in range(3):
+        clock.now += 1
+        cache.put_records(game_id, {"Bork": record, "Yassuo": record})
+    clock.now += 1
+    cache.get_record(0, "Bork")
+    cache.max_records = 3
+    cache.evict()
+    assert cache.stats()["records"] == 3
+    assert cache.get_record(0, "Bork") == record
+    assert cache.get_record(0, "Yassuo") is None
+    assert cache.get_record(1, "Bork") is None
+    assert cache.get_record(2, "Yassuo") == record
+
+
+def test_records_without_used_column(tmp_path):
+    """Test that an index saved before records had use times still opens."""
+    path = str(tmp_path / "cache.sqlite3")
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE participants (summoner TEXT NOT NULL, "
+                "game_id INTEGER NOT NULL, stored REAL NOT NULL, "
+                "record BLOB NOT NULL, PRIMARY KEY (summoner, game_id)) "
+                "WITHOUT ROWID")
+    old.commit()
+    old.close()
+    cache = MatchCache(path, max_records=1)
+    record = MatchRecord(False, 4, [5], [3, 1, 2])
+    cache.put_records(7, {"Bork": record})
+    assert cache.get_record(7, "Bork") == record
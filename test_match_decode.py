@@ -0,0 +1,52 @@
+#! /usr/bin/env python3
+"""Module to test match payload decoding."""
+import json
+import pytest
+import match_decode
+from match_cache import MatchCache
+from riot_stub import FakeRiotData
+from summoner_container import Summoner
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    data = FakeRiotData(seed=3)
+    data.add_summoner("Bork", 20)
+    return [json.dumps(dict(match, teams=[{"teamId": 100, "win": "Win"}]),
+                       indent=1).encode("utf-8")
+            for match in data.matches.values()]
+
+
+@pytest.mark.parametrize("backend", match_decode.backends())
+def test_backends_agree(payloads, backend):
+    """Test that every backend gives the same match data as json."""
+    for payload in payloads:
+        expected = json.loads(payload)
+        decoded = match_decode.project(payload, backend)
+        assert match_decode.project_tree(decoded) == \
+            match_decode.project_tree(expected)
+        assert Summoner.get_match_data(decoded, "Bork") == \
+            Summoner.get_match_data(expected, "Bork")
+
+
+def test_unknown_backend(payloads):
+    """Test that a backend that is not installed is rejected."""
+    with pytest.raises(ValueError):
+        match_decode.project(payloads[0], "ujson")
+
+
+def test_ndjson_line(payloads):
+    """Test that a pretty printed payload becomes a single line."""
+    line = match_decode.ndjson_line(payloads[0])
+    assert line.count(b"\n") == 1 and line.endswith(b"\n")
+    assert json.loads(line) == json.loads(payloads[0])
+    compact = match_decode.dumps({"gameId": 1})
+    assert match_decode.ndjson_line(compact) == compact + b"\n"
+
+
+def test_cache_keeps_raw_payload(payloads):
+    """Test that payloads are cached as received."""
+    cache = MatchCache(":memory:")
+    cache.put_payload(1, payloads[0])
+    assert cache.get_payload(1) == payloads[0]
+    assert cache.get(1) == json.loads(payloads[0])
@@ -0,0 +1,55 @@
+#! /usr/bin/env python3
+"""Module to test MatchRecord packing."""
+import numpy as np
+import pytest
+from champ_stats import ChampionStats
+from match_record import MATCH_DTYPE, MatchRecord, MatchRecords, pack
+
+
+def test_record_unpacks_like_tuple():
+    """Test that a record indexes and unpacks like the old tuples."""
+    record = MatchRecord(1, 7, [1, 2, 3, 4], [5, 6, 8, 9, 10])
+    win, champion, allies, enemies = record
+    assert (win, champion, allies, enemies) == (True, 7, (1, 2, 3, 4),
+                                                (5, 6, 8, 9, 10))
+    assert record[2] == (1, 2, 3, 4)
+    assert not hasattr(record, "__dict__")
+
+
+def test_round_trip_with_short_teams():
+    """Test that packing keeps matches, short teams included."""
+    matches = [MatchRecord(True, 3, [1, 2], [4, 5, 6, 7, 8]),
+               MatchRecord(False, 900, [], [10]),
+               MatchRecord(False, 1, [2, 3, 4, 5], [6, 7, 8, 9, 11])]
+    records = MatchRecords.from_iterable(iter(matches), chunk=2)
+    assert MATCH_DTYPE.itemsize == 21
+    assert records.nbytes == 21 * len(matches)
+    assert list(records) == matches
+    assert records[1] == matches[1]
+    assert records == matches
+
+
+def test_append_grows():
+    """Test that appending one at a time keeps every match."""
+    records = MatchRecords(capacity=1)
+    for champion in range(1, 50):
+        records.append((champion % 2, champion, [champion], [champion]))
+    assert len(records) == 49
+    assert records.array["champion"].tolist() == list(range(1, 50))
+
+
+def test_too_many_allies_rejected():
+    """Test that a team bigger than the fixed width is an error."""
+    with pytest.raises(ValueError):
+        pack([(True, 1, [2, 3, 4, 5, 6], [7])])
+
+
+def test_padding_not_counted():
+    """Test that empty slots are not counted as champion 0."""
+    matches = [(True, 3, [1, 2], [4, 5]), (False, 4, [3], [1, 2, 5])]
+    from_tuples = ChampionStats.from_matches(matches)
+    from_records = ChampionStats.from_matches(
+        MatchRecords.from_iterable(matches))
+    assert from_records == from_tuples
+    assert 0 not in from_records.seen().tolist()
+    assert np.array_equal(from_records.table[0], np.zeros(6))
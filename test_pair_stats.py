@@ -0,0 +1,73 @@
+#! /usr/bin/env python3
+"""Module to test PairStats against a plain dict count."""
+import pytest
+from match_record import MatchRecords
+from pair_stats import PairStats
+from riot_stub import random_matches
+
+
+def reference_pairs(matches):
+    """Count (relation, own, other) -> [games, wins] with dicts."""
+    pairs = dict()
+    for win, own, team, enemy in matches:
+        for rel, others in (("ally", team), ("enemy", enemy)):
+            for other in others:
+                entry = pairs.setdefault((rel, own, other), [0, 0])
+                entry[0] += 1
+                entry[1] += int(win)
+    return pairs
+
+
+@pytest.mark.parametrize("count", [0, 1, 400])
+def test_counts_match_reference(count):
+    """Test that every pair equals a straightforward recount."""
+    matches = random_matches(count, n_champions=30)
+    stats = PairStats.from_matches(matches, chunk=64)
+    expected = reference_pairs(matches)
+    for (rel, own, other), (games, wins) in expected.items():
+        assert stats.pair(own, other, rel) == (games, wins)
+    for rel in ("ally", "enemy"):
+        assert int(stats.games[rel].sum()) == sum(
+            games for (r, _, _), (games, _) in expected.items() if r == rel)
+    assert stats.pair(999, 1) == (0, 0)
+
+
+def test_records_equal_tuples():
+    """Test that packed records and streamed tuples count the same."""
+    matches = random_matches(300, seed=2, n_champions=30)
+    matches.append((True, 40, [41], []))
+    whole = PairStats.from_matches(MatchRecords.from_iterable(matches))
+    assert whole == PairStats.from_matches(iter(matches), chunk=50)
+    assert 0 not in whole.ids.tolist()
+
+
+@pytest.mark.parametrize("relation, descending",
+                         [("ally", True), ("ally", False),
+                          ("enemy", True), ("enemy", False)])
+@pytest.mark.parametrize("champion", [None, 7])
+def test_top_k_matches_sort(relation, descending, champion):
+    """Test that top_k ranks like a full sort of the reference."""
+    matches = random_matches(500, seed=4, n_champions=30)
+    stats = PairStats.from_matches(matches)
+    rows = [(own, other, games, wins)
+            for (rel, own, other), (games, wins)
+            in reference_pairs(matches).items()
+            if rel == relation and games >= 2 and
+            champion in (None, own)]
+    sign = -1 if descending else 1
+    expected = sorted(rows, key=lambda r: (sign * r[3] / r[2], -r[2],
+                                           r[0], r[1]))[:6]
+    assert stats.top_k(champion, relation, 6, descending, 2) == expected
+
+
+def test_named_queries():
+    """Test the best and worst ally and matchup shortcuts."""
+    matches = [(True, 1, [2], [5]), (True, 1, [2], [6]),
+               (False, 1, [3], [5]), (False, 1, [3], [6]),
+               (False, 1, [2], [6])]
+    stats = PairStats.from_matches(matches)
+    assert stats.best_allies(1, k=1) == [(1, 2, 3, 2)]
+    assert stats.worst_allies(1, k=1) == [(1, 3, 2, 0)]
+    assert stats.best_matchups(k=1) == [(1, 5, 2, 1)]
+    assert stats.worst_matchups(1, k=1) == [(1, 6, 3, 1)]
+    assert stats.best_allies(4) == []
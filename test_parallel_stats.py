@@ -0,0 +1,48 @@
+#! /usr/bin/env python3
+"""Module to test parallel counting against ChampionStats in one process."""
+import concurrent.futures
+import pytest
+from champ_stats import ChampionStats
+from match_archive import MatchArchive
+from match_record import MatchRecords
+from parallel_stats import archive_stats, champion_stats, ranges
+from riot_stub import FakeRiotData, random_matches
+from summoner_container import Summoner
+
+
+@pytest.mark.parametrize("total,workers,chunk", [(0, 2, None),
+                                                 (10, 3, None),
+                                                 (1000, 4, 64),
+                                                 (5, 8, None)])
+def test_ranges_cover_rows(total, workers, chunk):
+    """Test that ranges cover every row exactly once, in order."""
+    bounds = ranges(total, workers, chunk)
+    rows = [row for start, stop in bounds for row in range(start, stop)]
+    assert rows == list(range(total))
+    assert all(start < stop for start, stop in bounds)
+
+
+@pytest.mark.parametrize("count", [0, 1, 999])
+def test_pool_matches_serial(count):
+    """Test that partial tables merge to the single-process counts."""
+    matches = random_matches(count, n_champions=60)
+    expected = ChampionStats.from_matches(matches)
+    records = MatchRecords.from_iterable(matches)
+    with concurrent.futures.ProcessPoolExecutor(2) as pool:
+        for chunk in (None, 1, 100):
+            assert champion_stats(records, chunk=chunk,
+                                  executor=pool) == expected
+    assert champion_stats(matches, workers=3) == expected
+    assert Summoner.create_stat_dict_2(matches, workers=2) == expected
+    assert champion_stats(records.array, workers=1) == expected
+
+
+def test_archive_matches_serial(tmp_path):
+    """Test that workers counting an archive agree with one process."""
+    data = FakeRiotData(seed=3)
+    data.add_summoner("Bork", 40)
+    archive = MatchArchive(str(tmp_path))
+    assert archive_stats(str(tmp_path), workers=2) == ChampionStats()
+    assert archive.append(data.matches.values()) == 40
+    assert archive_stats(str(tmp_path), workers=2,
+                         chunk=3) == archive.champion_stats()
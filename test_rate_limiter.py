@@ -0,0 +1,56 @@
+#! /usr/bin/env python3
+"""Module to test RateLimiter."""
+import threading
+from rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Clock that only moves when slept on."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now += seconds
+
+
+def make_limiter(limits):
+    clock = FakeClock()
+    return RateLimiter(limits, clock.time, clock.sleep), clock
+
+
+def test_burst_then_wait():
+    """Test that a full bucket blocks until its window rolls over."""
+    limiter, clock = make_limiter(((3, 1),))
+    for _ in range(3):
+        assert limiter.acquire() == 0
+    assert limiter.acquire() == 1
+    assert clock.now == 1
+
+
+def test_every_window_is_honored():
+    """Test that no window ever sees more than its count."""
+    limiter, clock = make_limiter(((20, 1), (100, 120)))
+    stamps = list()
+    for _ in range(250):
+        limiter.acquire()
+        stamps.append(clock.now)
+    for count, period in limiter.limits:
+        for num, stamp in enumerate(stamps):
+            in_window = [s for s in stamps[num:] if s < stamp + period]
+            assert len(in_window) <= count
+    assert clock.now >= 240
+
+
+def test_pause_delays_next_token():
+    """Test that a Retry-After pause holds back every worker."""
+    limiter, clock = make_limiter(((20, 1),))
+    limiter.acquire()
+    limiter.pause(5)
+    assert limiter.acquire() == 5
+    assert clock.now == 5
@@ -0,0 +1,181 @@
+#! /usr/bin/env python3
+"""Module to test RefreshScheduler against a stub on a simulated clock."""
+import threading
+import pytest
+from identities import IdentityResolver
+from match_cache import MatchCache
+from rate_limiter import BudgetLimiter, RateLimiter
+from refresh_scheduler import RefreshScheduler
+from regions import RegionClients
+from riot_client import RiotClient
+from riot_stub import FakeRiotData, RiotStub
+from summoner_container import Summoner
+
+
+LIMITS = ((20, 1), (100, 120))
+
+
+class FakeClock:
+    """Clock that only moves when slept on."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now += seconds
+
+
+class RecordingLimiter(RateLimiter):
+    """RateLimiter remembering when it handed out each token."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.taken = list()
+
+    def acquire(self):
+        waited = super().acquire()
+        self.taken.append(self.clock())
+        return waited
+
+
+def most_in_window(times, period):
+    return max((sum(1 for other in times if start <= other < start + period)
+                for start in times), default=0)
+
+
+@pytest.fixture()
+def roster(monkeypatch, tmp_path):
+    data = FakeRiotData()
+    for name in ("Bork", "Thirty One", "Yassuo"):
+        data.add_summoner(name, 10)
+    clock = FakeClock()
+    shared = RecordingLimiter(LIMITS, clock.time, clock.sleep)
+    with RiotStub(data) as stub:
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(Summoner, "API_BASE", stub.api_base)
+        monkeypatch.setattr(Summoner, "DDRAGON_BASE", stub.ddragon_base)
+        monkeypatch.setattr(Summoner, "identities", IdentityResolver())
+        monkeypatch.setattr(Summoner, "clients", RegionClients(
+            lambda _: RiotClient(shared, sleep=clock.sleep)))
+        yield data, clock, shared, stub
+
+
+def test_budget_limiter_share():
+    """Test that background tokens stay within their share of a window."""
+    clock = FakeClock()
+    shared = RecordingLimiter(LIMITS, clock.time, clock.sleep)
+    budget = BudgetLimiter(shared, 0.25)
+    assert budget.own.limits == ((5, 1), (25, 120))
+    for _ in range(30):
+        budget.acquire()
+    assert most_in_window(shared.taken, 1) == 5
+    assert most_in_window(shared.taken, 120) == 25
+    assert shared.delay() == 0
+    with pytest.raises(ValueError):
+        BudgetLimiter(shared, 0)
+
+
+def test_active_summoners_refresh_first(roster):
+    """Test that idle summoners back off while active ones stay fresh."""
+    data, clock, shared, _ = roster
+    scheduler = RefreshScheduler(["Bork", "Thirty One", "Yassuo"],
+                                 fraction=0.25, min_interval=60,
+                                 max_interval=480, clock=clock.time)
+    played = 0
+    while clock.now < 3600:
+        if clock.now // 300 > played:
+            data.add_summoner("Yassuo", 1)
+            played += 1
+        clock.sleep(max(scheduler.run_pending(), 1))
+    metrics = scheduler.metrics()
+    background = list(shared.taken)
+    assert metrics["tracked"] == 3
+    assert metrics["failures"] == 0
+    assert metrics["refreshes"] >= 3 + 10
+    assert metrics["unchanged"] > 0
+    assert metrics["max_staleness_seconds"] <= 480 + 60
+    report, age = scheduler.report("Yassuo")
+    assert age <= 300
+    fresh = Summoner("Yassuo", MatchCache(":memory:"), verbose=False)
+    assert report == fresh.compute_results()
+    assert most_in_window(background, 120) <= 25
+    assert most_in_window(background, 1) <= 5
+    assert scheduler.report("Nobody") is None
+
+
+def test_budget_leaves_headroom(roster):
+    """Test that a backlog of refreshes spends only its share."""
+    _, clock, shared, _ = roster
+    scheduler = RefreshScheduler(["Bork", "Thirty One", "Yassuo"],
+                                 fraction=0.1, clock=clock.time)
+    assert scheduler.metrics()["queue_depth"] == 3
+    scheduler.run_pending()
+    metrics = scheduler.metrics()
+    assert metrics["refreshes"] == 3
+    assert metrics["queue_depth"] == 0
+    assert metrics["max_lag_seconds"] > 0
+    assert most_in_window(shared.taken, 1) <= 2
+    assert most_in_window(shared.taken, 120) <= 10
+    assert shared.delay() == 0
+
+
+def test_failures_are_rescheduled(roster):
+    """Test that an unknown summoner is counted and retried later."""
+    _, clock, _, _ = roster
+    scheduler = RefreshScheduler(["Nobody"], min_interval=60,
+                                 clock=clock.time)
+    assert scheduler.run_pending() == 120
+    assert scheduler.metrics()["failures"] == 1
+    assert scheduler.report("Nobody") is None
+    scheduler.untrack("Nobody")
+    clock.sleep(500)
+    scheduler.run_pending()
+    assert scheduler.metrics()["polls"] == 1
+    with pytest.raises(ValueError):
+        scheduler.track("B@rk")
+
+
+def test_unexpected_failure_keeps_polling(roster, monkeypatch):
+    """Test that any refresh error is counted and later summoners polled."""
+    _, clock, _, _ = roster
+    scheduler = RefreshScheduler(["Bork", "Yassuo"], min_interval=60,
+                                 clock=clock.time)
+    refresh = scheduler.refresh
+
+    def flaky(tracked):
+        if tracked.name == "Bork":
+            raise RuntimeError("disk full")
+        return refresh(tracked)
+
+    monkeypatch.setattr(scheduler, "refresh", flaky)
+    scheduler.run_pending()
+    metrics = scheduler.metrics()
+    assert (metrics["polls"], metrics["failures"], metrics["refreshes"]) == \
+        (2, 1, 1)
+    assert scheduler.report("Bork") is None
+    assert scheduler.report("Yassuo") is not None
+    clock.sleep(120)
+    scheduler.run_pending()
+    assert scheduler.metrics()["failures"] == 2
+
+
+def test_long_idle_backoff_stays_bounded(monkeypatch):
+    """Test that a summoner idle for weeks is still polled every max."""
+    clock = FakeClock()
+    scheduler = RefreshScheduler(["Bork"], region="na1",
+                                 clients=RegionClients(lambda _: None),
+                                 clock=clock.time)
+    monkeypatch.setattr(scheduler, "refresh", lambda tracked: False)
+    waits = list()
+    for _ in range(1100):
+        clock.sleep(scheduler._queue[0][0] - clock.now)
+        waits.append(scheduler.run_pending())
+    assert scheduler.metrics()["polls"] == 1100
+    assert scheduler._tracked[("na1", "Bork")].idle_polls == 4
+    assert waits[:5] == [600, 1200, 2400, 3600, 3600]
+    assert waits[-1] == 3600
@@ -0,0 +1,58 @@
+#! /usr/bin/env python3
+"""Module to test platform handling."""
+import pytest
+from regions import RegionCaches, RegionClients, check_platform, split_name
+from summoner_container import Summoner
+
+
+@pytest.mark.parametrize("entry, expected", [
+    ("Bork", ("na1", "Bork")), ("euw1/Thirty One", ("euw1", "Thirty One")),
+    ("kr/Faker", ("kr", "Faker"))])
+def test_split_name(entry, expected):
+    """Test that a platform prefix is split off, defaulting otherwise."""
+    assert split_name(entry, "na1") == expected
+
+
+def test_unknown_platform():
+    """Test that unknown platforms are rejected early."""
+    with pytest.raises(ValueError):
+        check_platform("na")
+    with pytest.raises(ValueError):
+        split_name("xx9/Bork", "na1")
+    with pytest.raises(ValueError):
+        Summoner("Bork", region="mars1")
+
+
+def test_one_client_per_platform():
+    """Test that platforms get separate clients, pools and limiters."""
+    clients = RegionClients()
+    na1 = clients.get("na1")
+    euw1 = clients.get("euw1")
+    assert clients.get("na1") is na1
+    assert na1 is not euw1
+    assert na1.session is not euw1.session
+    assert na1.rate_limiter is not euw1.rate_limiter
+    assert [platform for platform, _ in clients.items()] == ["euw1", "na1"]
+
+
+def test_one_cache_per_platform():
+    """Test that each platform's cache is opened once, unless given."""
+    opened = list()
+    caches = RegionCaches(lambda platform: opened.append(platform) or None,
+                          {"kr": "given"})
+    assert caches.get("na1") is None
+    assert caches.get("na1") is None
+    assert caches.get("kr") == "given"
+    assert opened == ["na1"]
+    with pytest.raises(ValueError):
+        caches.get("mars1")
+
+
+def test_summoner_region_urls(monkeypatch):
+    """Test that a summoner's region picks its url, client and cache."""
+    monkeypatch.setattr(Summoner, "clients", RegionClients())
+    summ = Summoner("Bork", region="euw1")
+    assert summ.api_base == "https://euw1.api.riotgames.com/lol/"
+    assert summ.client is Summoner.clients.get("euw1")
+    assert Summoner("Bork").api_base == "https://na1.api.riotgames.com/lol/"
+    assert Summoner.match_cache_path("kr") == "match_cache-kr.sqlite3"
@@ -0,0 +1,57 @@
+#! /usr/bin/env python3
+"""Module to test Profiler."""
+import json
+from report_profiler import Profiler, http_delta
+
+
+def test_stage_times_and_hooks():
+    """Test that stages accumulate and call every hook."""
+    calls = list()
+    profiler = Profiler(hooks=[lambda *args: calls.append(args)])
+    for _ in range(3):
+        with profiler.stage("parse"):
+            sum(range(10000))
+    profiler.record("download", 2.0, 0.5)
+    stages = profiler.report()["stages"]
+    assert stages["parse"]["calls"] == 3
+    assert stages["parse"]["wall_seconds"] > 0
+    assert stages["download"] == {"calls": 1, "wall_seconds": 2.0,
+                                  "cpu_seconds": 0.5}
+    assert [name for name, _, _ in calls] == ["parse"] * 3 + ["download"]
+
+
+def test_http_delta():
+    """Test that only traffic between the snapshots is reported."""
+    before = {"/a": {"calls": 2, "retries": 1, "errors": 0, "bytes": 10,
+                     "sleep_seconds": 1.0, "total_seconds": 0.5},
+              "/b": {"calls": 1, "retries": 0, "errors": 0, "bytes": 5,
+                     "sleep_seconds": 0.0, "total_seconds": 0.1}}
+    after = {"/a": {"calls": 5, "retries": 2, "errors": 1, "bytes": 40,
+                    "sleep_seconds": 1.5, "total_seconds": 1.0},
+             "/b": dict(before["/b"]),
+             "/c": {"calls": 1, "retries": 0, "errors": 0, "bytes": 7,
+                    "sleep_seconds": 0.0, "total_seconds": 0.25}}
+    delta = http_delta(before, after)
+    assert set(delta["endpoints"]) == {"/a", "/c"}
+    assert delta["calls"] == 4
+    assert delta["retries"] == 1
+    assert delta["errors"] == 1
+    assert delta["bytes"] == 37
+    assert delta["sleep_seconds"] == 0.5
+    assert delta["total_seconds"] == 0.75
+
+
+def test_capture_is_json():
+    """Test that a full capture produces a JSON-serializable report."""
+    profiler = Profiler(cprofile=True, trace_memory=True, top=5)
+    with profiler.capture():
+        with profiler.stage("build"):
+            data = [list(range(100)) for _ in range(100)]
+    report = json.loads(json.dumps(profiler.report()))
+    assert data
+    assert report["wall_seconds"] >= report["stages"]["build"][
+        "wall_seconds"]
+    assert report["http"] is None
+    assert 0 < len(report["cprofile"]) <= 5
+    assert report["tracemalloc"]["peak_bytes"] > 0
+    assert len(report["tracemalloc"]["top"]) <= 5
@@ -0,0 +1,175 @@
+#! /usr/bin/env python3
+"""Module to test ReportService."""
+import asyncio
+import json
+import threading
+import pytest
+from identities import IdentityResolver
+from match_cache import MatchCache
+from rate_limiter import RateLimiter
+from regions import RegionClients
+from report_service import ReportService
+from riot_client import RiotClient
+from riot_stub import FakeRiotData, RiotStub
+from summoner_container import Summoner
+
+
+class FakeClock:
+    """Settable clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def slow_compute(calls, release):
+    """Report builder that blocks until released."""
+    def compute(name):
+        calls.append(name)
+        release.wait(5)
+        return {"wins-as": [name]}
+    return compute
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, body = raw.split(b"\r\n\r\n", 1)
+    return int(head.split()[1]), json.loads(body), head.decode()
+
+
+def test_concurrent_requests_coalesce():
+    """Test that simultaneous requests for one summoner compute once."""
+    calls, release = list(), threading.Event()
+    service = ReportService(compute=slow_compute(calls, release),
+                            limiter=RateLimiter())
+
+    async def scenario():
+        waiting = [asyncio.ensure_future(service.get_report(name))
+                   for name in ["Bork", "bork", "B ork", "Bork"]]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*waiting)
+
+    results = asyncio.run(scenario())
+    assert calls == ["Bork"]
+    assert service.coalesced == 3
+    assert all(status == 200 for status, _ in results)
+
+
+def test_cache_expires():
+    """Test that a report is reused until its TTL runs out."""
+    clock, calls, release = FakeClock(), list(), threading.Event()
+    release.set()
+    service = ReportService(ttl=10, compute=slow_compute(calls, release),
+                            limiter=RateLimiter(), clock=clock)
+    assert asyncio.run(service.get_report("Bork"))[1]["cached"] is False
+    clock.now = 9
+    assert asyncio.run(service.get_report("Bork"))[1]["cached"] is True
+    clock.now = 10
+    assert asyncio.run(service.get_report("Bork"))[1]["cached"] is False
+    assert len(calls) == 2
+
+
+def test_expired_reports_dropped():
+    """Test that reports past stale_ttl leave the cache as others arrive."""
+    clock, calls, release = FakeClock(), list(), threading.Event()
+    release.set()
+    service = ReportService(ttl=10, stale_ttl=100, limiter=RateLimiter(),
+                            compute=slow_compute(calls, release), clock=clock)
+    for now, name in ((0, "Bork"), (50, "Yassuo"), (60, "Bork")):
+        clock.now = now
+        asyncio.run(service.get_report(name))
+    assert list(service._cache) == ["yassuo", "bork"]
+    clock.now = 150
+    asyncio.run(service.get_report("Thirty One"))
+    assert list(service._cache) == ["bork", "thirtyone"]
+    clock.now = 500
+    asyncio.run(service.get_report("Bork"))
+    assert list(service._cache) == ["bork"]
+
+
+def test_overload_serves_stale_or_503():
+    """Test that a backed-up limiter refuses new work gracefully."""
+    clock, calls, release = FakeClock(), list(), threading.Event()
+    release.set()
+    limiter = RateLimiter(((1, 60),))
+    service = ReportService(ttl=10, max_delay=5, limiter=limiter,
+                            compute=slow_compute(calls, release), clock=clock)
+    asyncio.run(service.get_report("Bork"))
+    limiter.acquire()
+    clock.now = 20
+    status, body = asyncio.run(service.get_report("Bork"))
+    assert (status, body["stale"]) == (200, True)
+    status, body = asyncio.run(service.get_report("Yassuo"))
+    assert status == 503
+    assert body["retry_after"] >= 5
+    assert calls == ["Bork"]
+
+
+def test_unexpected_errors_answer_500():
+    """Test that any failure still gets a response with a status."""
+    def compute(name):
+        raise ValueError(name)
+
+    async def failing_route(*_):
+        raise RuntimeError("route")
+
+    async def scenario():
+        service = ReportService(compute=compute, limiter=RateLimiter())
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            report = await fetch(port, "/report/Bork")
+            service.route = failing_route
+            health = await fetch(port, "/health")
+        return service, report, health
+
+    service, report, health = asyncio.run(scenario())
+    assert report[:2] == (500, {"error": "ValueError('Bork')"})
+    assert "500 Internal Server Error" in report[2]
+    assert health[:2] == (500, {"error": "RuntimeError('route')"})
+    assert not service._in_flight
+
+
+@pytest.fixture()
+def stub(monkeypatch, tmp_path):
+    data = FakeRiotData()
+    data.add_summoner("Bork", 8)
+    with RiotStub(data, latency=0.01) as server:
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(Summoner, "API_BASE", server.api_base)
+        monkeypatch.setattr(Summoner, "DDRAGON_BASE", server.ddragon_base)
+        monkeypatch.setattr(Summoner, "MATCH_CACHE_PATH", None)
+        monkeypatch.setattr(Summoner, "identities", IdentityResolver())
+        monkeypatch.setattr(Summoner, "clients", RegionClients(
+            lambda _: RiotClient(RateLimiter(((100, 1),)))))
+        yield server
+
+
+def test_http_endpoints(stub):
+    """Test reports, errors and health over a real socket."""
+    async def scenario():
+        service = ReportService(workers=2)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reports = await asyncio.gather(
+                *[fetch(port, "/report/Bork") for _ in range(3)])
+            missing = await fetch(port, "/report/Nobody")
+            invalid = await fetch(port, "/report/B%40rk")
+            health = await fetch(port, "/health")
+        return reports, missing, invalid, health
+
+    reports, missing, invalid, health = asyncio.run(scenario())
+    assert [status for status, _, _ in reports] == [200, 200, 200]
+    assert reports[0][1]["results"]["wins-as"]
+    assert missing[0] == 404
+    assert invalid[0] == 400
+    assert health[1]["computations"] == 2
+    assert stub.hits["/lol/summoner/v4/summoners/by-name/Bork"] == 1
@@ -0,0 +1,100 @@
+#! /usr/bin/env python3
+"""Module to test RiotClient against a local stub server."""
+import socket
+import pytest
+import requests
+from riot_client import ClientMetrics, RiotClient
+from riot_stub import FakeRiotData, RiotStub
+
+
+@pytest.fixture()
+def stub_data():
+    data = FakeRiotData()
+    data.add_summoner("Bork", 3)
+    return data
+
+
+def make_client(**kwargs):
+    sleeps = list()
+    client = RiotClient(sleep=sleeps.append, retry_padding=0, **kwargs)
+    return client, sleeps
+
+
+def test_retries_server_errors(stub_data):
+    """Test that 503s are retried with growing, capped backoff."""
+    client, sleeps = make_client(backoff=1, max_backoff=3)
+    with RiotStub(stub_data, fail_every=1) as stub:
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get(f"{stub.api_base}status/v3/shard-data")
+    assert stub.failed == client.max_attempts
+    assert len(sleeps) == client.max_attempts - 1
+    assert all(0 <= s <= c for s, c in zip(sleeps, [1, 2, 3, 3]))
+
+
+def test_recovers_after_throttling(stub_data):
+    """Test that a 429 is retried and the payload still arrives."""
+    client, _ = make_client()
+    with RiotStub(stub_data, throttle_every=2, retry_after=0) as stub:
+        for _ in range(4):
+            summoner = client.get_json(
+                f"{stub.api_base}summoner/v4/summoners/by-name/Bork")
+            assert summoner["name"] == "Bork"
+    metrics = client.metrics.snapshot()
+    entry = metrics["/lol/summoner/v4/summoners/by-name/{id}"]
+    assert entry["retries"] == stub.throttled > 0
+    assert entry["calls"] == 4 + entry["retries"]
+
+
+def test_client_errors_not_retried(stub_data):
+    """Test that a 404 fails on the first attempt."""
+    client, sleeps = make_client()
+    with RiotStub(stub_data) as stub:
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get(f"{stub.api_base}match/v4/matches/1")
+    assert not sleeps
+    entry = client.metrics.snapshot()["/lol/match/v4/matches/{id}"]
+    assert entry.pop("bytes") > 0
+    assert entry == {
+        "calls": 1, "retries": 0, "errors": 1, "sleep_seconds": 0.0,
+        "total_seconds": pytest.approx(0, abs=1),
+        "max_seconds": pytest.approx(0, abs=1),
+        "mean_seconds": pytest.approx(0, abs=1)}
+
+
+def test_connection_failures_capped():
+    """Test that a dead host is retried max_attempts times, then raised."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client, sleeps = make_client(max_attempts=3)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get(f"http://127.0.0.1:{port}/lol/status/v3/shard-data")
+    assert len(sleeps) == 2
+
+
+@pytest.mark.parametrize("retry_after, slept", [
+    ("3", 3.0), ("1.5", 1.5), ("Wed, 21 Oct 2015 07:28:00 GMT", None),
+    ("-1", None), ("inf", None), ("nan", None), (None, None)])
+def test_retry_after_parsing(retry_after, slept):
+    """Test that an unusable Retry-After backs off instead of raising."""
+    client, sleeps = make_client(backoff=1, max_backoff=3)
+    response = requests.Response()
+    response.status_code = 429
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    assert client._wait_before_retry(response, 1, False) == sleeps[0]
+    if slept is None:
+        assert 0 <= sleeps[0] <= 2
+    else:
+        assert sleeps == [slept]
+
+
+@pytest.mark.parametrize("url, endpoint", [
+    ("https://na1.api.riotgames.com/lol/match/v4/matches/123?api_key=x",
+     "/lol/match/v4/matches/{id}"),
+    ("http://h/lol/summoner/v4/summoners/by-name/Bork",
+     "/lol/summoner/v4/summoners/by-name/{id}"),
+    ("http://h/lol/status/v3/shard-data", "/lol/status/v3/shard-data")])
+def test_endpoint_of(url, endpoint):
+    """Test that identifiers are masked out of endpoint names."""
+    assert ClientMetrics.endpoint_of(url) == endpoint
@@ -0,0 +1,60 @@
+"""Tests for riot_stub fixture recording and replay."""
+import requests
+from riot_stub import FakeRiotData, RecordingAdapter, RiotStub
+
+
+def sample_data():
+    """Get generated data with a few summoners sharing games."""
+    data = FakeRiotData(n_champions=12, seed=3)
+    data.add_summoner("Bork", 5)
+    data.add_summoner("Thirty One", 2)
+    data.add_match(["Bork", "Thirty One"])
+    return data
+
+
+def responses(data):
+    """Get every response FakeRiotData answers for its summoners."""
+    answers = [data.route("/realms/na.json", {}),
+               data.route(f"/cdn/{data.version}/data/en_US/champion.json",
+                          {})]
+    for name, summ in sorted(data.summoners.items()):
+        answers.append(data.route(
+            f"/lol/summoner/v4/summoners/by-name/{name}", {}))
+        answers.append(data.route(
+            f"/lol/match/v4/matchlists/by-account/{summ['accountId']}", {}))
+    for game_id in sorted(data.matches):
+        answers.append(data.route(f"/lol/match/v4/matches/{game_id}", {}))
+    return answers
+
+
+def test_save_load_round_trip(tmp_path):
+    """Test that loaded fixtures answer like the data that was saved."""
+    data = sample_data()
+    data.save(tmp_path)
+    loaded = FakeRiotData.load(tmp_path)
+    assert responses(loaded) == responses(data)
+    assert loaded.next_game_id == data.next_game_id
+
+
+def test_recording_adapter_replays():
+    """Test that responses recorded through a session serve again."""
+    data = sample_data()
+    recorded = FakeRiotData(n_champions=0)
+    session = requests.Session()
+    session.mount("http://", RecordingAdapter(recorded))
+    with RiotStub(data, throttle_every=3) as stub:
+        urls = [f"{stub.ddragon_base}/realms/na.json",
+                f"{stub.ddragon_base}/cdn/{data.version}/data/en_US/"
+                f"champion.json"]
+        for name, summ in data.summoners.items():
+            urls.append(f"{stub.api_base}summoner/v4/summoners/by-name/"
+                        f"{name}")
+            urls.append(f"{stub.api_base}match/v4/matchlists/by-account/"
+                        f"{summ['accountId']}")
+        urls.extend(f"{stub.api_base}match/v4/matches/{game_id}"
+                    for game_id in data.matches)
+        for url in urls:
+            while session.get(url, timeout=10).status_code == 429:
+                pass
+    assert stub.throttled
+    assert responses(recorded) == responses(data)
@@ -0,0 +1,81 @@
+#! /usr/bin/env python3
+"""Module to test RollingStats against recounts of each window."""
+import pytest
+from champ_stats import COMPARISONS, ChampionStats
+from match_record import MatchRecord
+from riot_stub import random_matches
+from rolling_stats import RecentForm, RollingStats
+
+
+def random_games(count, seed=0):
+    return [(timestamp, MatchRecord(*match))
+            for timestamp, match in random_matches(
+                count, seed, n_champions=40, steps=(60.0, 600.0, 3600.0))]
+
+
+def test_last_games_window():
+    """Test that a game-count window always equals a recount."""
+    games = random_games(120)
+    window = RollingStats(max_games=20)
+    for done, (timestamp, match) in enumerate(games, 1):
+        window.add(match, timestamp)
+        recent = [game for _, game in games[max(0, done - 20):done]]
+        assert len(window) == len(recent)
+        assert window.stats == ChampionStats.from_matches(recent)
+
+
+def test_time_window():
+    """Test that a time window drops games as they age out."""
+    games = random_games(200, seed=1)
+    window = RollingStats(max_age=86400)
+    for timestamp, match in games:
+        window.add(match, timestamp)
+        recent = [game for when, game in games
+                  if timestamp - 86400 < when <= timestamp]
+        assert window.stats == ChampionStats.from_matches(recent)
+    assert window.expire(games[-1][0] + 86400) == len(recent)
+    assert window.stats == ChampionStats()
+
+
+@pytest.mark.parametrize("sort_by", sorted(COMPARISONS))
+def test_top_matches_recount(sort_by):
+    """Test that window rankings equal rankings of a recount."""
+    games = random_games(300, seed=2)
+    form = RecentForm({"last-50": RollingStats(max_games=50),
+                       "week": RollingStats(max_age=7 * 86400)})
+    for timestamp, match in games:
+        form.add(match, timestamp)
+    column, descending, count = COMPARISONS[sort_by]
+    recount = ChampionStats.from_matches([game for _, game in games[-50:]])
+    assert form.top("last-50", sort_by) == [
+        recount.row(champ)
+        for champ in recount.top_k(column, 5, descending, count)]
+    assert len(form["week"]) == sum(
+        1 for when, _ in games if when > games[-1][0] - 7 * 86400)
+
+
+def test_holds():
+    """Test which games a window or any of a form's windows would keep."""
+    games = RollingStats(max_games=3)
+    day = RollingStats(max_age=86400)
+    both = RollingStats(max_games=3, max_age=60)
+    assert [games.holds(i, 1e9) for i in (0, 2, 3)] == [True, True, False]
+    assert [day.holds(10 ** 6, age) for age in (0, 86399, 86400)] == \
+        [True, True, False]
+    assert (both.holds(2, 59), both.holds(2, 60), both.holds(3, 0)) == \
+        (True, False, False)
+    form = RecentForm({"games": games, "day": day})
+    assert form.holds(5, 100) and form.holds(1, 1e9)
+    assert not form.holds(5, 86400)
+
+
+def test_bad_input():
+    """Test that windows need a bound and games arrive in order."""
+    with pytest.raises(ValueError):
+        RollingStats()
+    window = RollingStats(max_age=60)
+    with pytest.raises(ValueError):
+        window.add((True, 1, [2], [3]))
+    window.add((True, 1, [2], [3]), 100.0)
+    with pytest.raises(ValueError):
+        window.add((True, 1, [2], [3]), 50.0)
@@ -0,0 +1,67 @@
+#! /usr/bin/env python3
+"""Module to test StaticDataCache against a local stub server."""
+import pytest
+from riot_client import RiotClient
+from riot_stub import FakeRiotData, RiotStub
+from static_data import StaticDataCache
+
+
+class FakeClock:
+    """Settable clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def stub():
+    with RiotStub(FakeRiotData(n_champions=3)) as server:
+        yield server
+
+
+def make_cache(stub, tmp_path, clock):
+    return StaticDataCache(str(tmp_path), RiotClient(), stub.ddragon_base,
+                           ttl=60, clock=clock)
+
+
+def champion_hits(stub):
+    return sum(count for path, count in stub.hits.items()
+               if path.endswith("champion.json"))
+
+
+def test_cold_then_warm(stub, tmp_path):
+    """Test that a second process start needs no network inside the TTL."""
+    clock = FakeClock()
+    version, champions, index = make_cache(stub, tmp_path, clock).load()
+    assert version == stub.data.version
+    assert index == {"1": "Champion1", "2": "Champion2", "3": "Champion3"}
+    assert len(champions["data"]) == 3
+    assert make_cache(stub, tmp_path, clock).load() == (version, champions,
+                                                        index)
+    assert stub.hits["/realms/na.json"] == 1
+    assert champion_hits(stub) == 1
+
+
+def test_revalidates_after_ttl(stub, tmp_path):
+    """Test that a stale version is revalidated, not downloaded again."""
+    clock = FakeClock()
+    cache = make_cache(stub, tmp_path, clock)
+    first = cache.load()
+    clock.now += 61
+    assert cache.load() == first
+    assert stub.hits["/realms/na.json"] == 2
+    assert champion_hits(stub) == 1
+
+
+def test_new_version_downloads_champions(stub, tmp_path):
+    """Test that a new Data Dragon version fetches its champion data."""
+    clock = FakeClock()
+    cache = make_cache(stub, tmp_path, clock)
+    cache.load()
+    stub.data.version = "10.2.1"
+    clock.now += 61
+    assert cache.load()[0] == "10.2.1"
+    assert champion_hits(stub) == 2
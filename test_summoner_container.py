@@ -5,6 +5,18 @@ Note - VSCode had issues finding pytest test files while writing this.
 Currently unsolved.
 """
 from summoner_container import Summoner
+import summoner_container
+from champ_stats import ChampionStats
+from identities import IdentityResolver
+from match_cache import MatchCache
+from pair_stats import PairStats
+from rate_limiter import RateLimiter
+from regions import RegionClients
+from riot_client import RiotClient
+from riot_stub import FakeRiotData, RiotStub
+from rolling_stats import RollingStats
+import concurrent.futures
+import json
 import pytest
 import requests
 import sys
@@ -22,12 +34,12 @@ def test_initialize_summoner(monkeypatch, input):
     init = Summoner()
     assert type(init) == Summoner
 
-def test_handle_bad_url(init_summ):
+def test_handle_bad_url(stub_summ):
     """Test that bad urls are handled correctly."""
     with pytest.raises(requests.exceptions.HTTPError):
         ext = 'b'
         query = {'api_key':"RGAPI-fa695a0d-056b-48fd-8546-e05e28120a29"}
-        init_summ.handle_request(ext, **query)
+        stub_summ.handle_request(ext, **query)
 
 @pytest.mark.parametrize("input", ["Bork", "Thirty One"])
 def test_good_username(monkeypatch, input, init_summ):
@@ -51,4 +63,283 @@ def test_bad_matchlist(input, init_summ):
 @pytest.mark.parametrize("input", [{"dog":{1:"d", 2:"o", 3:"g"}}])
 def test_flatten_dict(input, init_summ):
     """Test that flatten_dict flattens dictionaries appropriately."""
-    assert init_summ.flatten_stat_dict(input) == [['d', 'o', 'g']]
\ No newline at end of file
+    assert init_summ.flatten_stat_dict(input) == [['d', 'o', 'g']]
+
+@pytest.fixture()
+def stub_data():
+    data = FakeRiotData()
+    data.add_summoner("Yassuo", 30)
+    return data
+
+
+@pytest.fixture()
+def stub_summ(monkeypatch, tmp_path, stub_data):
+    """Summoner pointed at a local RiotStub instead of the live API."""
+    with RiotStub(stub_data, latency=0.02, throttle_every=7) as stub:
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(Summoner, 'API_BASE', stub.api_base)
+        monkeypatch.setattr(Summoner, 'DDRAGON_BASE', stub.ddragon_base)
+        monkeypatch.setattr(Summoner, 'identities', IdentityResolver())
+        monkeypatch.setattr(Summoner, 'clients', RegionClients(
+            lambda _: RiotClient(RateLimiter(((50, 1),)), retry_padding=0)))
+        init = Summoner("Yassuo")
+        init.stub = stub
+        yield init
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_compile_match_list_order(stub_summ, workers):
+    """Test that concurrent fetching keeps matchlist order through 429s."""
+    key = stub_summ.API_TEST_KEY
+    matchlist = stub_summ.get_matchlist_by_summoner("Yassuo", key)
+    file_name = stub_summ.compile_match_list(matchlist, key, workers)
+    with open(file_name, encoding="utf-8") as read_file:
+        matches = [json.loads(line) for line in read_file]
+    assert ([m["gameId"] for m in matches] ==
+            [m["gameId"] for m in matchlist["matches"]])
+    assert stub_summ.stub.throttled > 0
+    assert stub_summ.stub.max_in_flight <= workers
+
+
+def test_compile_match_list_uses_cache(stub_summ):
+    """Test that a second run downloads no match it has already seen."""
+    key = stub_summ.API_TEST_KEY
+    matchlist = stub_summ.get_matchlist_by_summoner("Yassuo", key)
+    stub_summ.compile_match_list(matchlist, key)
+    fetched = sum(count for path, count in stub_summ.stub.hits.items()
+                  if "/matches/" in path)
+    stub_summ.compile_match_list(matchlist, key)
+    refetched = sum(count for path, count in stub_summ.stub.hits.items()
+                    if "/matches/" in path)
+    assert fetched == refetched == len(matchlist["matches"])
+    assert stub_summ.match_cache.stats()["hits"] == fetched
+
+
+def test_construct_with_shared_data():
+    """Test that given static data skips the connection check and downloads."""
+    static = ("10.1.1", {"data": {"Bork": {"id": "Bork", "key": "1"}}},
+              {"1": "Bork"})
+    init = Summoner("Bork", static, MatchCache(":memory:"), verbose=False,
+                    match_workers=2)
+    assert init.match_workers == 2
+    assert Summoner.match_workers != 2
+    assert init.summoner_in == "Bork"
+    assert init.summarize_results([[[1, 1, 0, 0, 1, 0, 0]]]) == {
+        "wins-as": [{"champion": "Bork", "id": 1, "played_as": 1,
+                     "same_team": 0, "other_team": 0, "wins_as": 1,
+                     "wins_with": 0, "wins_against": 0}]}
+
+
+def test_stream_match_data(stub_summ, tmp_path):
+    """Test that streamed tuples match the saved-file path, with no file."""
+    key = stub_summ.API_TEST_KEY
+    matchlist = stub_summ.get_matchlist_by_summoner("Yassuo", key)
+    streamed = list(stub_summ.stream_match_data("Yassuo", matchlist, key))
+    assert not list(tmp_path.glob("*json"))
+    file_name = stub_summ.compile_match_list(matchlist, key)
+    assert streamed == stub_summ.get_match_list_data("Yassuo", file_name)
+    assert len(streamed) == 30
+    raw = tmp_path / "raw.ndjson"
+    list(stub_summ.stream_match_data("Yassuo", matchlist, key, str(raw)))
+    assert len(raw.read_text().splitlines()) == 30
+
+
+def test_incremental_update(stub_summ, stub_data):
+    """Test that a re-run only fetches new games and equals a recount."""
+    key = stub_summ.API_TEST_KEY
+    account = stub_summ.get_summoner_by_name("Yassuo", key)[2]
+    first = stub_summ.update_champion_stats("Yassuo", account, key)
+    stub_data.add_summoner("Yassuo", 6)
+    cache = stub_summ.match_cache
+    hits = cache.stats()["hits"]
+    before = stub_summ.stub.hits.copy()
+    second = stub_summ.update_champion_stats("Yassuo", account, key)
+    fetched = sum(count - before[path]
+                  for path, count in stub_summ.stub.hits.items()
+                  if "/matches/" in path)
+    assert fetched == 6
+    assert cache.stats()["hits"] == hits
+    assert second != first
+    stub_summ.incremental = False
+    assert stub_summ.update_champion_stats("Yassuo", account, key) == second
+
+
+def test_match_limit_skips_aggregate(stub_summ, stub_data):
+    """Test that match_limit counts the newest games, aggregate or not."""
+    key = stub_summ.API_TEST_KEY
+    account = stub_summ.get_summoner_by_name("Yassuo", key)[2]
+    cache = stub_summ.match_cache
+    saved = f"{account}:{stub_summ.SEASON}:{stub_summ.QUEUE}"
+
+    def count(limit, incremental=True):
+        stub_summ.match_limit = limit
+        stub_summ.incremental = incremental
+        return stub_summ.update_champion_stats("Yassuo", account, key)
+
+    assert count(10) == count(10, False)
+    assert cache.get_aggregate(saved) is None
+    whole = count(None)
+    mark = cache.get_aggregate(saved)[1:]
+    stub_data.add_summoner("Yassuo", 25)
+    assert count(10) == count(10, False) != whole
+    assert cache.get_aggregate(saved)[1:] == mark
+    assert count(None) == count(None, False)
+    assert cache.get_aggregate(saved)[1:] != mark
+
+
+@pytest.mark.parametrize("limit, expected", [(None, 230), (150, 150),
+                                             (30, 30)])
+def test_iter_matchlist_pages(monkeypatch, stub_data, limit, expected):
+    """Test that the matchlist is paged lazily past 100 games."""
+    stub_data.add_summoner("Yassuo", 200)
+    with RiotStub(stub_data) as stub:
+        monkeypatch.setattr(Summoner, 'API_BASE', stub.api_base)
+        monkeypatch.setattr(Summoner, 'clients', RegionClients(
+            lambda _: RiotClient()))
+        monkeypatch.setattr(Summoner, 'identities', IdentityResolver())
+        init = Summoner("Yassuo", ("10.1.1", {}), MatchCache(":memory:"))
+        games = init.iter_matchlist("acct-0", init.API_TEST_KEY, limit)
+        first = next(games)
+        assert stub.hits["/lol/match/v4/matchlists/by-account/acct-0"] == 1
+        rest = list(games)
+    ids = [first["gameId"]] + [game["gameId"] for game in rest]
+    assert len(set(ids)) == len(ids) == expected
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_construction_does_no_io(monkeypatch, tmp_path):
+    """Test that building a Summoner touches neither network nor disk."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Summoner, 'API_BASE', "http://127.0.0.1:9/lol/")
+    monkeypatch.setattr(Summoner, 'DDRAGON_BASE', "http://127.0.0.1:9")
+    init = Summoner("Bork", match_limit=20)
+    assert init.summoner_in == "Bork"
+    assert not list(tmp_path.iterdir())
+    with pytest.raises(TypeError):
+        Summoner("Bork", no_such_setting=1)
+
+
+def test_summoner_lookup_memoized(stub_summ):
+    """Test that a second report reuses the first one's lookup."""
+    key = stub_summ.API_TEST_KEY
+    for _ in range(2):
+        stub_summ.compute_results()
+        stub_summ.get_matchlist_by_summoner("Yassuo", key)
+    path = "/lol/summoner/v4/summoners/by-name/Yassuo"
+    assert stub_summ.stub.hits[path] == 1
+    assert stub_summ.get_summoner_by_name("yassuo", key)[4] == "puuid-0"
+
+
+def test_profile_report(stub_summ, monkeypatch, tmp_path):
+    """Test that --profile writes stage timings and HTTP counters."""
+    out = tmp_path / "profile.json"
+    summoner_container.main(["Yassuo", "--profile", str(out)])
+    with open(out, encoding="utf-8") as read_file:
+        report = json.load(read_file)
+    assert {"summoner", "mastery", "match_stats", "match_wait",
+            "match_parse", "compare", "static_data",
+            "report"} <= set(report["stages"])
+    assert report["stages"]["match_parse"]["calls"] == 30
+    http = report["http"]
+    assert http["endpoints"]["/lol/match/v4/matches/{id}"]["calls"] == \
+        30 + http["endpoints"]["/lol/match/v4/matches/{id}"]["retries"]
+    assert http["retries"] == stub_summ.stub.throttled > 0
+    assert http["bytes"] > 0
+    assert report["cprofile"] is None
+
+
+def test_pair_stats(stub_summ, tmp_path):
+    """Test that streamed pair stats match the saved-file records."""
+    key = stub_summ.API_TEST_KEY
+    pairs = stub_summ.get_pair_stats()
+    matchlist = stub_summ.get_matchlist_by_summoner("Yassuo", key)
+    file_name = stub_summ.compile_match_list(matchlist, key)
+    records = stub_summ.get_match_list_data("Yassuo", file_name)
+    assert pairs == PairStats.from_matches(records)
+    assert int(pairs.games["enemy"].sum()) == 5 * len(records)
+
+
+def test_concurrent_reports(stub_summ, stub_data):
+    """Test that reports run on a thread pool match sequential ones."""
+    stub_data.add_summoner("Bork", 20)
+    stub_data.add_summoner("Thirty One", 25)
+    names = ["Yassuo", "Bork", "Thirty One"] * 3
+    sequential = {name: Summoner(name, verbose=False).compute_results()
+                  for name in set(names)}
+    with concurrent.futures.ThreadPoolExecutor(6) as pool:
+        reports = list(pool.map(
+            lambda name: Summoner(name, verbose=False).compute_results(),
+            names))
+        shared = list(pool.map(lambda _: stub_summ.compute_results(),
+                               range(4)))
+    assert reports == [sequential[name] for name in names]
+    assert shared == [sequential["Yassuo"]] * 4
+    assert not hasattr(Summoner, "big_data")
+
+
+def test_recent_form(stub_summ):
+    """Test that rolling windows hold the newest games."""
+    stub_summ.match_limit = 30
+    form = stub_summ.get_recent_form({
+        "last-10": RollingStats(max_games=10),
+        "day": RollingStats(max_age=86400)})
+    key = stub_summ.API_TEST_KEY
+    matchlist = stub_summ.get_matchlist_by_summoner("Yassuo", key)
+    newest = list(stub_summ.stream_match_data(
+        "Yassuo", matchlist["matches"][:10], key))
+    assert form["last-10"].stats == ChampionStats.from_matches(newest)
+    assert len(form["day"]) == 30
+
+
+def test_recent_form_fetches_only_windows(stub_summ):
+    """Test that only games some window holds are fetched."""
+    form = stub_summ.get_recent_form({
+        "last-5": RollingStats(max_games=5),
+        "4h": RollingStats(max_age=4 * 3600)})
+    fetched = sum(count for path, count in stub_summ.stub.hits.items()
+                  if "/matches/" in path)
+    assert fetched == 8
+    assert (len(form["last-5"]), len(form["4h"])) == (5, 8)
+    key = stub_summ.API_TEST_KEY
+    matchlist = stub_summ.get_matchlist_by_summoner("Yassuo", key)
+    newest = list(stub_summ.stream_match_data(
+        "Yassuo", matchlist["matches"][:5], key))
+    assert form["last-5"].stats == ChampionStats.from_matches(newest)
+
+def test_participant_data(stub_data):
+    """Test that every player's record equals their get_match_data()."""
+    for game in list(stub_data.matches.values())[:5]:
+        records = Summoner.get_participant_data(game)
+        assert len(records) == 10
+        for name, record in records.items():
+            assert record == Summoner.get_match_data(game, name)
+
+
+@pytest.mark.parametrize("index", [True, False])
+def test_shared_games_fetched_once(stub_summ, stub_data, index):
+    """Test that a teammate's report reuses indexed shared games."""
+    stub_data.add_summoner("Bork")
+    for _ in range(12):
+        stub_data.add_match(["Yassuo", "Bork"])
+    stub_summ.index_participants = index
+    key = stub_summ.API_TEST_KEY
+    stub_summ.compute_results()
+    fetched = sum(count for path, count in stub_summ.stub.hits.items()
+                  if "/matches/" in path)
+    bork = Summoner("Bork", match_cache=stub_summ.match_cache,
+                    index_participants=index)
+    account = bork.get_summoner_by_name("Bork", key)[2]
+    records = list(bork.stream_match_data(
+        "Bork", bork.iter_matchlist(account, key), key))
+    refetched = sum(count for path, count in stub_summ.stub.hits.items()
+                    if "/matches/" in path)
+    assert fetched == refetched == 42
+    assert len(records) == 12
+    stats = stub_summ.match_cache.stats()
+    assert stats["record_hits"] == (12 if index else 0)
+    assert stats["records"] == (420 if index else 0)
+    for game_id, record in zip(
+            [game["gameId"] for game in stub_data.matchlists[account]],
+            records):
+        assert record == Summoner.get_match_data(
+            stub_data.matches[game_id], "Bork")
@@ -0,0 +1,33 @@
+#! /usr/bin/env python3
+"""Module to test SummonerReport."""
+import pytest
+from summoner_report import REPORT_KEYS, SummonerReport
+
+
+def make_report():
+    results = [[[num, 1, 0, 0, 1, 0, 0]] for num in range(len(REPORT_KEYS))]
+    return SummonerReport("Bork", "na1", results)
+
+
+def test_report_is_immutable():
+    """Test that neither fields nor results can be changed."""
+    report = make_report()
+    with pytest.raises(AttributeError):
+        report.summoner = "Yassuo"
+    with pytest.raises(AttributeError):
+        del report.results
+    with pytest.raises(TypeError):
+        report["wins-as"][0] = (9,)
+    assert hash(report) == hash(make_report())
+
+
+def test_report_indexes_like_a_list():
+    """Test that results index by position and by comparison name."""
+    report = make_report()
+    assert len(report) == len(list(report)) == 7
+    assert report[1] == report["wins-with"] == ((1, 1, 0, 0, 1, 0, 0),)
+    assert report[-1] == report["mastery"]
+    assert report == make_report()
+    assert report.summary({"0": "Bork"})["wins-as"][0]["champion"] == "Bork"
+    with pytest.raises(ValueError):
+        SummonerReport("Bork", "na1", [[]])